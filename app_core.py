@@ -1,17 +1,18 @@
-import pandas as pd
 import streamlit as st
 import os
 import io
+import importlib
 import json
+import threading
 import time
-from services.clean_csv import cleanCSV
-from services.split_blocks import splitBlocks
-from services.parse_numerics import parseNumerics
-from services.parse_from_all_patient_data import parse_from_all_patient_data
-from views import render_vitals, render_respirator, render_lab, render_mcs, render_mcs_ecmo, render_mcs_impella, render_rrt
-from ui.sidebar import render_sidebar_navigation
+import re
+import hashlib
+from typing import TYPE_CHECKING, Optional
 from logging_config import configure_logging
 
+if TYPE_CHECKING:
+    from services.datasets import PatientDatasets
+
 # Initialize logging
 logger = configure_logging()
 
@@ -20,16 +21,161 @@ _DEFAULT_MAX_MB = int(os.environ.get("ALLOW_UPLOAD_MAX_MB", 50))
 UPLOAD_MAX_BYTES = _DEFAULT_MAX_MB * 1024 * 1024
 # Control whether state dumps are allowed to be written to disk
 ALLOW_STATE_DUMP = os.environ.get("ALLOW_STATE_DUMP", "0").strip() in ("1", "true", "True")
+# Show the per-stage timing/memory breakdown of the last parse in the sidebar
+SHOW_DIAGNOSTICS = os.environ.get("SHOW_DIAGNOSTICS", "0").strip() in ("1", "true", "True")
+# Number of full-run / view-fragment timings kept for the diagnostics panel
+RERUN_LOG_SIZE = 50
+# Modules only needed once a file is uploaded, in import order (pandas first,
+# so the parsers and views find it loaded). Imported by a background thread
+# while the upload prompt is shown; see start_preload().
+PRELOAD_MODULES = (
+    "pandas",
+    "services.datasets",
+    "services.dataset_registry",
+    "services.device_intervals",
+    "ui.sidebar",
+    "ui.progress",
+    "ui.diagnostics",
+    "ui.export",
+    "views",
+    "views.numeric_view",
+    "views.overview",
+)
+
+
+# view prefix -> dataset name in services.datasets.PatientDatasets
+OVERVIEW_DATASETS = {
+    'df1_vitals': 'vitals',
+    'df2_resp': 'respirator',
+    'df3_lab': 'lab',
+    'mcs_ecmo': 'ecmo',
+    'mcs_impella': 'impella',
+    'rrt_tab': 'rrt',
+    'fluid_balance': 'balance_daily',
+    'devices': 'device_presence_daily',
+    'medications': 'medication_daily',
+    'derived': 'derived',
+    'scores': 'scores_daily',
+}
+# view -> dataset it renders; the current view is parsed first in the background
+VIEW_DATASETS = {
+    "Vitals": "vitals",
+    "Respirator": "respirator",
+    "Labor": "lab",
+    "MCS - ECMO": "ecmo",
+    "MCS - Impella": "impella",
+    "RRT": "rrt",
+    "Bilanz": "fluid_balance",
+    "Notizen": "notes_index",
+    "Katheter/Drainagen": "device_index",
+    "Abgeleitet": "derived",
+    "Scores": "scores",
+}
+# legacy per-device keys, e.g. "mcs_ecmo_<device>_params" or "rrt_tab_<device>_avg"
+_LEGACY_KEY_RE = re.compile(r'^(mcs_ecmo|mcs_impella|rrt_tab)_.+_(params|avg)$')
+
+
+_preload_lock = threading.Lock()
+_preload_thread: Optional[threading.Thread] = None
+
+
+def _preload() -> None:
+    t0 = time.perf_counter()
+    for name in PRELOAD_MODULES:
+        try:
+            importlib.import_module(name)
+        except Exception:
+            # the import is retried (and fails visibly) where the module is used
+            logger.exception("Preloading %s failed", name)
+    logger.info("Preloaded %d modules in %.2f s", len(PRELOAD_MODULES), time.perf_counter() - t0)
+
+
+def start_preload() -> threading.Thread:
+    """Import PRELOAD_MODULES in a daemon thread, once per process.
+
+    Called by run_app() before the upload prompt and by app_launcher.py before
+    the Streamlit server starts. Python's per-module import locks make a
+    concurrent import from the script thread wait for the preload of that
+    module instead of importing it twice.
+    """
+    global _preload_thread
+    with _preload_lock:
+        if _preload_thread is None:
+            _preload_thread = threading.Thread(target=_preload, name="preload-modules", daemon=True)
+            _preload_thread.start()
+        return _preload_thread
+
+
+def _session_id() -> str:
+    """Streamlit session id of the running script (falls back to the session_state object)."""
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        ctx = get_script_run_ctx()
+        if ctx is not None:
+            return ctx.session_id
+    except Exception:
+        pass
+    return str(id(st.session_state))
+
+
+def _datasets_for_upload(raw: bytes, label: str = "upload") -> Optional["PatientDatasets"]:
+    """Return the lazy dataset bundle for this upload from the process-wide registry.
+
+    The bundle is keyed by a hash of the uploaded bytes and shared by all
+    sessions that opened the same export; a rerun with the same file neither
+    decodes nor parses anything again. The session only keeps the hash.
+    """
+    from services.datasets import BACKGROUND_ORDER, PatientDatasets
+    from services.dataset_registry import get_registry
+
+    content_hash = hashlib.blake2b(raw, digest_size=16).hexdigest()
+    registry = get_registry()
+    session_id = _session_id()
+    previous = st.session_state.get('datasets_hash')
+    if previous and previous != content_hash:
+        registry.release(previous, session_id)
+
+    def _create() -> Optional["PatientDatasets"]:
+        # Try utf-8, then latin-1 fallback
+        try:
+            file = raw.decode('utf-8')
+        except UnicodeDecodeError:
+            try:
+                file = raw.decode('latin-1')
+                logger.info("Upload decoded with latin-1 as fallback")
+            except Exception as e:
+                st.error("Hochgeladene Datei kann nicht decodiert werden. Bitte prüfe das Encoding.")
+                logger.exception("Failed to decode upload: %s", e)
+                return None
+        datasets = PatientDatasets(file, DELIMITER=";", label=label, content_hash=content_hash)
+        # Parse in a background worker: the current view first, then the rest.
+        first = VIEW_DATASETS.get(st.session_state.get("view_choice", "Vitals"))
+        datasets.start_background([first] + [n for n in BACKGROUND_ORDER if n != first] if first else BACKGROUND_ORDER)
+        return datasets
+
+    datasets = registry.acquire(content_hash, session_id, _create)
+    if datasets is not None:
+        st.session_state['datasets_hash'] = content_hash
+    return datasets
+
+
+def _record_rerun(scope: str, seconds: float) -> None:
+    """Keep the last RERUN_LOG_SIZE script/fragment timings in session_state (Diagnose)."""
+    timings = st.session_state.setdefault('rerun_timings', [])
+    timings.append({'scope': scope, 'seconds': seconds, 'ts': time.time()})
+    del timings[:-RERUN_LOG_SIZE]
 
 
 def run_app():
+    t_run = time.perf_counter()
     st.set_page_config(page_title="clean-mlife Explorer", layout="wide")
     st.title("clean-mlife — Explorer für 'ALLE Patientendaten'")
 
+    start_preload()
     upload = st.file_uploader("CSV")
     # Support a smoke-test mode: if SMOKE_TEST=1, load a local CSV so the app doesn't wait for manual upload
     if upload is None and os.environ.get('SMOKE_TEST') == '1':
-        sample_path = os.path.join(os.path.dirname(__file__), "data", "gesamte_akte.csv")
+        sample_path = os.environ.get('SMOKE_TEST_FILE') or os.path.join(os.path.dirname(__file__), "data", "gesamte_akte.csv")
         # fallback: project relative path
         if not os.path.exists(sample_path):
             sample_path = os.path.join(os.getcwd(), "data", "gesamte_akte.csv")
@@ -50,42 +196,11 @@ def run_app():
         logger.warning("Upload blocked: file size exceeds limit")
         return
 
-    # Try utf-8, then latin-1 fallback
-    try:
-        file = raw.decode('utf-8')
-    except UnicodeDecodeError:
-        try:
-            file = raw.decode('latin-1')
-            logger.info("Upload decoded with latin-1 as fallback")
-        except Exception as e:
-            st.error("Hochgeladene Datei kann nicht decodiert werden. Bitte prüfe das Encoding.")
-            logger.exception("Failed to decode upload: %s", e)
-            return
-    DELIMITER = ";"
-
-    clean_file = cleanCSV(file)
-    split_blocks = splitBlocks(clean_file, DELIMITER)
-    df_1 = parseNumerics(split_blocks.get("Vitaldaten", {}), DELIMITER)
-    df_2 = parseNumerics(split_blocks.get("Respiratordaten", {}), DELIMITER)
-    df_3 = parseNumerics(split_blocks.get("Labor", {}), DELIMITER)
-    ecmo_df = parse_from_all_patient_data(split_blocks.get("ALLE Patientendaten", {}), "ecmo", DELIMITER)
-    impella_df = parse_from_all_patient_data(split_blocks.get("ALLE Patientendaten", {}), "impella", DELIMITER)
-    crrt_df = parse_from_all_patient_data(split_blocks.get("ALLE Patientendaten", {}), "hämofilter", DELIMITER)
-
-    # Helper to safely extract parameter list from a dataframe for a given sub-category/device
-    def _unique_params_for(dframe, dev):
-        if dframe is None or dframe.empty:
-            return []
-        if 'Sub-Kategorie' not in dframe.columns or 'Parameter' not in dframe.columns:
-            return []
-        ser = dframe.loc[dframe['Sub-Kategorie'] == dev, 'Parameter']
-        # ensure it's a pandas Series
-        if not isinstance(ser, pd.Series):
-            try:
-                ser = pd.Series(ser)
-            except Exception:
-                return []
-        return sorted(ser.dropna().unique().tolist())
+    datasets = _datasets_for_upload(raw, label=getattr(upload, "name", "") or "upload")
+    if datasets is None:
+        return
+    # The stage breakdown grows as datasets get materialized by the views.
+    st.session_state['pipeline_run'] = datasets.run
 
     # Initialize session_state defaults for known widget keys before rendering widgets
     # For main parameter multiselects: default to all available params (if any)
@@ -97,6 +212,8 @@ def run_app():
     st.session_state.setdefault("df2_resp_avg", False)
     st.session_state.setdefault("df3_lab_params", [])
     st.session_state.setdefault("df3_lab_avg", False)
+    st.session_state.setdefault("derived_params", [])
+    st.session_state.setdefault("derived_avg", False)
 
     # NOTE: We intentionally avoid creating per-device session_state keys here.
     # Earlier iterations created keys like "mcs_ecmo_<device>_params" or
@@ -113,63 +230,44 @@ def run_app():
     st.session_state.setdefault('mcs_impella_avg', False)
     st.session_state.setdefault('rrt_params', [])
     st.session_state.setdefault('rrt_avg', False)
+    st.session_state.setdefault('fluid_balance_params', [])
+    st.session_state.setdefault('fluid_balance_avg', False)
+    st.session_state.setdefault('devices_params', [])
+    st.session_state.setdefault('devices_avg', False)
+    st.session_state.setdefault('medications_params', [])
+    st.session_state.setdefault('medications_avg', False)
+    st.session_state.setdefault('scores_params', [])
+    st.session_state.setdefault('scores_avg', False)
 
     # --- Automatic cleanup: remove legacy per-device session_state keys that
     # may have been created in earlier runs. We keep shared per-therapy keys
     # (e.g. 'mcs_ecmo_params', 'rrt_params'). This prevents old keys from
-    # interfering with the shared selection widgets.
-    removed_legacy = []
-    def _devices_from(df):
-        if df is None or df.empty or 'Sub-Kategorie' not in df.columns:
-            return []
-        ser = df['Sub-Kategorie']
-        try:
-            ser = pd.Series(ser)
-        except Exception:
-            return []
-        return sorted(ser.dropna().unique().tolist())
-
-    for dev in _devices_from(ecmo_df):
-        k1 = f"mcs_ecmo_{dev}_params"
-        k2 = f"mcs_ecmo_{dev}_avg"
-        if k1 in st.session_state:
-            st.session_state.pop(k1, None)
-            removed_legacy.append(k1)
-        if k2 in st.session_state:
-            st.session_state.pop(k2, None)
-            removed_legacy.append(k2)
-
-    for dev in _devices_from(impella_df):
-        k1 = f"mcs_impella_{dev}_params"
-        k2 = f"mcs_impella_{dev}_avg"
-        if k1 in st.session_state:
-            st.session_state.pop(k1, None)
-            removed_legacy.append(k1)
-        if k2 in st.session_state:
-            st.session_state.pop(k2, None)
-            removed_legacy.append(k2)
-
-    for dev in _devices_from(crrt_df):
-        k1 = f"rrt_tab_{dev}_params"
-        k2 = f"rrt_tab_{dev}_avg"
-        if k1 in st.session_state:
-            st.session_state.pop(k1, None)
-            removed_legacy.append(k1)
-        if k2 in st.session_state:
-            st.session_state.pop(k2, None)
-            removed_legacy.append(k2)
-
-    if removed_legacy:
-        logger.info("Removed legacy session_state keys: %s", removed_legacy)
-        if ALLOW_STATE_DUMP:
-            try:
-                with open('removed_legacy_keys.log', 'a', encoding='utf-8') as f:
-                    f.write(json.dumps({'removed': removed_legacy, 'ts': time.time()}, default=str) + '\n')
-            except Exception:
-                logger.exception("Failed to write removed_legacy_keys.log")
+    # interfering with the shared selection widgets. Keys are matched by
+    # pattern so the therapy datasets do not have to be parsed for it, and the
+    # scan runs once per upload.
+    if st.session_state.get('_legacy_cleanup_hash') != datasets.content_hash:
+        removed_legacy = [k for k in list(st.session_state.keys()) if isinstance(k, str) and _LEGACY_KEY_RE.match(k)]
+        for k in removed_legacy:
+            st.session_state.pop(k, None)
+        st.session_state['_legacy_cleanup_hash'] = datasets.content_hash
+        if removed_legacy:
+            logger.info("Removed legacy session_state keys: %s", removed_legacy)
+            if ALLOW_STATE_DUMP:
+                try:
+                    with open('removed_legacy_keys.log', 'a', encoding='utf-8') as f:
+                        f.write(json.dumps({'removed': removed_legacy, 'ts': time.time()}, default=str) + '\n')
+                except Exception:
+                    logger.exception("Failed to write removed_legacy_keys.log")
 
-    # global date range + view navigation
-    start_dt, end_dt, view_choice = render_sidebar_navigation([df_1, df_2, df_3])
+    from ui.progress import wait_for_blocks
+    from ui.sidebar import render_sidebar_navigation
+
+    # global date range + view navigation (needs the split blocks, not the parsed datasets)
+    wait_for_blocks(datasets)
+    start_dt, end_dt, view_choice = render_sidebar_navigation(time_bounds=datasets.time_bounds())
+    if SHOW_DIAGNOSTICS:
+        from ui.diagnostics import render_diagnostics
+        render_diagnostics(st.session_state.get('pipeline_run'), st.session_state.get('rerun_timings'))
 
     # NOTE: debug-only UI (persistence debug and state dump) removed to simplify sidebar.
     # If ad-hoc inspection of st.session_state is needed, use the 'Reset Auswahl (Checkboxen)'
@@ -191,27 +289,75 @@ def run_app():
     # persistent panel is not used so views render widgets themselves.
     st.session_state['use_persistent_selection_panel'] = False
 
+    # Everything above runs on full reruns only; toggles inside the view rerun
+    # just the fragment.
+    _render_view(datasets, view_choice, start_dt, end_dt)
+    _record_rerun("App", time.perf_counter() - t_run)
+
+
+@st.fragment
+def _render_view(datasets: "PatientDatasets", view_choice: str, start_dt, end_dt) -> None:
+    """Render the selected view as a Streamlit fragment.
+
+    Widgets inside the view (parameter grids, daily-mean checkboxes, queries)
+    only rerun this function with the arguments of the last full run; upload
+    hashing, session-key setup, the sidebar and the date range are skipped.
+    Navigation and the global date range live outside and still trigger a
+    full rerun.
+
+    Each branch imports only its own view module; start_preload() has usually
+    loaded them all by the time a file is uploaded.
+    """
+    from ui.progress import wait_for_dataset
+
+    t0 = time.perf_counter()
+    # Only the dataset(s) of the selected view are waited for; the background
+    # worker keeps parsing the others and handles memoize results across reruns.
     if view_choice == "Vitals":
-        render_vitals(df_1, label="Vitaldaten", key_prefix="df1_vitals", start_dt=start_dt, end_dt=end_dt)
+        from views.vitals import render_vitals
+        render_vitals(wait_for_dataset(datasets, "vitals", "Vitaldaten"), label="Vitaldaten", key_prefix="df1_vitals", start_dt=start_dt, end_dt=end_dt, matrix_loader=datasets.handle("vitals_matrix").get, dataset_key=(datasets.content_hash, "vitals"))
     elif view_choice == "Respirator":
-        render_respirator(df_2, label="Respiratordaten", key_prefix="df2_resp", start_dt=start_dt, end_dt=end_dt)
+        from views.respirator import render_respirator
+        render_respirator(wait_for_dataset(datasets, "respirator", "Respiratordaten"), label="Respiratordaten", key_prefix="df2_resp", start_dt=start_dt, end_dt=end_dt, matrix_loader=datasets.handle("respirator_matrix").get, dataset_key=(datasets.content_hash, "respirator"))
     elif view_choice == "Labor":
-        render_lab(df_3, label="Labor", key_prefix="df3_lab", start_dt=start_dt, end_dt=end_dt)
+        from views.lab import render_lab
+        render_lab(wait_for_dataset(datasets, "lab", "Labor"), label="Labor", key_prefix="df3_lab", start_dt=start_dt, end_dt=end_dt, matrix_loader=datasets.handle("lab_matrix").get, dataset_key=(datasets.content_hash, "lab"))
     elif view_choice == "MCS - ECMO":
-        render_mcs_ecmo(ecmo_df, key_prefix="mcs_ecmo", start_dt=start_dt, end_dt=end_dt)
+        from views.mcs import render_mcs_ecmo
+        render_mcs_ecmo(wait_for_dataset(datasets, "ecmo", "ECMO"), key_prefix="mcs_ecmo", start_dt=start_dt, end_dt=end_dt, dataset_key=(datasets.content_hash, "ecmo"))
     elif view_choice == "MCS - Impella":
-        render_mcs_impella(impella_df, key_prefix="mcs_impella", start_dt=start_dt, end_dt=end_dt)
+        from views.mcs import render_mcs_impella
+        render_mcs_impella(wait_for_dataset(datasets, "impella", "Impella"), key_prefix="mcs_impella", start_dt=start_dt, end_dt=end_dt, dataset_key=(datasets.content_hash, "impella"))
     elif view_choice == "RRT":
-        render_rrt(crrt_df, key_prefix="rrt_tab", start_dt=start_dt, end_dt=end_dt)
+        from views.rrt import render_rrt
+        render_rrt(wait_for_dataset(datasets, "rrt", "RRT"), key_prefix="rrt_tab", start_dt=start_dt, end_dt=end_dt, dataset_key=(datasets.content_hash, "rrt"))
+    elif view_choice == "Bilanz":
+        from views.balance import render_balance
+        render_balance(wait_for_dataset(datasets, "fluid_balance", "Bilanz"), key_prefix="fluid_balance", start_dt=start_dt, end_dt=end_dt)
+    elif view_choice == "Notizen":
+        from views.notes import render_notes
+        render_notes(wait_for_dataset(datasets, "notes_index", "Notizen"), key_prefix="notes", start_dt=start_dt, end_dt=end_dt)
+    elif view_choice == "Abgeleitet":
+        from views.numeric_view import render_numeric_view
+        render_numeric_view(wait_for_dataset(datasets, "derived", "Abgeleitete Werte"), label="Abgeleitete Werte", key_prefix="derived", start_dt=start_dt, end_dt=end_dt, matrix_loader=datasets.handle("derived_matrix").get, dataset_key=(datasets.content_hash, "derived"))
+    elif view_choice == "Scores":
+        from views.scores import render_scores
+        render_scores(wait_for_dataset(datasets, "scores", "Scores"), key_prefix="scores", start_dt=start_dt, end_dt=end_dt)
+    elif view_choice == "Katheter/Drainagen":
+        from services.device_intervals import therapy_runs
+        from views.devices import render_devices
+        # therapy runs are only parsed when the "Therapie-Lauf" query is used
+        def runs_loader():
+            return therapy_runs({label: wait_for_dataset(datasets, name, label) for label, name in (("ECMO", "ecmo"), ("Impella", "impella"), ("RRT", "rrt"))})
+        render_devices(wait_for_dataset(datasets, "device_index", "Katheter/Drainagen"), key_prefix="devices", start_dt=start_dt, end_dt=end_dt, runs_loader=runs_loader)
     elif view_choice == "Übersicht":
         from views.overview import render_overview
         # Pass the actual DataFrames so overview can build editable copies
-        dfs = {
-            'df1_vitals': df_1,
-            'df2_resp': df_2,
-            'df3_lab': df_3,
-            'mcs_ecmo': ecmo_df,
-            'mcs_impella': impella_df,
-            'rrt_tab': crrt_df,
-        }
-        render_overview(dfs=dfs, key_prefixes=["df1_vitals", "df2_resp", "df3_lab", "mcs_ecmo", "mcs_impella", "rrt_tab"], start_dt=start_dt, end_dt=end_dt)
+        dfs = {prefix: wait_for_dataset(datasets, name) for prefix, name in OVERVIEW_DATASETS.items()}
+        dataset_keys = {prefix: (datasets.content_hash, name) for prefix, name in OVERVIEW_DATASETS.items()}
+        render_overview(dfs=dfs, key_prefixes=list(OVERVIEW_DATASETS), start_dt=start_dt, end_dt=end_dt, dataset_keys=dataset_keys)
+    seconds = time.perf_counter() - t0
+    _record_rerun(f"Ansicht: {view_choice}", seconds)
+    if SHOW_DIAGNOSTICS:
+        full = next((r for r in reversed(st.session_state.get('rerun_timings', [])) if r['scope'] == "App"), None)
+        st.caption(f"Ansicht in {seconds * 1000:.0f} ms gerendert" + (f" — letzter vollständiger Lauf {full['seconds'] * 1000:.0f} ms" if full else ""))
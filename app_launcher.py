@@ -5,6 +5,10 @@ from pathlib import Path
 # Wir setzen argv so, als würden wir `streamlit run app.py` ausführen.
 
 if __name__ == "__main__":
+    # Worker des ProcessPoolExecutor (spawn) starten das EXE erneut; ohne
+    # freeze_support liefe in jedem Worker der ganze Launcher noch einmal.
+    import multiprocessing
+    multiprocessing.freeze_support()
     import platform
     script = "app.py"
     exe_dir = Path(sys.executable).parent if getattr(sys, "frozen", False) else Path(__file__).parent
@@ -16,6 +20,13 @@ if __name__ == "__main__":
         pass
     # Setze die Serveradresse auf 127.0.0.1, um die lokale Begrenzung zu aktivieren
     sys.argv = ["streamlit", "run", script, "--server.headless=true", "--server.address=127.0.0.1"]
+    # pandas, Parser und Views schon importieren, während der Server startet und
+    # sich der Browser verbindet; app.py findet sie danach in sys.modules.
+    try:
+        from app_core import start_preload
+        start_preload()
+    except Exception as e:
+        print("Vorladen übersprungen:", e)
     try:
         from streamlit.web import cli as stcli
         sys.exit(stcli.main())
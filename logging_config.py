@@ -15,3 +15,9 @@ def configure_logging():
     logger.addHandler(handler)
 
     return logger
+
+
+def get_pipeline_logger():
+    """Logger für die Stufen-Messwerte der Parsing-Pipeline (services/instrumentation.py)."""
+    configure_logging()
+    return logging.getLogger("clean_mlife.pipeline")
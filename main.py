@@ -20,7 +20,7 @@ def main():
     df_2 = parseNumerics(split_blocks["Respiratordaten"], DELIMITER)
     df_3 = parseNumerics(split_blocks["Labor"], DELIMITER)
     # Medikationsdaten mit spezialisiertem Parser extrahieren
-    df_4 = parseMedications(split_blocks, DELIMITER)
+    df_4 = parseMedications(split_blocks["Medikamentengaben"], DELIMITER)
     ecmo_df = parse_from_all_patient_data(split_blocks["ALLE Patientendaten"], "ecmo", DELIMITER)
     impella_df = parse_from_all_patient_data(split_blocks["ALLE Patientendaten"], "impella", DELIMITER)
     crrt_df = parse_from_all_patient_data(split_blocks["ALLE Patientendaten"], "hämofilter", DELIMITER)
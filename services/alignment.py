@@ -0,0 +1,236 @@
+import re
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+DIRECTIONS = ("backward", "forward", "nearest")
+LONG_COLUMNS = ["panel", "parameter", "unit", "timestamp", "timestamp_parsed", "value_raw", "value"]
+
+
+def select_series(df: Optional[pd.DataFrame], parameter: Union[str, re.Pattern], panel: Optional[str] = None) -> pd.DataFrame:
+    """Messreihe eines Parameters aus einem geparsten Datensatz, nach Zeit sortiert.
+
+    Versteht das Long-Format der Zahlenblöcke (parameter/value/panel) und das der
+    Therapie-Datensätze (Parameter/value_numeric/Sub-Kategorie). Ergebnis:
+    timestamp_parsed, value, group (Gerät bzw. Panel).
+    """
+    out = pd.DataFrame({"timestamp_parsed": pd.Series(dtype="datetime64[ns]"), "value": pd.Series(dtype=float), "group": pd.Series(dtype=object)})
+    if df is None or df.empty:
+        return out
+    if "Parameter" in df.columns:
+        names, values, groups = df["Parameter"], df.get("value_numeric", pd.Series(np.nan, index=df.index)), df["Sub-Kategorie"]
+    else:
+        groups = df["panel"] if "panel" in df.columns else pd.Series(None, index=df.index, dtype=object)
+        names, values = df["parameter"], df["value"]
+    if isinstance(parameter, re.Pattern):
+        mask = names.astype(str).str.contains(parameter)
+    else:
+        mask = names == parameter
+    if panel is not None:
+        mask &= groups.astype(str).str.contains(panel, regex=False)
+    sel = pd.DataFrame({
+        "timestamp_parsed": df.loc[mask, "timestamp_parsed"],
+        "value": pd.to_numeric(values[mask], errors="coerce"),
+        "group": groups[mask].astype(object),
+    })
+    sel = sel[sel["timestamp_parsed"].notna() & sel["value"].notna()]
+    return sel.sort_values("timestamp_parsed", kind="stable").reset_index(drop=True) if len(sel) else out
+
+
+def _match(left_t: np.ndarray, right_t: np.ndarray, tol: int, direction: str) -> np.ndarray:
+    """Index in `right_t` (sortiert) je Zeitpunkt in `left_t`, -1 ohne Treffer innerhalb `tol` ns."""
+    n = len(right_t)
+    if n == 0:
+        return np.full(len(left_t), -1)
+    before = np.searchsorted(right_t, left_t, side="right") - 1
+    after = np.searchsorted(right_t, left_t, side="left")
+    gap_before = np.where(before >= 0, left_t - right_t[np.clip(before, 0, n - 1)], np.iinfo(np.int64).max)
+    gap_after = np.where(after < n, right_t[np.clip(after, 0, n - 1)] - left_t, np.iinfo(np.int64).max)
+    if direction == "backward":
+        idx, gap = before, gap_before
+    elif direction == "forward":
+        idx, gap = after, gap_after
+    else:
+        take_after = gap_after < gap_before
+        idx, gap = np.where(take_after, after, before), np.where(take_after, gap_after, gap_before)
+    return np.where(gap <= tol, idx, -1)
+
+
+def align_asof(
+    left: pd.DataFrame,
+    right: pd.DataFrame,
+    tolerance: pd.Timedelta = pd.Timedelta(hours=1),
+    direction: str = "backward",
+    by_group: bool = False,
+) -> pd.DataFrame:
+    """Ordne jedem Wert von `left` den passenden Wert von `right` zu (as-of-Join).
+
+    `backward` nimmt den letzten Wert von `right` bis einschließlich zum
+    Zeitpunkt von `left` (z.B. die Beatmungseinstellung vor der BGA), `forward`
+    den nächsten, `nearest` den zeitlich nächsten. Weiter als `tolerance`
+    entfernte Werte gelten als fehlend. Mit `by_group` wird nur innerhalb
+    derselben Gruppe (z.B. ECMO-Gerät) gesucht. Beide Seiten im Format von
+    `select_series`; gesucht wird per binärer Suche über die sortierten
+    Zeitstempel, vektorisiert für den ganzen Aufenthalt.
+
+    Ergebnis je Zeile von `left`: timestamp_parsed, value_left, value_right,
+    time_right, lag (left - right), group.
+    """
+    if direction not in DIRECTIONS:
+        raise ValueError(f"direction must be one of {DIRECTIONS}, got {direction!r}")
+    tol = int(pd.Timedelta(tolerance).value)
+    right = right.sort_values("timestamp_parsed", kind="stable")
+    rt = right["timestamp_parsed"].to_numpy(dtype="datetime64[ns]").astype(np.int64)
+    lt = left["timestamp_parsed"].to_numpy(dtype="datetime64[ns]").astype(np.int64)
+    idx = np.full(len(left), -1)
+    groups = left["group"].to_numpy() if "group" in left.columns else np.full(len(left), None)
+    if by_group:
+        # Gruppen nacheinander, innerhalb einer Gruppe vektorisiert
+        right_groups = right["group"].to_numpy()
+        for g in pd.unique(right_groups):
+            r_pos = np.flatnonzero(right_groups == g)
+            l_pos = np.flatnonzero(groups == g)
+            hit = _match(lt[l_pos], rt[r_pos], tol, direction)
+            idx[l_pos] = np.where(hit >= 0, r_pos[np.clip(hit, 0, None)], -1)
+    else:
+        idx = _match(lt, rt, tol, direction)
+    found = idx >= 0
+    if len(right):
+        safe = np.clip(idx, 0, None)
+        value_right = np.where(found, right["value"].to_numpy()[safe], np.nan)
+        time_right = pd.Series(rt[safe].astype("datetime64[ns]")).where(found)
+        group = np.where(found, right["group"].to_numpy()[safe], groups)
+    else:
+        value_right = np.full(len(left), np.nan)
+        time_right = pd.Series(pd.NaT, index=range(len(left)), dtype="datetime64[ns]")
+        group = groups
+    time_left = pd.Series(left["timestamp_parsed"].to_numpy(dtype="datetime64[ns]"))
+    return pd.DataFrame({
+        "timestamp_parsed": time_left,
+        "value_left": left["value"].to_numpy(),
+        "value_right": value_right,
+        "time_right": time_right,
+        "lag": time_left - time_right,
+        "group": group,
+    })
+
+
+@dataclass(frozen=True)
+class SeriesRef:
+    """Verweis auf eine Messreihe: Datensatz-Name in `PatientDatasets`, Parameter, optional Panel/Gerät."""
+
+    dataset: str
+    parameter: Union[str, re.Pattern]
+    panel: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class DerivedParameter:
+    """Abgeleiteter Parameter aus zwei as-of ausgerichteten Messreihen.
+
+    `combine(left, right)` bekommt die Werte-Arrays der Paare und liefert den
+    abgeleiteten Wert (NaN wird verworfen).
+    """
+
+    name: str
+    unit: Optional[str]
+    left: SeriesRef
+    right: SeriesRef
+    combine: Callable[[np.ndarray, np.ndarray], np.ndarray]
+    tolerance: pd.Timedelta = pd.Timedelta(hours=1)
+    direction: str = "backward"
+    by_group: bool = False
+    # Gerät im Parameternamen, z.B. "ECMO Gasfluss zur BGA (ECMO 1)"
+    label_group: bool = False
+
+
+DERIVED_PARAMETERS: Dict[str, DerivedParameter] = {}
+
+
+def register_derived(param: DerivedParameter) -> DerivedParameter:
+    DERIVED_PARAMETERS[param.name] = param
+    return param
+
+
+def _fio2_fraction(fio2: np.ndarray) -> np.ndarray:
+    # FiO2 wird teils in %, teils als Anteil dokumentiert
+    return np.where(fio2 > 1.0, fio2 / 100.0, fio2)
+
+
+def _ratio(left: np.ndarray, right: np.ndarray) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(right > 0, left / right, np.nan)
+
+
+register_derived(DerivedParameter(
+    name="PaO2/FiO2 (Horovitz)",
+    unit="mmHg",
+    left=SeriesRef("lab", "PO2", panel="arteriell"),
+    right=SeriesRef("respirator", "FiO2"),
+    combine=lambda po2, fio2: _ratio(po2, _fio2_fraction(fio2)),
+))
+register_derived(DerivedParameter(
+    name="ECMO Gasfluss zur BGA",
+    unit="l/min",
+    left=SeriesRef("lab", "PCO2", panel="arteriell"),
+    right=SeriesRef("ecmo", re.compile(r"^Gasfluss")),
+    combine=lambda pco2, sweep: sweep,
+    label_group=True,
+))
+register_derived(DerivedParameter(
+    name="Schockindex (HF/ARTs)",
+    unit=None,
+    left=SeriesRef("vitals", "HF"),
+    right=SeriesRef("vitals", "ARTs"),
+    combine=_ratio,
+    tolerance=pd.Timedelta(minutes=5),
+    direction="nearest",
+))
+
+
+def compute_derived(param: DerivedParameter, frames: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """Ein abgeleiteter Parameter über den ganzen Aufenthalt im Long-Format der Zahlenblöcke."""
+    left = select_series(frames.get(param.left.dataset), param.left.parameter, param.left.panel)
+    right = select_series(frames.get(param.right.dataset), param.right.parameter, param.right.panel)
+    if left.empty or right.empty:
+        return pd.DataFrame(columns=LONG_COLUMNS)
+    pairs = align_asof(left, right, tolerance=param.tolerance, direction=param.direction, by_group=param.by_group)
+    pairs = pairs[pairs["value_right"].notna()]
+    values = param.combine(pairs["value_left"].to_numpy(), pairs["value_right"].to_numpy())
+    name = pd.Series(param.name, index=pairs.index)
+    if param.label_group:
+        name = name + " (" + pairs["group"].astype(str) + ")"
+    out = pd.DataFrame({
+        "panel": "Abgeleitet",
+        "parameter": name.to_numpy(),
+        "unit": param.unit,
+        "timestamp_parsed": pairs["timestamp_parsed"].to_numpy(),
+        "value": np.asarray(values, dtype=float),
+    })
+    out = out[np.isfinite(out["value"])]
+    out["timestamp"] = out["timestamp_parsed"].dt.strftime("%d.%m.%y %H:%M")
+    out["value_raw"] = out["value"].round(2).astype(str)
+    return out.reset_index(drop=True)[LONG_COLUMNS]
+
+
+def derived_long(frames: Dict[str, pd.DataFrame], names: Optional[Iterable[str]] = None) -> pd.DataFrame:
+    """Alle (oder die genannten) registrierten abgeleiteten Parameter in einem Frame."""
+    selected: List[DerivedParameter] = [DERIVED_PARAMETERS[n] for n in (names if names is not None else DERIVED_PARAMETERS)]
+    parts = [compute_derived(p, frames) for p in selected]
+    parts = [p for p in parts if not p.empty]
+    if not parts:
+        return pd.DataFrame(columns=LONG_COLUMNS)
+    return pd.concat(parts, ignore_index=True).sort_values(["timestamp_parsed", "parameter"], kind="stable").reset_index(drop=True)
+
+
+def required_datasets(names: Optional[Iterable[str]] = None) -> List[str]:
+    """Datensätze, die für die (genannten) abgeleiteten Parameter gebraucht werden."""
+    out: List[str] = []
+    for n in (names if names is not None else DERIVED_PARAMETERS):
+        p = DERIVED_PARAMETERS[n]
+        for ds in (p.left.dataset, p.right.dataset):
+            if ds not in out:
+                out.append(ds)
+    return out
@@ -0,0 +1,136 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Optional
+
+from logging_config import get_pipeline_logger
+from services.datasets import PatientDatasets
+from services.result_cache import get_result_cache
+
+logger = get_pipeline_logger()
+
+# Obergrenze für alle geteilten Datensätze des Prozesses (MB)
+REGISTRY_MAX_MB = int(os.environ.get("DATASET_REGISTRY_MAX_MB", 1024))
+# Nach dieser Zeit ohne Zugriff gilt die Referenz einer Session als verwaist
+SESSION_IDLE_SECONDS = float(os.environ.get("DATASET_REGISTRY_SESSION_IDLE_S", 1800))
+
+
+@dataclass
+class _Entry:
+    datasets: PatientDatasets
+    sessions: Dict[str, float] = field(default_factory=dict)
+    last_used: float = field(default_factory=time.time)
+
+
+class DatasetRegistry:
+    """Prozessweite, nach Inhalts-Hash geteilte PatientDatasets.
+
+    Mehrere Sessions mit demselben Export teilen sich ein Bundle (und damit einen
+    Parse und eine Kopie der Frames). Jede Session hält eine Referenz, die bei
+    jedem Zugriff erneuert wird; Referenzen, die länger als `session_idle_s`
+    nicht genutzt wurden, zählen nicht mehr. Überschreitet der Speicher aller
+    Bundles `max_bytes`, werden unreferenzierte Bundles in LRU-Reihenfolge
+    entfernt.
+    """
+
+    def __init__(self, max_bytes: int = REGISTRY_MAX_MB * 1024 * 1024, session_idle_s: float = SESSION_IDLE_SECONDS):
+        self.max_bytes = max_bytes
+        self.session_idle_s = session_idle_s
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._lock = threading.RLock()
+
+    def acquire(self, content_hash: str, session_id: str, factory: Callable[[], Optional[PatientDatasets]]) -> Optional[PatientDatasets]:
+        """Bundle für `content_hash` holen oder mit `factory` anlegen und für `session_id` referenzieren."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(content_hash)
+            if entry is None:
+                datasets = factory()
+                if datasets is None:
+                    return None
+                entry = _Entry(datasets=datasets)
+                self._entries[content_hash] = entry
+                # die Frames entstehen erst nach acquire (lazy, Hintergrund-Worker): nach jedem
+                # fertig geladenen Datensatz erneut gegen die Obergrenze prüfen
+                datasets.add_load_listener(self._on_dataset_loaded)
+                logger.info("registry: new dataset %s (%d entries)", content_hash[:12], len(self._entries))
+            entry.sessions[session_id] = now
+            entry.last_used = now
+            self._entries.move_to_end(content_hash)
+            self.evict()
+            return entry.datasets
+
+    def release(self, content_hash: str, session_id: str) -> None:
+        with self._lock:
+            entry = self._entries.get(content_hash)
+            if entry is not None:
+                entry.sessions.pop(session_id, None)
+
+    def refcount(self, content_hash: str) -> int:
+        with self._lock:
+            entry = self._entries.get(content_hash)
+            return self._active_sessions(entry, time.time()) if entry is not None else 0
+
+    def _active_sessions(self, entry: _Entry, now: float) -> int:
+        for sid, seen in list(entry.sessions.items()):
+            if now - seen > self.session_idle_s:
+                del entry.sessions[sid]
+        return len(entry.sessions)
+
+    @property
+    def nbytes(self) -> int:
+        with self._lock:
+            return sum(e.datasets.nbytes for e in self._entries.values())
+
+    def _on_dataset_loaded(self, name: str) -> None:
+        self.evict()
+
+    def evict(self) -> list:
+        """Entferne unreferenzierte Bundles (LRU zuerst), bis der Speicher unter `max_bytes` liegt.
+
+        Läuft bei jedem `acquire` und nach jedem geladenen Datensatz eines Bundles.
+        Der Hintergrund-Worker eines entfernten Bundles wird angehalten, damit er
+        nicht in Speicher weiterparst, den keine Session mehr nutzt.
+        """
+        removed = []
+        now = time.time()
+        with self._lock:
+            total = self.nbytes
+            for content_hash in list(self._entries):
+                if total <= self.max_bytes:
+                    break
+                entry = self._entries[content_hash]
+                if self._active_sessions(entry, now):
+                    continue
+                total -= entry.datasets.nbytes
+                del self._entries[content_hash]
+                entry.datasets.stop_background()
+                removed.append(content_hash)
+        if removed:
+            # Ansichts-Ergebnisse verworfener Exporte werden nicht mehr abgefragt
+            results = get_result_cache()
+            for content_hash in removed:
+                results.discard(content_hash)
+            logger.info("registry: evicted %s, %.1f MB in use", [h[:12] for h in removed], total / 1e6)
+        return removed
+
+    def __contains__(self, content_hash: str) -> bool:
+        return content_hash in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_REGISTRY: Optional[DatasetRegistry] = None
+_REGISTRY_LOCK = threading.Lock()
+
+
+def get_registry() -> DatasetRegistry:
+    """Die Registry des Prozesses (von allen Streamlit-Sessions geteilt)."""
+    global _REGISTRY
+    with _REGISTRY_LOCK:
+        if _REGISTRY is None:
+            _REGISTRY = DatasetRegistry()
+        return _REGISTRY
@@ -0,0 +1,456 @@
+import hashlib
+import re
+import threading
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import pandas as pd
+
+from logging_config import get_pipeline_logger
+from services.alignment import derived_long
+from services.alignment import required_datasets as derived_datasets
+from services.clean_csv import cleanCSV
+from services.device_intervals import INTERVAL_BLOCKS, DeviceIntervalIndex, daily_presence_long, parseIntervals
+from services.instrumentation import PipelineRun
+from services.fluid_balance import daily_balance_long, parseBilanz, rrt_net_removal
+from services.medication_doses import DoseCurves, daily_dose_long
+from services.note_index import NoteIndex
+from services.parseMedications import parseMedications
+from services.plausibility import flag_values
+from services.parse_documentation import parseDocumentation
+from services import parse_from_all_patient_data as therapy_parser
+from services.parse_from_all_patient_data import parse_all_patient_data_sections, parse_from_all_patient_data
+from services.param_matrix import ParameterMatrix
+from services.parse_numerics import DATE_RE, parseNumerics
+from services.scores import evaluate_scores, scores_long
+from services.scores import required_datasets as score_datasets
+from services.section_index import SectionIndex
+from services.source_merge import MERGE_RULES, merge_sources
+from services.split_blocks import splitBlocks
+from services.units import normalize_units
+
+logger = get_pipeline_logger()
+
+
+def _block_bytes(block) -> int:
+    if isinstance(block, str):
+        return len(block)
+    if isinstance(block, dict):
+        return sum(_block_bytes(v) for v in block.values())
+    return 0
+
+
+def _frame_nbytes(df) -> int:
+    if isinstance(df, pd.DataFrame):
+        return int(df.memory_usage(index=True, deep=True).sum())
+    # abgeleitete Strukturen (Indizes, Caches) schätzen ihre Größe selbst
+    return int(getattr(df, "nbytes", 0) or 0)
+
+
+def _freeze(df):
+    """Mache die Spalten-Arrays eines geteilten Frames schreibgeschützt.
+
+    Schreibzugriffe auf die Werte (z.B. `df.loc[...] = x`) schlagen dann fehl,
+    statt die Daten anderer Sessions zu verändern.
+    """
+    if not isinstance(df, pd.DataFrame):
+        return df
+    for arr in getattr(df._mgr, "arrays", []):
+        flags = getattr(arr, "flags", None)
+        if flags is not None:
+            try:
+                flags.writeable = False
+            except ValueError:
+                pass
+    return df
+
+
+def read_only_view(df):
+    """Flache Kopie eines geteilten Frames: eigene Spalten-/Index-Objekte, gemeinsame Daten.
+
+    Neue Spalten oder Umbenennungen bleiben lokal; die Werte selbst sind über
+    `_freeze` schreibgeschützt.
+    """
+    return df.copy(deep=False) if isinstance(df, pd.DataFrame) else df
+
+
+class LazyDataset:
+    """Memoisierter Handle auf einen geparsten Datensatz.
+
+    Der Loader läuft erst beim ersten `get()` und genau einmal, auch wenn mehrere
+    Threads (z.B. Hintergrund-Worker und Skript-Thread) gleichzeitig zugreifen;
+    danach wird das Ergebnis wiederverwendet. Ein Fehler des Loaders wird
+    gespeichert und bei jedem `get()` erneut ausgelöst. `on_load(name)` wird
+    nach einem erfolgreichen Laden einmal aufgerufen.
+    """
+
+    def __init__(self, name: str, loader: Callable[[], pd.DataFrame], on_load: Optional[Callable[[str], None]] = None):
+        self.name = name
+        self._loader = loader
+        self._on_load = on_load
+        self._value: Optional[pd.DataFrame] = None
+        self._error: Optional[BaseException] = None
+        self._loaded = False
+        self.nbytes = 0
+        self._running = False
+        self._done = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._loaded
+
+    @property
+    def status(self) -> str:
+        if self._loaded:
+            return "ready"
+        if self._error is not None:
+            return "error"
+        return "running" if self._running else "pending"
+
+    def get(self) -> pd.DataFrame:
+        if self._loaded:
+            return self._value
+        loaded_now = False
+        with self._lock:
+            if self._error is not None:
+                raise self._error
+            if not self._loaded:
+                self._running = True
+                try:
+                    self._value = _freeze(self._loader())
+                    self.nbytes = _frame_nbytes(self._value)
+                    self._loaded = True
+                except Exception as e:
+                    self._error = e
+                    raise
+                finally:
+                    self._running = False
+                    self._done.set()
+                loaded_now = True
+        if loaded_now and self._on_load is not None:
+            # außerhalb des Locks: der Callback darf selbst Datensätze abfragen
+            try:
+                self._on_load(self.name)
+            except Exception:
+                logger.exception("on_load callback failed: %s", self.name)
+        return self._value
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Warte höchstens `timeout` Sekunden auf das Ergebnis (auch bei Fehler fertig)."""
+        return self._done.wait(timeout)
+
+    def peek(self) -> Optional[pd.DataFrame]:
+        """Ergebnis, falls bereits geladen — ohne einen Parse auszulösen."""
+        return self._value if self._loaded else None
+
+
+# Datensatz-Name -> (Block-Kategorie aus services/headers.py, Parser)
+NUMERIC_DATASETS = {
+    "vitals": "Vitaldaten",
+    "respirator": "Respiratordaten",
+    "lab": "Labor",
+}
+THERAPY_DATASETS = {
+    "ecmo": "ecmo",
+    "impella": "impella",
+    "rrt": "hämofilter",
+}
+# Datensätze im Long-Format, zu denen eine Parameter × Zeit-Matrix registriert wird ("<name>_matrix")
+MATRIX_DATASETS = [*NUMERIC_DATASETS, "derived"]
+# Reihenfolge des Hintergrund-Parsens, sofern keine Ansicht vorgezogen wird
+BACKGROUND_ORDER = ["vitals", "respirator", "lab", "ecmo", "impella", "rrt", "fluid_balance", "notes_index", "device_index", "medication_daily", "derived", "scores_daily"]
+
+
+@dataclass
+class ParseProgress:
+    """Fortschritt eines Uploads, gewichtet nach der Größe der Quellblöcke in Bytes."""
+
+    done_bytes: int
+    total_bytes: int
+    current: Optional[str]
+    ready: List[str]
+
+    @property
+    def fraction(self) -> float:
+        return min(1.0, self.done_bytes / self.total_bytes) if self.total_bytes else 1.0
+
+
+class PatientDatasets:
+    """Alle Datensätze eines Uploads als lazy Handles.
+
+    cleanCSV/splitBlocks laufen beim ersten Zugriff auf irgendeinen Datensatz, die
+    einzelnen Parser erst, wenn ihr Datensatz gebraucht wird. Alle Stufen werden in
+    `run` (services/instrumentation.py) protokolliert.
+    """
+
+    def __init__(self, text: str, DELIMITER: str = ";", label: str = "", content_hash: Optional[str] = None):
+        self.text = text
+        self.DELIMITER = DELIMITER
+        self.content_hash = content_hash or hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).hexdigest()
+        self.run = PipelineRun(label=label or self.content_hash[:12])
+        self._load_listeners: List[Callable[[str], None]] = []
+        self._blocks = LazyDataset("blocks", self._load_blocks, on_load=self._notify_loaded)
+        self._section_index = LazyDataset("section_index", self._load_section_index, on_load=self._notify_loaded)
+        self._handles: Dict[str, LazyDataset] = {}
+        self._sources: Dict[str, Tuple[str, ...]] = {}
+        self._pending: List[str] = []
+        self._pending_lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+        self._worker_done = False
+        self._bounds: Dict[tuple, tuple] = {}
+        for name, category in NUMERIC_DATASETS.items():
+            self.register(name, lambda c=category: self._load_numeric(c), stage=f"parseNumerics[{category}]", source=category)
+        for name, query in THERAPY_DATASETS.items():
+            self.register(name, lambda n=name, q=query: self._load_therapy(n, q), stage=f"parse_from_all_patient_data[{query}]", source="ALLE Patientendaten")
+        # großer Block: alle Therapie-Abfragen in einem Durchlauf, Abschnitte im Prozess-Pool geparst.
+        # Ohne `source`, damit der Fortschritt den Block nicht doppelt zählt (die Frames gehören
+        # weiterhin den Handles ecmo/impella/rrt).
+        self.register(
+            "therapy_sections",
+            lambda: parse_all_patient_data_sections(self.blocks.get("ALLE Patientendaten", {}), THERAPY_DATASETS, self.DELIMITER, index=self.section_index),
+            stage="parse_all_patient_data_sections",
+        )
+        self.register("medications", lambda: parseMedications(self.blocks.get("Medikamentengaben", {}), self.DELIMITER), stage="parseMedications", source="Medikamentengaben")
+        self.register("notes", lambda: parseDocumentation(self.blocks.get("Dokumentation", {}), self.DELIMITER), stage="parseDocumentation", source="Dokumentation")
+        self.register("bilanz", lambda: parseBilanz(self.blocks.get("Bilanz", {}), self.DELIMITER), stage="parseBilanz", source="Bilanz")
+        # abgeleitet: Parameter aus as-of ausgerichteten Messreihen (services/alignment.py)
+        self.register("derived", lambda: derived_long({n: self.handle(n).get() for n in derived_datasets()}), stage="derived_parameters")
+        # abgeleitet: Scores (services/scores.py) je Tag aus allen benötigten Datensätzen
+        self.register("scores", lambda: evaluate_scores({n: self.handle(n).get() for n in score_datasets()}), stage="evaluate_scores")
+        self.register("scores_daily", lambda: scores_long(self.handle("scores").get()), stage="scores_long")
+        # abgeleitet: Parameter × Zeit-Matrizen (dicht oder CSR), einmal je Datensatz
+        for name in MATRIX_DATASETS:
+            self.register(f"{name}_matrix", lambda n=name: ParameterMatrix(self.handle(n).get()), stage=f"ParameterMatrix[{name}]")
+        # abgeleitet: Dosiskurven der Perfusoren und Tagesdosen/-maxima im Format der Zahlen-Views
+        self.register("dose_curves", lambda: DoseCurves(self.handle("medications").get(), until=self.time_bounds()[1]), stage="DoseCurves")
+        self.register("medication_daily", lambda: daily_dose_long(self.handle("dose_curves").get().daily()), stage="daily_doses")
+        # abgeleitet: Bilanz inkl. Hämofilter-Entzug und Tagesbilanz im Format der Zahlen-Views
+        self.register("fluid_balance", self._load_fluid_balance, stage="fluid_balance")
+        self.register("balance_daily", lambda: daily_balance_long(self.handle("fluid_balance").get()), stage="daily_balance")
+        # abgeleitet: Volltextindex über die Notizen
+        self.register("notes_index", lambda: NoteIndex(self.handle("notes").get()), stage="NoteIndex")
+        # Liegezeiten von Kathetern, Drainagen und Wunden mit Intervallindex und Tagespräsenz
+        self.register("device_intervals", self._load_device_intervals, stage="parseIntervals", source=INTERVAL_BLOCKS)
+        self.register("device_index", lambda: DeviceIntervalIndex(self.handle("device_intervals").get()), stage="DeviceIntervalIndex")
+        self.register(
+            "device_presence_daily",
+            lambda: daily_presence_long(self.handle("device_intervals").get(), until=self.time_bounds()[1]),
+            stage="daily_presence",
+        )
+
+    def _load_numeric(self, category: str) -> pd.DataFrame:
+        parsed = parseNumerics(self.blocks.get(category, {}), self.DELIMITER)
+        # gleiche Analyten in verschiedenen Einheiten (mg/dl vs µmol/l, kPa vs mmHg) vereinheitlichen
+        normalized = self.run.stage(f"normalize_units[{category}]", normalize_units, parsed)
+        # Fehleingaben (MAP 700, Temperatur 3,7) und Werte außerhalb des Referenzbereichs markieren
+        flagged = self.run.stage(f"flag_values[{category}]", flag_values, normalized)
+        if category not in MERGE_RULES:
+            return flagged
+        # Online- und manuelle Quellen derselben Kategorie: Mehrfachwerte nach Priorität entfernen
+        return self.run.stage(f"merge_sources[{category}]", merge_sources, flagged, MERGE_RULES[category])
+
+    def _load_therapy(self, name: str, query) -> pd.DataFrame:
+        block = self.blocks.get("ALLE Patientendaten", {})
+        text = block.get("ALLE Patientendaten") or ""
+        if therapy_parser.PARALLEL_WORKERS > 1 and len(text) >= therapy_parser.PARALLEL_MIN_BYTES:
+            return self.handle("therapy_sections").get()[name]
+        return parse_from_all_patient_data(block, query, self.DELIMITER, index=self.section_index)
+
+    def _load_fluid_balance(self) -> pd.DataFrame:
+        removal = rrt_net_removal(self.handle("rrt").get())
+        bilanz = self.handle("bilanz").get()
+        parts = [df for df in (bilanz, removal) if not df.empty]
+        if not parts:
+            return bilanz
+        return pd.concat(parts, ignore_index=True).sort_values("timestamp_parsed", kind="stable").reset_index(drop=True)
+
+    def _load_device_intervals(self) -> pd.DataFrame:
+        data = {
+            kind: "\n".join(t for t in self.blocks.get(kind, {}).values() if isinstance(t, str))
+            for kind in INTERVAL_BLOCKS
+        }
+        return parseIntervals(data, self.DELIMITER)
+
+    def _load_blocks(self) -> dict:
+        clean = self.run.stage("cleanCSV", cleanCSV, self.text)
+        return self.run.stage("splitBlocks", splitBlocks, clean, self.DELIMITER)
+
+    @property
+    def blocks(self) -> dict:
+        return self._blocks.get()
+
+    @property
+    def section_index(self) -> Optional[SectionIndex]:
+        """Einmal aufgebauter Index über "ALLE Patientendaten" für alle Therapie-Abfragen."""
+        return self._section_index.get()
+
+    def _load_section_index(self) -> Optional[SectionIndex]:
+        text = self.blocks.get("ALLE Patientendaten", {}).get("ALLE Patientendaten")
+        if text is None:
+            return None
+        return self.run.stage("SectionIndex[ALLE Patientendaten]", SectionIndex, text, self.DELIMITER)
+
+    def register(self, name: str, loader: Callable[[], pd.DataFrame], stage: Optional[str] = None,
+                 source: Union[str, Sequence[str], None] = None) -> LazyDataset:
+        """Registriere einen (ggf. abgeleiteten) Datensatz; er wird erst bei Bedarf berechnet.
+
+        `source` ist die Block-Kategorie (oder alle Kategorien, die der Loader liest),
+        deren Größe den Fortschritt gewichtet.
+        """
+        label = stage or name
+        handle = LazyDataset(name, lambda: self.run.stage(label, loader), on_load=self._notify_loaded)
+        self._handles[name] = handle
+        if source:
+            self._sources[name] = (source,) if isinstance(source, str) else tuple(source)
+        return handle
+
+    def handle(self, name: str) -> LazyDataset:
+        return self._handles[name]
+
+    def add_load_listener(self, listener: Callable[[str], None]) -> None:
+        """`listener(name)` nach jedem fertig geladenen Datensatz (z.B. Speicherprüfung der Registry)."""
+        self._load_listeners.append(listener)
+
+    def _notify_loaded(self, name: str) -> None:
+        for listener in list(self._load_listeners):
+            listener(name)
+
+    def get(self, name: str) -> pd.DataFrame:
+        """Datensatz `name` als schreibgeschützte, flache Kopie des geteilten Frames."""
+        return read_only_view(self._handles[name].get())
+
+    @property
+    def nbytes(self) -> int:
+        """Speicher des Bundles: Rohtext, Blöcke und alle geladenen Frames."""
+        blocks = self._blocks.peek()
+        return len(self.text) + (_block_bytes(blocks) if blocks is not None else 0) + sum(h.nbytes for h in self._handles.values())
+
+    # --- Hintergrund-Parsing ---
+
+    def start_background(self, order: Iterable[str] = BACKGROUND_ORDER) -> None:
+        """Parse die Datensätze in `order` in einem Daemon-Thread.
+
+        Zuerst laufen cleanCSV/splitBlocks, danach die Datensätze in Reihenfolge;
+        `prioritize()` zieht einzelne Datensätze vor. Ein zweiter Aufruf startet
+        keinen weiteren Worker.
+        """
+        with self._pending_lock:
+            if self._worker is not None:
+                return
+            self._pending = [n for n in order if n in self._handles]
+            self._worker = threading.Thread(target=self._work, name=f"parse-{self.content_hash[:8]}", daemon=True)
+        self._worker.start()
+
+    def prioritize(self, name: str) -> bool:
+        """Ziehe `name` an den Anfang der Hintergrund-Warteschlange.
+
+        Gibt False zurück, wenn kein Worker (mehr) den Datensatz liefern wird —
+        dann muss der Aufrufer selbst `get()` aufrufen.
+        """
+        handle = self._handles[name]
+        with self._pending_lock:
+            if handle.status in ("ready", "error", "running"):
+                return True
+            if name in self._pending:
+                self._pending.remove(name)
+            elif self._worker is None or self._worker_done:
+                return False
+            self._pending.insert(0, name)
+            return True
+
+    def stop_background(self) -> None:
+        """Hintergrund-Worker anhalten: die Warteschlange wird geleert.
+
+        Ein gerade laufender Parser lässt sich nicht abbrechen und läuft zu Ende;
+        danach beendet sich der Worker. Ansichten laden Datensätze bei Bedarf
+        weiterhin selbst (`prioritize` gibt dann False zurück).
+        """
+        with self._pending_lock:
+            self._pending.clear()
+            self._worker_done = True
+
+    def _next_pending(self) -> Optional[str]:
+        with self._pending_lock:
+            if self._pending:
+                return self._pending.pop(0)
+            self._worker_done = True
+            return None
+
+    def _work(self) -> None:
+        try:
+            self._blocks.get()
+        except Exception:
+            logger.exception("background parse failed: cleanCSV/splitBlocks")
+            with self._pending_lock:
+                self._worker_done = True
+            return
+        while True:
+            name = self._next_pending()
+            if name is None:
+                return
+            try:
+                self._handles[name].get()
+            except Exception:
+                # Fehler bleibt im Handle gespeichert und erscheint beim Zugriff der Ansicht
+                logger.exception("background parse failed: %s", name)
+
+    def blocks_ready(self) -> bool:
+        return self._blocks.is_loaded
+
+    def wait_blocks(self, timeout: Optional[float] = None) -> bool:
+        return self._blocks.wait(timeout)
+
+    def progress(self) -> ParseProgress:
+        """Fortschritt in Bytes: Rohtext für cleanCSV/splitBlocks plus Quellblock je Datensatz."""
+        text_bytes = len(self.text)
+        names = [n for n in self._handles if n in self._sources]
+        done = text_bytes if self._blocks.is_loaded else 0
+        total = text_bytes
+        current = None if self._blocks.is_loaded else "splitBlocks"
+        blocks = self._blocks.peek()
+        for name in names:
+            handle = self._handles[name]
+            if blocks is not None:
+                size = sum(_block_bytes(blocks.get(category, {})) for category in self._sources[name])
+            else:
+                # vor splitBlocks nur grob abschätzbar
+                size = text_bytes // max(len(names), 1)
+            total += size
+            if handle.status in ("ready", "error"):
+                done += size
+            elif handle.status == "running":
+                current = name
+        return ParseProgress(done_bytes=done, total_bytes=total, current=current, ready=self.loaded())
+
+    def names(self) -> List[str]:
+        return list(self._handles)
+
+    def loaded(self) -> List[str]:
+        return [n for n, h in self._handles.items() if h.is_loaded]
+
+    def time_bounds(self, names: Iterable[str] = tuple(NUMERIC_DATASETS)) -> Tuple[Optional[pd.Timestamp], Optional[pd.Timestamp]]:
+        """Globaler Zeitraum über die Zahlenblöcke, ohne sie zu parsen.
+
+        Gesucht werden nur die Zeitstempel der Kopfzeilen in den Rohblöcken. Das
+        Ergebnis hängt damit nicht davon ab, welche Datensätze schon geladen sind,
+        und der Standardwert des Datumsfilters bleibt über Reruns stabil.
+        """
+        key = tuple(names)
+        if key in self._bounds:
+            return self._bounds[key]
+        bounds: List[pd.Timestamp] = []
+        for name in key:
+            category = NUMERIC_DATASETS.get(name)
+            if category is None:
+                continue
+            tokens = set()
+            for block in self.blocks.get(category, {}).values():
+                if isinstance(block, str):
+                    tokens.update(re.sub(r'\s+', '', t) for t in DATE_RE.findall(block))
+            if tokens:
+                ts = pd.to_datetime(pd.Series(sorted(tokens)), format='%d.%m.%y%H:%M', errors='coerce').dropna()
+                if not ts.empty:
+                    bounds += [ts.min(), ts.max()]
+        self._bounds[key] = (min(bounds), max(bounds)) if bounds else (None, None)
+        return self._bounds[key]
@@ -0,0 +1,214 @@
+import csv
+import io
+import re
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+INTERVAL_BLOCKS = ("Katheter", "Drainagen", "Wunden")
+_TIME_RE = re.compile(r"^\d{2}\.\d{2}\.\d{2}(?:\d{2})?\s+\d{2}:\d{2}$")
+_HEADER_NAMES = {"bezeichnung": "device", "lokalisation": "site", "anlage": "insert", "entfernung": "removal"}
+# offene Intervalle (noch liegend) enden "nie"
+_OPEN_END = np.iinfo(np.int64).max
+
+COLUMNS = ["kind", "device", "site", "insert_time", "removal_time"]
+
+
+def _parse_time(values: pd.Series) -> pd.Series:
+    ts = values.fillna("").astype(str).str.replace(r"\s+", " ", regex=True).str.strip()
+    parsed = pd.to_datetime(ts, format="%d.%m.%Y %H:%M", errors="coerce")
+    return parsed.fillna(pd.to_datetime(ts, format="%d.%m.%y %H:%M", errors="coerce"))
+
+
+def parseIntervals(data: dict, DELIMITER: str = ";") -> pd.DataFrame:
+    """Katheter-, Drainagen- und Wunden-Blöcke als Liegezeiten.
+
+    Die Spalten werden über die Kopfzeile (Bezeichnung, Lokalisation, Anlage,
+    Entfernung) zugeordnet; ohne Kopfzeile gilt die Reihenfolge der nicht-leeren
+    Felder. Leere Entfernung = liegt noch (removal_time NaT).
+
+    Args:
+        data: Dict Blockname -> Text, z.B. {"Katheter": ..., "Drainagen": ..., "Wunden": ...}.
+    """
+    records = []
+    for kind, text in (data or {}).items():
+        if not isinstance(text, str):
+            continue
+        columns: Optional[Dict[str, int]] = None
+        for row in csv.reader(io.StringIO(text), delimiter=DELIMITER):
+            cells = [c.strip() for c in row]
+            lowered = [c.lower() for c in cells]
+            if "bezeichnung" in lowered:
+                columns = {_HEADER_NAMES[c]: i for i, c in enumerate(lowered) if c in _HEADER_NAMES}
+                continue
+            if not any(cells):
+                continue
+            if columns and "device" in columns:
+                def cell(name):
+                    i = columns.get(name)
+                    return cells[i] if i is not None and i < len(cells) else ""
+                device, site, insert, removal = cell("device"), cell("site"), cell("insert"), cell("removal")
+            else:
+                texts = [c for c in cells if c and not _TIME_RE.match(c)]
+                times = [c for c in cells if _TIME_RE.match(c)]
+                device = texts[0] if texts else ""
+                site = texts[1] if len(texts) > 1 else ""
+                insert = times[0] if times else ""
+                removal = times[1] if len(times) > 1 else ""
+            if device:
+                records.append((kind, device, site or None, insert, removal))
+    df = pd.DataFrame.from_records(records, columns=["kind", "device", "site", "insert", "removal"])
+    df["insert_time"] = _parse_time(df["insert"])
+    df["removal_time"] = _parse_time(df["removal"])
+    df = df[df["insert_time"].notna()]
+    return df.sort_values(["insert_time", "kind", "device"], kind="stable").reset_index(drop=True)[COLUMNS]
+
+
+class _Node:
+    __slots__ = ("center", "by_start", "by_end", "left", "right")
+
+
+class DeviceIntervalIndex:
+    """Intervallbaum (zentriert) über Liegezeiten [insert_time, removal_time).
+
+    - `at(t)`: was lag zum Zeitpunkt t — O(log n + k)
+    - `overlapping(a, b)`: was lag irgendwann in [a, b) — Punktabfrage bei a
+      plus binäre Suche über die sortierten Anlagezeiten in [a, b)
+    - `count_at(times)`: Anzahl liegender Zugänge für viele Zeitpunkte, vektorisiert
+    """
+
+    def __init__(self, intervals: pd.DataFrame):
+        self.intervals = intervals.reset_index(drop=True)
+        self.starts = self.intervals["insert_time"].to_numpy(dtype="datetime64[ns]").astype(np.int64)
+        removal = self.intervals["removal_time"].to_numpy(dtype="datetime64[ns]")
+        self.ends = np.where(np.isnat(removal), _OPEN_END, removal.astype(np.int64))
+        self._order_start = np.argsort(self.starts, kind="stable")
+        self._sorted_starts = self.starts[self._order_start]
+        self._sorted_ends = np.sort(self.ends)
+        # Intervalle der Länge 0 (Anlage == Entfernung) lagen zu keinem Zeitpunkt
+        self._root = self._build(np.flatnonzero(self.ends > self.starts))
+
+    def __len__(self) -> int:
+        return len(self.intervals)
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.intervals.memory_usage(index=True, deep=True).sum()) + 5 * 8 * len(self.starts)
+
+    def _build(self, ids: np.ndarray) -> Optional[_Node]:
+        if len(ids) == 0:
+            return None
+        starts, ends = self.starts[ids], self.ends[ids]
+        # offene Enden zählen für die Wahl des Zentrums nicht mit
+        center = int(np.median(np.concatenate([starts, ends[ends != _OPEN_END]])))
+        left = ids[ends <= center]
+        right = ids[starts > center]
+        here = ids[(starts <= center) & (ends > center)]
+        node = _Node()
+        node.center = center
+        node.by_start = here[np.argsort(self.starts[here], kind="stable")]
+        node.by_end = here[np.argsort(-self.ends[here], kind="stable")]
+        node.left = self._build(left)
+        node.right = self._build(right)
+        return node
+
+    def _ids_at(self, t: int) -> List[int]:
+        out: List[int] = []
+        node = self._root
+        while node is not None:
+            if t < node.center:
+                for i in node.by_start:
+                    if self.starts[i] > t:
+                        break
+                    out.append(int(i))
+                node = node.left
+            else:
+                for i in node.by_end:
+                    if self.ends[i] <= t:
+                        break
+                    if self.starts[i] <= t:
+                        out.append(int(i))
+                node = node.right
+        return out
+
+    @staticmethod
+    def _ns(t) -> int:
+        return int(pd.Timestamp(t).as_unit("ns").value)
+
+    def at(self, t) -> pd.DataFrame:
+        """Alle Zugänge, die zum Zeitpunkt `t` lagen."""
+        ids = sorted(self._ids_at(self._ns(t)))
+        return self.intervals.iloc[ids]
+
+    def overlapping(self, start, end) -> pd.DataFrame:
+        """Alle Zugänge, die im Zeitraum [start, end) zumindest zeitweise lagen."""
+        a, b = self._ns(start), self._ns(end)
+        ids = set(self._ids_at(a))
+        lo, hi = np.searchsorted(self._sorted_starts, [a, b], side="left")
+        ids.update(int(i) for i in self._order_start[lo:hi] if self.ends[i] > self.starts[i])
+        return self.intervals.iloc[sorted(ids)]
+
+    def count_at(self, times) -> np.ndarray:
+        """Anzahl liegender Zugänge je Zeitpunkt: #(start <= t) - #(end <= t)."""
+        t = pd.DatetimeIndex(times).as_unit("ns").asi8
+        return np.searchsorted(self._sorted_starts, t, side="right") - np.searchsorted(self._sorted_ends, t, side="right")
+
+    def counts_by(self, times, column: str = "kind") -> pd.DataFrame:
+        """`count_at` je Gruppe (z.B. Katheter/Drainagen/Wunden); Index = Zeitpunkte."""
+        t = pd.DatetimeIndex(times).as_unit("ns")
+        out = pd.DataFrame(index=t)
+        for key, ids in self.intervals.groupby(column, sort=False).indices.items():
+            starts, ends = np.sort(self.starts[ids]), np.sort(self.ends[ids])
+            out[key] = np.searchsorted(starts, t.asi8, side="right") - np.searchsorted(ends, t.asi8, side="right")
+        return out
+
+
+def interval_label(intervals: pd.DataFrame) -> pd.Series:
+    site = intervals["site"].fillna("")
+    label = intervals["kind"].astype(str) + ": " + intervals["device"].astype(str)
+    return label.where(site.eq(""), label + " (" + site + ")")
+
+
+def daily_presence_long(intervals: pd.DataFrame, until=None) -> pd.DataFrame:
+    """Je Tag und Zugang eine Zeile, wenn er an dem Tag (zeitweise) lag.
+
+    Format wie die Zahlen-Views (timestamp, timestamp_parsed, parameter, unit,
+    value=1), damit Auswahl und REDCap-Übersicht es übernehmen können. Offene
+    Intervalle laufen bis `until` (z.B. Ende der Daten), sonst bis zur letzten
+    bekannten Zeit.
+    """
+    cols = ["timestamp", "timestamp_parsed", "parameter", "unit", "value"]
+    if intervals is None or intervals.empty:
+        return pd.DataFrame(columns=cols)
+    last = pd.Timestamp(until) if until is not None else max(intervals["insert_time"].max(), intervals["removal_time"].max())
+    end = intervals["removal_time"].fillna(last)
+    first_day = intervals["insert_time"].dt.normalize()
+    # Entfernung genau um Mitternacht zählt nicht mehr für den neuen Tag
+    last_day = (end - pd.Timedelta(microseconds=1)).dt.normalize().where(end > intervals["insert_time"], first_day)
+    n_days = ((last_day - first_day).dt.days + 1).clip(lower=1).to_numpy()
+    rows = np.repeat(np.arange(len(intervals)), n_days)
+    offsets = np.arange(n_days.sum()) - np.repeat(np.cumsum(n_days) - n_days, n_days)
+    days = first_day.to_numpy()[rows] + offsets.astype("timedelta64[D]")
+    out = pd.DataFrame({
+        "timestamp_parsed": pd.to_datetime(days),
+        "parameter": interval_label(intervals).to_numpy()[rows],
+        "unit": None,
+        "value": 1,
+    }).drop_duplicates(["timestamp_parsed", "parameter"])
+    out.insert(0, "timestamp", out["timestamp_parsed"].dt.strftime("%Y-%m-%d"))
+    return out.sort_values(["timestamp_parsed", "parameter"], kind="stable").reset_index(drop=True)[cols]
+
+
+def therapy_runs(frames: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """Laufzeiten der Therapie-Geräte (erste/letzte Messung je Sub-Kategorie), z.B. je ECMO-Lauf."""
+    parts = []
+    for therapy, df in frames.items():
+        if df is None or df.empty or "Sub-Kategorie" not in df.columns or "timestamp_parsed" not in df.columns:
+            continue
+        g = df.groupby("Sub-Kategorie")["timestamp_parsed"].agg(["min", "max"]).reset_index()
+        g.insert(0, "therapy", therapy)
+        parts.append(g.rename(columns={"Sub-Kategorie": "device", "min": "start", "max": "end"}))
+    if not parts:
+        return pd.DataFrame(columns=["therapy", "device", "start", "end"])
+    return pd.concat(parts, ignore_index=True)
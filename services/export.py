@@ -0,0 +1,142 @@
+import datetime as _dt
+import importlib.util
+from dataclasses import dataclass
+from typing import BinaryIO, Callable, Dict, Iterator, List
+
+import numpy as np
+import pandas as pd
+
+# Zeilen je Schreibblock: nur ein Block wird zur Zeit in Text/Arrow umgewandelt
+CHUNK_ROWS = 50_000
+# Excel-Grenze je Tabellenblatt (inkl. Kopfzeile)
+XLSX_MAX_ROWS = 1_048_576
+
+
+def iter_chunks(df: pd.DataFrame, chunk_rows: int = CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """Zeilenblöcke als Views (iloc-Slices) — keine Kopie des ganzen Frames."""
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start:start + chunk_rows]
+
+
+def write_csv(df: pd.DataFrame, fh: BinaryIO, chunk_rows: int = CHUNK_ROWS, sep: str = ";", encoding: str = "utf-8") -> int:
+    """CSV blockweise schreiben; in Text umgewandelt wird immer nur ein Block.
+
+    Gibt die Anzahl geschriebener Bytes zurück.
+    """
+    written = fh.write(df.iloc[:0].to_csv(index=False, sep=sep, lineterminator="\n").encode(encoding))
+    for chunk in iter_chunks(df, chunk_rows):
+        written += fh.write(chunk.to_csv(index=False, header=False, sep=sep, lineterminator="\n").encode(encoding))
+    return written
+
+
+def _arrow_schema(df: pd.DataFrame):
+    """Schema aus dem Frame ohne Inferenz über alle Zeilen.
+
+    Object-Spalten (z.B. 'Wert' der Therapie-Views mit Zahlen und Text) werden
+    als string geschrieben, reine datetime.date-Spalten als date32.
+    """
+    import pyarrow as pa
+
+    fields = []
+    for col in df.columns:
+        ser = df[col]
+        if ser.dtype == object or isinstance(ser.dtype, pd.StringDtype):
+            sample = ser.iloc[:1000]
+            kind = pd.api.types.infer_dtype(sample, skipna=True)
+            fields.append(pa.field(str(col), pa.date32() if kind == "date" else pa.string()))
+        else:
+            fields.append(pa.field(str(col), pa.Schema.from_pandas(ser.iloc[:0].to_frame(str(col)), preserve_index=False).field(0).type))
+    return pa.schema(fields)
+
+
+def _arrow_column(ser: pd.Series, typ):
+    import pyarrow as pa
+
+    if pa.types.is_string(typ):
+        mask = ser.isna().to_numpy()
+        values = [None if m else str(v) for v, m in zip(ser.to_numpy(dtype=object), mask)]
+        return pa.array(values, type=typ)
+    return pa.array(ser, type=typ, from_pandas=True)
+
+
+def write_parquet(df: pd.DataFrame, fh: BinaryIO, chunk_rows: int = CHUNK_ROWS) -> int:
+    """Parquet über pyarrow.ParquetWriter: eine Row Group je Block."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = _arrow_schema(df)
+    start = fh.tell()
+    with pq.ParquetWriter(fh, schema) as writer:
+        for chunk in iter_chunks(df, chunk_rows):
+            arrays = [_arrow_column(chunk[col], schema.field(i).type) for i, col in enumerate(chunk.columns)]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+        if len(df) == 0:
+            writer.write_table(schema.empty_table())
+    return fh.tell() - start
+
+
+def write_arrow_ipc(df: pd.DataFrame, fh: BinaryIO, chunk_rows: int = CHUNK_ROWS) -> int:
+    """Arrow-IPC-Stream (pyarrow.ipc) mit einem Record Batch je Block."""
+    import pyarrow as pa
+
+    schema = _arrow_schema(df)
+    start = fh.tell()
+    with pa.ipc.new_stream(fh, schema) as writer:
+        for chunk in iter_chunks(df, chunk_rows):
+            arrays = [_arrow_column(chunk[col], schema.field(i).type) for i, col in enumerate(chunk.columns)]
+            writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=schema))
+    return fh.tell() - start
+
+
+def _xlsx_cell(value):
+    if value is None or value is pd.NA or value is pd.NaT:
+        return None
+    if isinstance(value, float) and np.isnan(value):
+        return None
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (str, int, float, bool, _dt.date, _dt.datetime, _dt.time)):
+        return value
+    return str(value)
+
+
+def write_xlsx(df: pd.DataFrame, fh: BinaryIO, chunk_rows: int = CHUNK_ROWS, sheet_name: str = "Export") -> int:
+    """XLSX im write-only-Modus von openpyxl (Zeilen werden sofort serialisiert)."""
+    from openpyxl import Workbook
+
+    if len(df) + 1 > XLSX_MAX_ROWS:
+        raise ValueError(f"{len(df)} Zeilen überschreiten die Excel-Grenze von {XLSX_MAX_ROWS - 1} Zeilen — bitte CSV oder Parquet verwenden")
+    start = fh.tell()
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(sheet_name)
+    ws.append([str(c) for c in df.columns])
+    for chunk in iter_chunks(df, chunk_rows):
+        for row in chunk.itertuples(index=False, name=None):
+            ws.append([_xlsx_cell(v) for v in row])
+    wb.save(fh)
+    return fh.tell() - start
+
+
+@dataclass(frozen=True)
+class ExportFormat:
+    label: str
+    extension: str
+    mime: str
+    writer: Callable[..., int]
+    requires: str = ""
+
+    @property
+    def available(self) -> bool:
+        return not self.requires or importlib.util.find_spec(self.requires) is not None
+
+
+EXPORT_FORMATS: Dict[str, ExportFormat] = {
+    "CSV": ExportFormat("CSV", "csv", "text/csv", write_csv),
+    "XLSX": ExportFormat("XLSX", "xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", write_xlsx, requires="openpyxl"),
+    "Parquet": ExportFormat("Parquet", "parquet", "application/vnd.apache.parquet", write_parquet, requires="pyarrow"),
+}
+
+
+def available_formats() -> List[str]:
+    """Formate, deren optionale Abhängigkeit (openpyxl, pyarrow) installiert ist."""
+    return [name for name, fmt in EXPORT_FORMATS.items() if fmt.available]
@@ -0,0 +1,148 @@
+import re
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from services.medication_doses import _explode_days
+from services.parse_numerics import parseNumerics
+
+INTAKE = "Einfuhr"
+OUTPUT = "Ausfuhr"
+# Zuordnung der Bilanz-Zeilen (Teilstring, case-insensitiv); nicht zugeordnete
+# Zeilen werden über das Vorzeichen entschieden (negativ = Ausfuhr)
+INTAKE_PATTERN = re.compile(r"infusion|perfusor|enteral|parenteral|oral|transfusion|blutprodukt|\bek\b|ffp|\btk\b|spül|einfuhr", re.IGNORECASE)
+OUTPUT_PATTERN = re.compile(r"urin|drainage|magensonde|stuhl|erbroch|blutverlust|verlust|perspiratio|ausfuhr|entzug|hämofilter", re.IGNORECASE)
+# Summenzeilen des Exports ("Einfuhr gesamt", "Gesamtausfuhr", "Summe ...", "Tagesbilanz"):
+# sie wiederholen ihre Einzelzeilen und würden sonst doppelt gezählt
+SUMMARY_PATTERN = re.compile(r"^(?:summe|gesamt|total)|\b(?:einfuhr|ausfuhr)\s*(?:gesamt|summe|total)\b|bilanz", re.IGNORECASE)
+# Parameter der Hämofilter-Daten mit dem Netto-Entzug in ml/h
+RRT_REMOVAL_PATTERN = re.compile(r"patientenentzug|netto.?entzug|\buf\b.*rate|ultrafiltration", re.IGNORECASE)
+# Längere Lücken zwischen zwei Entzugsraten gelten nur bis hierhin als gelaufen
+MAX_RATE_GAP = pd.Timedelta(hours=4)
+
+COLUMNS = ["timestamp_parsed", "item", "direction", "volume_ml", "signed_ml", "source"]
+
+
+def _empty() -> pd.DataFrame:
+    return pd.DataFrame({
+        "timestamp_parsed": pd.Series(dtype="datetime64[ns]"),
+        "item": pd.Series(dtype=object),
+        "direction": pd.Series(dtype=object),
+        "volume_ml": pd.Series(dtype=float),
+        "signed_ml": pd.Series(dtype=float),
+        "source": pd.Series(dtype=object),
+    })
+
+
+def classify_items(items: pd.Series, values: Optional[pd.Series] = None) -> pd.Series:
+    """Einfuhr/Ausfuhr je Bilanz-Zeile; zuerst über den Namen, sonst über das Vorzeichen."""
+    names = pd.Series(items.unique(), dtype=object)
+    # fehlende Namen passen auf kein Muster (str.contains gäbe NaN, np.where werte das als Treffer)
+    text = names.fillna("").astype(str)
+    by_name = pd.Series(
+        np.where(text.str.contains(OUTPUT_PATTERN), OUTPUT, np.where(text.str.contains(INTAKE_PATTERN), INTAKE, None)),
+        index=names,
+    )
+    direction = items.map(by_name)
+    if values is not None:
+        by_sign = pd.Series(np.where(values < 0, OUTPUT, INTAKE), index=items.index)
+        direction = direction.fillna(by_sign)
+    return direction.fillna(INTAKE)
+
+
+def parseBilanz(data: dict, DELIMITER: str = ";") -> pd.DataFrame:
+    """Bilanz-Block (breites Zahlenformat wie Vitaldaten) als typisiertes Long-Format.
+
+    Spalten: timestamp_parsed, item (Zeilenname ohne Einheit), direction
+    (Einfuhr/Ausfuhr), volume_ml (Betrag), signed_ml (+Einfuhr/-Ausfuhr), source.
+    Einheiten in Litern werden in ml umgerechnet. Summenzeilen (SUMMARY_PATTERN)
+    werden verworfen, die Bilanz entsteht aus den Einzelzeilen.
+    """
+    raw = parseNumerics(data or {}, DELIMITER)
+    raw = raw[~raw["parameter"].astype(str).str.contains(SUMMARY_PATTERN)] if not raw.empty else raw
+    if raw.empty:
+        return _empty()
+    values = pd.to_numeric(raw["value"], errors="coerce")
+    scale = np.where(raw["unit"].fillna("").str.strip().str.lower().eq("l"), 1000.0, 1.0)
+    values = values * scale
+    out = pd.DataFrame({
+        "timestamp_parsed": raw["timestamp_parsed"],
+        "item": raw["parameter"].astype(object),
+        "direction": classify_items(raw["parameter"], values),
+        "volume_ml": values.abs(),
+    })
+    out = out[out["volume_ml"].notna() & out["timestamp_parsed"].notna()]
+    out["signed_ml"] = np.where(out["direction"] == OUTPUT, -out["volume_ml"], out["volume_ml"])
+    out["source"] = "Bilanz"
+    return out.reset_index(drop=True)[COLUMNS]
+
+
+def rrt_net_removal(rrt: Optional[pd.DataFrame], max_gap: pd.Timedelta = MAX_RATE_GAP) -> pd.DataFrame:
+    """Netto-Entzug des Hämofilters aus den Raten (ml/h) als Ausfuhr-Volumina.
+
+    Jede Rate gilt bis zur nächsten Messung desselben Geräts (höchstens
+    `max_gap`). Intervalle über Mitternacht werden an jeder Tagesgrenze
+    geteilt, damit die Tagesbilanzen stimmen. Alles vektorisiert über alle Geräte.
+    """
+    if rrt is None or rrt.empty or "Parameter" not in rrt.columns:
+        return _empty()
+    rates = rrt[rrt["Parameter"].astype(str).str.contains(RRT_REMOVAL_PATTERN)]
+    value = rates["value_numeric"] if "value_numeric" in rates.columns else pd.to_numeric(rates["Wert"].str.replace(",", "."), errors="coerce")
+    rates = rates.assign(_rate=value)
+    rates = rates[rates["_rate"].notna() & rates["timestamp_parsed"].notna()]
+    if rates.empty:
+        return _empty()
+    rates = rates.sort_values(["Sub-Kategorie", "timestamp_parsed"], kind="stable")
+    start = rates["timestamp_parsed"]
+    nxt = rates.groupby("Sub-Kategorie", sort=False)["timestamp_parsed"].shift(-1)
+    end = nxt.where(nxt.notna() & (nxt - start <= max_gap), start + max_gap)
+    # an jeder Mitternacht teilen (auch wenn `max_gap` mehr als einen Tag überspannt)
+    rows, _, part_start, part_stop = _explode_days(start.reset_index(drop=True), end.reset_index(drop=True))
+    hours = (part_stop - part_start).dt.total_seconds() / 3600.0
+    rate = rates["_rate"].abs().to_numpy()[rows]
+
+    item = ("Hämofilter Entzug (" + rates["Sub-Kategorie"].astype(str) + ")").to_numpy()[rows]
+    parts = pd.DataFrame({"timestamp_parsed": part_start, "item": item, "volume_ml": rate * hours})
+    parts = parts[parts["volume_ml"] > 0]
+    parts["direction"] = OUTPUT
+    parts["signed_ml"] = -parts["volume_ml"]
+    parts["source"] = "Hämofilter"
+    return parts.sort_values("timestamp_parsed", kind="stable").reset_index(drop=True)[COLUMNS]
+
+
+def balance_table(entries: pd.DataFrame, freq: str = "D") -> pd.DataFrame:
+    """Bilanz je Intervall (`freq=None`: je Zeitstempel) oder je Periode (`"D"`, `"h"`, ...).
+
+    Eine Zeile je Periode; Spalten je Bilanzposition (ml, positiv), dazu
+    Einfuhr, Ausfuhr, Bilanz (Einfuhr - Ausfuhr) und Bilanz kumulativ.
+    """
+    if entries is None or entries.empty:
+        return pd.DataFrame(columns=["period", INTAKE, OUTPUT, "Bilanz", "Bilanz kumulativ"])
+    period = entries["timestamp_parsed"] if freq is None else entries["timestamp_parsed"].dt.floor(freq)
+    e = entries.assign(period=period)
+    items = e.pivot_table(index="period", columns="item", values="volume_ml", aggfunc="sum", fill_value=0.0)
+    totals = e.pivot_table(index="period", columns="direction", values="volume_ml", aggfunc="sum", fill_value=0.0)
+    for col in (INTAKE, OUTPUT):
+        if col not in totals.columns:
+            totals[col] = 0.0
+    out = items.join(totals[[INTAKE, OUTPUT]])
+    out["Bilanz"] = out[INTAKE] - out[OUTPUT]
+    out["Bilanz kumulativ"] = out["Bilanz"].cumsum()
+    out.columns.name = None
+    return out.reset_index()
+
+
+def daily_balance_long(entries: pd.DataFrame) -> pd.DataFrame:
+    """Tagesbilanz im Long-Format der Zahlen-Views (für Auswahl und REDCap-Übersicht).
+
+    Spalten: timestamp (Datum), timestamp_parsed (Tagesbeginn), parameter, unit, value.
+    """
+    table = balance_table(entries, freq="D")
+    if table.empty:
+        return pd.DataFrame(columns=["timestamp", "timestamp_parsed", "parameter", "unit", "value"])
+    long = table.melt(id_vars="period", var_name="parameter", value_name="value")
+    long = long.rename(columns={"period": "timestamp_parsed"})
+    long["timestamp"] = long["timestamp_parsed"].dt.strftime("%Y-%m-%d")
+    long["unit"] = "ml"
+    return long[["timestamp", "timestamp_parsed", "parameter", "unit", "value"]]
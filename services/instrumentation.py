@@ -0,0 +1,168 @@
+import os
+import threading
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+import pandas as pd
+
+from logging_config import get_pipeline_logger
+
+logger = get_pipeline_logger()
+
+# tracemalloc verlangsamt die Stufen spürbar; nur zur Diagnose über PIPELINE_TRACE_MEMORY=1 einschalten
+TRACE_MEMORY = os.environ.get("PIPELINE_TRACE_MEMORY", "0").strip() not in ("", "0", "false", "False")
+
+
+def _size_bytes(obj: Any) -> int:
+    """Grobe Größe eines Stufen-Ein-/Ausgangs in Bytes (Strings: Zeichen, Frames: flach)."""
+    if obj is None:
+        return 0
+    if isinstance(obj, str):
+        return len(obj)
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(index=True, deep=False).sum())
+    if isinstance(obj, dict):
+        return sum(_size_bytes(v) for v in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return sum(_size_bytes(v) for v in obj)
+    # abgeleitete Strukturen (Indizes, Matrizen) melden ihre Größe selbst
+    return int(getattr(obj, "nbytes", 0) or 0)
+
+
+def _row_count(obj: Any) -> Optional[int]:
+    if isinstance(obj, pd.DataFrame):
+        return len(obj)
+    if isinstance(obj, str):
+        return obj.count("\n") + 1 if obj else 0
+    if isinstance(obj, dict):
+        counts = [_row_count(v) for v in obj.values()]
+        return sum(c for c in counts if c is not None)
+    return None
+
+
+class _MemoryTrace:
+    """Prozessweite tracemalloc-Messung für die Stufen aller Threads.
+
+    tracemalloc zählt alle Threads zusammen und kann nur einmal laufen. Deshalb
+    misst immer nur die äußerste Stufe eines Threads, und nur, wenn gerade kein
+    anderer Thread misst; nur dieser Thread startet und stoppt die Messung.
+    Läuft währenddessen in einem anderen Thread (Hintergrund-Worker, andere
+    Session) eine Stufe, enthielte die Spitze fremde Allokationen — sie wird
+    dann nicht gemeldet (None). Kein Warten auf ein Lock: Stufen rufen andere
+    Datensätze ab, die evtl. gerade der Worker in seiner Stufe lädt.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._running: Dict[int, int] = {}
+        self._owner: Optional[int] = None
+        self._overlap = False
+
+    def enter(self) -> bool:
+        """Stufe beginnt; True, wenn diese Stufe die Messung besitzt."""
+        tid = threading.get_ident()
+        with self._lock:
+            depth = self._running.get(tid, 0)
+            self._running[tid] = depth + 1
+            if self._owner is not None and self._owner != tid:
+                self._overlap = True
+            if depth or self._owner is not None or not TRACE_MEMORY or tracemalloc.is_tracing():
+                return False
+            self._owner = tid
+            self._overlap = len(self._running) > 1
+            tracemalloc.start()
+            return True
+
+    def exit(self, owner: bool) -> Optional[float]:
+        """Stufe endet; Spitze in MB, falls sie diese Stufe allein gemessen hat."""
+        tid = threading.get_ident()
+        with self._lock:
+            depth = self._running.pop(tid) - 1
+            if depth:
+                self._running[tid] = depth
+            if not owner:
+                return None
+            peak = tracemalloc.get_traced_memory()[1] / 1e6
+            tracemalloc.stop()
+            self._owner = None
+            return None if self._overlap else peak
+
+
+_TRACE = _MemoryTrace()
+# laufende Stufen je Thread (Run, Name), für Eltern-Stufe und Tiefe
+_STACK = threading.local()
+
+
+@dataclass
+class StageRecord:
+    stage: str
+    seconds: float
+    input_bytes: int
+    output_bytes: int
+    rows: Optional[int]
+    peak_mb: Optional[float]
+    depth: int = 0
+    parent: Optional[str] = None
+
+
+@dataclass
+class PipelineRun:
+    """Sammelt die Messwerte aller Stufen eines Parse-Durchlaufs."""
+
+    label: str = ""
+    started: float = field(default_factory=time.time)
+    stages: List[StageRecord] = field(default_factory=list)
+
+    def stage(self, name: str, fn: Callable, *args, **kwargs):
+        """Führe `fn(*args, **kwargs)` als benannte Stufe aus und protokolliere sie.
+
+        Gemessen werden Wall-Time, Eingangsgröße (erstes Argument), Ausgangsgröße,
+        Zeilenzahl und — falls aktiviert — die tracemalloc-Spitze (`_MemoryTrace`).
+        Eine Stufe, die innerhalb einer anderen Stufe desselben Runs läuft, wird mit
+        `depth` und `parent` protokolliert; ihre Zeit ist in der Eltern-Stufe enthalten.
+        """
+        stack = getattr(_STACK, "stages", None)
+        if stack is None:
+            stack = _STACK.stages = []
+        own = [stage for run, stage in stack if run is self]
+        stack.append((self, name))
+        own_trace = _TRACE.enter()
+        t0 = time.perf_counter()
+        try:
+            result = fn(*args, **kwargs)
+        finally:
+            seconds = time.perf_counter() - t0
+            peak = _TRACE.exit(own_trace)
+            stack.pop()
+        record = StageRecord(
+            stage=name,
+            seconds=seconds,
+            input_bytes=_size_bytes(args[0]) if args else 0,
+            output_bytes=_size_bytes(result),
+            rows=_row_count(result),
+            peak_mb=peak,
+            depth=len(own),
+            parent=own[-1] if own else None,
+        )
+        self.stages.append(record)
+        logger.info(
+            "stage=%s seconds=%.4f input_bytes=%d output_bytes=%d rows=%s peak_mb=%s",
+            record.stage, record.seconds, record.input_bytes, record.output_bytes, record.rows,
+            "n/a" if peak is None else f"{peak:.2f}",
+        )
+        return result
+
+    @property
+    def total_seconds(self) -> float:
+        """Summe der äußersten Stufen (verschachtelte sind in ihrer Eltern-Stufe enthalten)."""
+        return sum(s.seconds for s in self.stages if s.depth == 0)
+
+    def to_frame(self) -> pd.DataFrame:
+        cols = ["stage", "seconds", "input_bytes", "output_bytes", "rows", "peak_mb", "depth", "parent"]
+        df = pd.DataFrame([asdict(s) for s in self.stages], columns=cols)
+        if not df.empty:
+            df["share"] = df["seconds"] / max(self.total_seconds, 1e-12)
+        return df
+
@@ -0,0 +1,204 @@
+import re
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Menge + Einheit in der Konzentrationsspalte, z.B. "5 mg 50 mL 1 Perfusorspritze"
+_AMOUNT_RE = re.compile(r"(\d+(?:[.,]\d+)?)\s*(mg|µg|μg|mcg|ug|g|I\.\s?E\.|IE|I\.E|mmol|mL|ml)(?![A-Za-z])", re.IGNORECASE)
+# Umrechnung auf eine gemeinsame Einheit je Stoffgruppe
+_UNIT_SCALE = {"mg": ("mg", 1.0), "g": ("mg", 1000.0), "µg": ("mg", 0.001), "μg": ("mg", 0.001), "mcg": ("mg", 0.001), "ug": ("mg", 0.001), "ie": ("IE", 1.0), "i.e.": ("IE", 1.0), "i.e": ("IE", 1.0), "mmol": ("mmol", 1.0)}
+# Raten darunter gelten als Rundungsrest der Summenbildung (ml/h)
+_EPS = 1e-9
+
+DAILY_COLUMNS = ["date", "medication", "unit", "total_ml", "total_dose", "max_rate_ml_h", "max_dose_rate_h", "boluses"]
+
+
+def parse_concentration(text: Optional[str]) -> Tuple[float, Optional[str], float]:
+    """Konzentrationsfeld -> (Menge Wirkstoff, Einheit, Gesamtvolumen in ml).
+
+    Die Wirkstoffmenge ist die erste Nicht-Volumen-Angabe des ersten Bestandteils
+    (bei Mischungen "Wirkstoff | Trägerlösung"), das Volumen die Summe aller
+    ml-Angaben. Ohne Volumen (z.B. "40 mg 1 Amp.") ist das Volumen NaN.
+    """
+    amount, unit, volume = np.nan, None, 0.0
+    for part_no, part in enumerate(str(text or "").split("|")):
+        for value, raw_unit in _AMOUNT_RE.findall(part):
+            number = float(value.replace(",", "."))
+            key = raw_unit.lower().replace(" ", "")
+            if key == "ml":
+                volume += number
+            elif part_no == 0 and unit is None and key in _UNIT_SCALE:
+                unit, scale = _UNIT_SCALE[key]
+                amount = number * scale
+    return amount, unit, (volume if volume > 0 else np.nan)
+
+
+def _explode_days(start: pd.Series, stop: pd.Series) -> Tuple[np.ndarray, pd.Series, pd.Series, pd.Series]:
+    """Teile [start, stop) an Mitternacht: (Zeilenindex, Tag, Teilbeginn, Teilende)."""
+    day0 = start.dt.normalize()
+    last = (stop - pd.Timedelta(microseconds=1)).dt.normalize()
+    n_days = ((last - day0).dt.days + 1).clip(lower=1).to_numpy()
+    rows = np.repeat(np.arange(len(start)), n_days)
+    offsets = np.arange(n_days.sum()) - np.repeat(np.cumsum(n_days) - n_days, n_days)
+    day = pd.Series(day0.to_numpy()[rows] + offsets.astype("timedelta64[D]"))
+    part_start = pd.Series(np.maximum(start.to_numpy()[rows], day.to_numpy()))
+    part_stop = pd.Series(np.minimum(stop.to_numpy()[rows], (day + pd.Timedelta(days=1)).to_numpy()))
+    return rows, day, part_start, part_stop
+
+
+class DoseCurves:
+    """Stückweise konstante Dosiskurven aller Medikamente eines Uploads.
+
+    Aus Start/Stopp/Rate (ml/h) und der Konzentration wird je Medikament eine
+    Treppenfunktion der Gesamtrate gebildet (parallel laufende Spritzen werden
+    addiert). Darauf beruhen die exakte Integration über beliebige Zeitfenster
+    (`integrate`) und Tagessummen/-maxima (`daily`). Einzelgaben ohne Rate
+    (Boli, Tabletten) zählen mit der Menge einer Einheit zum Startzeitpunkt.
+    """
+
+    def __init__(self, medications: pd.DataFrame, until=None):
+        meds = medications if medications is not None else pd.DataFrame(columns=["medication", "concentration", "start_parsed", "stop_parsed", "rate"])
+        name = meds["medication"].astype(object).fillna("").astype(str).str.split(" | ", n=1, regex=False).str[0].str.strip()
+        conc = meds["concentration"].astype(object)
+        parsed = {c: parse_concentration(c) for c in pd.unique(conc)}
+        amount = conc.map(lambda c: parsed[c][0]).astype(float)
+        unit = conc.map(lambda c: parsed[c][1])
+        volume = conc.map(lambda c: parsed[c][2]).astype(float)
+        start = pd.to_datetime(meds["start_parsed"], errors="coerce")
+        stop = pd.to_datetime(meds["stop_parsed"], errors="coerce")
+        rate = pd.to_numeric(meds["rate"], errors="coerce")
+        data_end = pd.concat([start, stop]).max()
+        until = data_end if until is None or pd.isna(data_end) else max(pd.Timestamp(until), data_end)
+
+        base = pd.DataFrame({"medication": name, "unit": unit, "per_ml": amount / volume, "start": start, "stop": stop, "rate_ml_h": rate, "amount": amount, "volume": volume})
+        base = base[base["start"].notna() & base["medication"].ne("")]
+        continuous = base["rate_ml_h"].notna()
+        # laufende Perfusoren ohne Stopp gelten bis zum Ende der Daten
+        segs = base[continuous].assign(stop=lambda d: d["stop"].fillna(pd.Timestamp(until)))
+        self.segments = segs[segs["stop"] > segs["start"]].reset_index(drop=True)
+        self.boluses = base[~continuous].rename(columns={"start": "time"})[["medication", "unit", "time", "amount", "volume"]].reset_index(drop=True)
+        self.units = pd.concat([self.segments[["medication", "unit"]], self.boluses[["medication", "unit"]]]).dropna().drop_duplicates("medication").set_index("medication")["unit"]
+        self.steps = self._steps(self.segments)
+        self._daily: Optional[pd.DataFrame] = None
+
+    @staticmethod
+    def _steps(segs: pd.DataFrame) -> pd.DataFrame:
+        """Summenrate je Medikament als nicht überlappende Stufen [start, stop)."""
+        cols = ["medication", "start", "stop", "rate_ml_h", "dose_h"]
+        if segs.empty:
+            return pd.DataFrame({
+                "medication": pd.Series(dtype=object),
+                "start": pd.Series(dtype="datetime64[ns]"),
+                "stop": pd.Series(dtype="datetime64[ns]"),
+                "rate_ml_h": pd.Series(dtype=float),
+                "dose_h": pd.Series(dtype=float),
+            })
+        dose_h = segs["rate_ml_h"] * segs["per_ml"]
+        events = pd.DataFrame({
+            "medication": pd.concat([segs["medication"], segs["medication"]], ignore_index=True),
+            "time": pd.concat([segs["start"], segs["stop"]], ignore_index=True),
+            "d_ml": np.concatenate([segs["rate_ml_h"].to_numpy(), -segs["rate_ml_h"].to_numpy()]),
+            # NaN-Dosis (Konzentration unbekannt) bleibt über fillna(0) neutral, siehe has_dose
+            "d_dose": np.concatenate([dose_h.fillna(0).to_numpy(), -dose_h.fillna(0).to_numpy()]),
+        })
+        events = events.groupby(["medication", "time"], sort=True, as_index=False)[["d_ml", "d_dose"]].sum()
+        grouped = events.groupby("medication", sort=False)
+        steps = pd.DataFrame({
+            "medication": events["medication"],
+            "start": events["time"],
+            "stop": grouped["time"].shift(-1),
+            "rate_ml_h": grouped["d_ml"].cumsum().round(9),
+            "dose_h": grouped["d_dose"].cumsum().round(9),
+        })
+        has_dose = segs["per_ml"].notna().groupby(segs["medication"]).all()
+        steps.loc[~steps["medication"].map(has_dose).astype(bool), "dose_h"] = np.nan
+        steps = steps[steps["stop"].notna() & (steps["rate_ml_h"] > _EPS)]
+        return steps.reset_index(drop=True)[cols]
+
+    @property
+    def nbytes(self) -> int:
+        return int(sum(df.memory_usage(index=True, deep=True).sum() for df in (self.segments, self.boluses, self.steps)))
+
+    def integrate(self, start, end, medication: Optional[str] = None) -> pd.DataFrame:
+        """Exakte Menge je Medikament im Fenster [start, end): Volumen (ml), Dosis, Anzahl Boli."""
+        a, b = pd.Timestamp(start), pd.Timestamp(end)
+        steps, boluses = self.steps, self.boluses
+        if medication is not None:
+            steps, boluses = steps[steps["medication"] == medication], boluses[boluses["medication"] == medication]
+        hours = ((steps["stop"].clip(upper=b) - steps["start"].clip(lower=a)).dt.total_seconds() / 3600).clip(lower=0)
+        infused = pd.DataFrame({"medication": steps["medication"], "volume_ml": steps["rate_ml_h"] * hours, "dose": steps["dose_h"] * hours})
+        given = boluses[(boluses["time"] >= a) & (boluses["time"] < b)]
+        single = pd.DataFrame({"medication": given["medication"], "volume_ml": given["volume"], "dose": given["amount"], "boluses": 1})
+        out = pd.concat([infused.assign(boluses=0), single], ignore_index=True)
+        out = out.groupby("medication", sort=True).agg(volume_ml=("volume_ml", "sum"), dose=("dose", lambda s: s.sum(min_count=1)), boluses=("boluses", "sum"))
+        out = out[(out["volume_ml"] > 0) | (out["boluses"] > 0)]
+        out.insert(0, "unit", out.index.map(self.units))
+        return out.reset_index()
+
+    def daily(self) -> pd.DataFrame:
+        """Je Tag und Medikament: Volumen, Gesamtdosis (inkl. Boli), maximale Rate (ml/h und Dosis/h).
+
+        Wird einmal berechnet und danach wiederverwendet.
+        """
+        if self._daily is None:
+            self._daily = self._compute_daily()
+        return self._daily
+
+    def _compute_daily(self) -> pd.DataFrame:
+        steps = self.steps
+        rows, day, part_start, part_stop = _explode_days(steps["start"], steps["stop"])
+        hours = (part_stop - part_start).dt.total_seconds().to_numpy() / 3600
+        parts = pd.DataFrame({
+            "date": day,
+            "medication": steps["medication"].to_numpy()[rows],
+            "total_ml": steps["rate_ml_h"].to_numpy()[rows] * hours,
+            "total_dose": steps["dose_h"].to_numpy()[rows] * hours,
+            "max_rate_ml_h": steps["rate_ml_h"].to_numpy()[rows],
+            "max_dose_rate_h": steps["dose_h"].to_numpy()[rows],
+            "boluses": 0,
+        })
+        single = pd.DataFrame({
+            "date": self.boluses["time"].dt.normalize(),
+            "medication": self.boluses["medication"],
+            "total_ml": self.boluses["volume"],
+            "total_dose": self.boluses["amount"],
+            "max_rate_ml_h": np.nan,
+            "max_dose_rate_h": np.nan,
+            "boluses": 1,
+        })
+        frames = [df for df in (parts, single) if not df.empty]
+        if not frames:
+            return pd.DataFrame(columns=DAILY_COLUMNS)
+        out = pd.concat(frames, ignore_index=True).groupby(["date", "medication"], sort=True).agg(
+            total_ml=("total_ml", "sum"),
+            total_dose=("total_dose", lambda s: s.sum(min_count=1)),
+            max_rate_ml_h=("max_rate_ml_h", "max"),
+            max_dose_rate_h=("max_dose_rate_h", "max"),
+            boluses=("boluses", "sum"),
+        ).reset_index()
+        out.insert(2, "unit", out["medication"].map(self.units))
+        return out[DAILY_COLUMNS]
+
+
+def daily_dose_long(daily: pd.DataFrame) -> pd.DataFrame:
+    """Tagesdosis und maximale Rate im Long-Format der Zahlen-Views (für Auswahl und REDCap-Übersicht)."""
+    cols = ["timestamp", "timestamp_parsed", "parameter", "unit", "value"]
+    if daily is None or daily.empty:
+        return pd.DataFrame(columns=cols)
+    total = pd.DataFrame({
+        "timestamp_parsed": daily["date"],
+        "parameter": daily["medication"] + " – Tagesdosis",
+        "unit": daily["unit"].where(daily["total_dose"].notna(), "ml"),
+        "value": daily["total_dose"].fillna(daily["total_ml"]),
+    })
+    rate = pd.DataFrame({
+        "timestamp_parsed": daily["date"],
+        "parameter": daily["medication"] + " – max. Rate",
+        "unit": (daily["unit"] + "/h").where(daily["max_dose_rate_h"].notna(), "ml/h"),
+        "value": daily["max_dose_rate_h"].fillna(daily["max_rate_ml_h"]),
+    })
+    out = pd.concat([total, rate], ignore_index=True)
+    out = out[out["value"].notna()]
+    out.insert(0, "timestamp", out["timestamp_parsed"].dt.strftime("%Y-%m-%d"))
+    return out.sort_values(["timestamp_parsed", "parameter"], kind="stable").reset_index(drop=True)[cols]
@@ -0,0 +1,126 @@
+import bisect
+import re
+import time
+from typing import Dict, List, Optional, Set
+
+import numpy as np
+import pandas as pd
+
+TOKEN_RE = re.compile(r"\w+")
+# casefold() macht aus "ß" bereits "ss"; Umlaute werden zusätzlich ausgeschrieben,
+# damit "Kanülenwechsel", "Kanuelenwechsel" und "KANÜLENWECHSEL" gleich indexiert werden
+_UMLAUTS = str.maketrans({"ä": "ae", "ö": "oe", "ü": "ue"})
+# Phrasen in Anführungszeichen, sonst einzelne Begriffe (mit optionalem * als Platzhalter)
+_QUERY_RE = re.compile(r'"([^"]+)"|(\S+)')
+
+
+def normalize(token: str) -> str:
+    """Normalisiere einen deutschen Token: casefold, ß -> ss, Umlaute -> ae/oe/ue."""
+    return token.casefold().translate(_UMLAUTS)
+
+
+def tokenize(text: str) -> List[str]:
+    return [normalize(t) for t in TOKEN_RE.findall(text or "")]
+
+
+class NoteIndex:
+    """Invertierter Index über Notiztexte mit Wortpositionen.
+
+    Unterstützte Abfragen (alle Teile müssen zutreffen):
+    - `Blutung`: ganzes Wort (groß/klein, Umlaute und ß egal)
+    - `"Kompression angelegt"`: Phrase, Wörter direkt hintereinander
+    - `kanül*`, `*wechsel`, `*ylen*`: Platzhalter, aufgelöst über das Vokabular
+      (für Teile deutscher Komposita)
+    """
+
+    def __init__(self, notes: pd.DataFrame, text_column: str = "text"):
+        self.notes = notes.reset_index(drop=True)
+        self.postings: Dict[str, Dict[int, List[int]]] = {}
+        for doc_id, text in enumerate(self.notes[text_column].tolist() if text_column in self.notes else []):
+            for pos, token in enumerate(tokenize(text)):
+                self.postings.setdefault(token, {}).setdefault(doc_id, []).append(pos)
+        self.vocabulary = sorted(self.postings)
+
+    def __len__(self) -> int:
+        return len(self.notes)
+
+    @property
+    def nbytes(self) -> int:
+        """Grobe Größe: Notizen plus ca. 64 Bytes je Posting-Position."""
+        positions = sum(len(p) for docs in self.postings.values() for p in docs.values())
+        return int(self.notes.memory_usage(index=True, deep=True).sum()) + 64 * positions
+
+    def _expand(self, term: str) -> List[str]:
+        """Begriff -> passende Vokabular-Einträge (Platzhalter `*` erlaubt)."""
+        term = normalize(term)
+        if "*" not in term:
+            return [term] if term in self.postings else []
+        if term.endswith("*") and "*" not in term[:-1]:
+            prefix = term[:-1]
+            lo = bisect.bisect_left(self.vocabulary, prefix)
+            hi = bisect.bisect_left(self.vocabulary, prefix + "\U0010ffff")
+            return self.vocabulary[lo:hi]
+        pattern = re.compile("^" + ".*".join(re.escape(p) for p in term.split("*")) + "$")
+        return [w for w in self.vocabulary if pattern.match(w)]
+
+    def _docs_for_term(self, term: str) -> Dict[int, Set[int]]:
+        hits: Dict[int, Set[int]] = {}
+        for word in self._expand(term):
+            for doc_id, positions in self.postings[word].items():
+                hits.setdefault(doc_id, set()).update(positions)
+        return hits
+
+    def _docs_for_phrase(self, words: List[str]) -> Dict[int, Set[int]]:
+        per_word = [self._docs_for_term(w) for w in words]
+        if not per_word or any(not p for p in per_word):
+            return {}
+        docs = set(per_word[0]).intersection(*per_word[1:])
+        hits: Dict[int, Set[int]] = {}
+        for doc_id in docs:
+            starts = {p for p in per_word[0][doc_id] if all(p + k in per_word[k][doc_id] for k in range(1, len(words)))}
+            if starts:
+                hits[doc_id] = starts
+        return hits
+
+    def parse_query(self, query: str) -> List[List[str]]:
+        """Abfrage -> Liste von Klauseln; jede Klausel ist eine Wortfolge (Länge 1 = Einzelbegriff)."""
+        clauses = []
+        for phrase, term in _QUERY_RE.findall(query or ""):
+            if phrase:
+                words = re.findall(r"[\w*]+", phrase)
+                if words:
+                    clauses.append(words)
+            else:
+                words = re.findall(r"[\w*]+", term)
+                clauses.extend([w] for w in words)
+        return clauses
+
+    def search(self, query: str, start_dt=None, end_dt=None) -> pd.DataFrame:
+        """Notizen, die alle Klauseln enthalten, mit Trefferzahl, nach Zeit sortiert.
+
+        Das Ergebnis hat die Spalten der Notizen plus `hits`; die Laufzeit der
+        Abfrage in Millisekunden steht in `result.attrs["elapsed_ms"]`.
+        """
+        t0 = time.perf_counter()
+        clauses = self.parse_query(query)
+        if not clauses:
+            result = self.notes.assign(hits=0)
+        else:
+            matched: Optional[Dict[int, int]] = None
+            for words in clauses:
+                hits = self._docs_for_phrase(words) if len(words) > 1 else self._docs_for_term(words[0])
+                counts = {doc_id: len(pos) for doc_id, pos in hits.items()}
+                if matched is None:
+                    matched = counts
+                else:
+                    matched = {d: matched[d] + counts[d] for d in matched.keys() & counts.keys()}
+                if not matched:
+                    break
+            ids = np.array(sorted(matched or {}), dtype=int)
+            result = self.notes.iloc[ids].assign(hits=[matched[i] for i in ids] if len(ids) else [])
+        if start_dt is not None and end_dt is not None and "timestamp_parsed" in result.columns:
+            result = result[(result["timestamp_parsed"] >= start_dt) & (result["timestamp_parsed"] <= end_dt)]
+        if "timestamp_parsed" in result.columns:
+            result = result.sort_values("timestamp_parsed", kind="stable")
+        result.attrs["elapsed_ms"] = (time.perf_counter() - t0) * 1000
+        return result
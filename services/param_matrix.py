@@ -0,0 +1,104 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Ab diesem Füllgrad lohnt das dichte Array (float32 + NaN) statt CSR
+DENSE_MIN_DENSITY = 0.25
+
+
+class ParameterMatrix:
+    """Parameter × Zeitstempel-Matrix eines Zahlen-Datensatzes (Long-Format).
+
+    Regelmäßig erfasste Online-Daten werden als dichtes float32-Array
+    gespeichert (fehlende Werte NaN), dünn besetzte Laborpanels als CSR
+    (indptr/indices/data, nur numpy). Zeilen sind die Parameter, Spalten die
+    sortierten Zeitstempel. `block()` liefert einen dichten Ausschnitt für eine
+    Parameterliste und ein Zeitfenster: Zeilen über ein Label-Dict, Spalten
+    über binäre Suche — ohne Pivot des Long-Frames.
+    """
+
+    def __init__(self, df: pd.DataFrame, dense_min_density: float = DENSE_MIN_DENSITY):
+        long = pd.DataFrame({
+            "parameter": df["parameter"].astype(object) if "parameter" in df.columns else pd.Series(dtype=object),
+            "t": pd.to_datetime(df["timestamp_parsed"]) if "timestamp_parsed" in df.columns else pd.Series(dtype="datetime64[ns]"),
+            "value": pd.to_numeric(df["value"], errors="coerce") if "value" in df.columns else pd.Series(dtype=float),
+        })
+        long = long[long["parameter"].notna() & long["t"].notna() & long["value"].notna()]
+        if long.duplicated(["parameter", "t"]).any():
+            # gleicher Parameter zur gleichen Zeit aus mehreren Panels: Mittelwert
+            long = long.groupby(["parameter", "t"], sort=False, as_index=False)["value"].mean()
+
+        row_codes, self.parameters = pd.factorize(long["parameter"], sort=True)
+        col_codes, times = pd.factorize(long["t"], sort=True)
+        self.parameters = [str(p) for p in self.parameters]
+        self.times = pd.DatetimeIndex(times).as_unit("ns")
+        self._t = self.times.asi8
+        self.row_index: Dict[str, int] = {p: i for i, p in enumerate(self.parameters)}
+        n_rows, n_cols = len(self.parameters), len(self.times)
+        self.shape = (n_rows, n_cols)
+        self.nnz = len(long)
+        self.density = self.nnz / (n_rows * n_cols) if n_rows and n_cols else 0.0
+        values = long["value"].to_numpy(dtype=np.float32)
+
+        if self.density >= dense_min_density:
+            self.kind = "dense"
+            self.dense = np.full(self.shape, np.nan, dtype=np.float32)
+            self.dense[row_codes, col_codes] = values
+            self.indptr = self.indices = self.data = None
+        else:
+            self.kind = "csr"
+            self.dense = None
+            order = np.lexsort((col_codes, row_codes))
+            self.indices = col_codes[order].astype(np.int32)
+            self.data = values[order]
+            self.indptr = np.zeros(n_rows + 1, dtype=np.int64)
+            np.cumsum(np.bincount(row_codes, minlength=n_rows), out=self.indptr[1:])
+        # die Matrix wird zwischen Sessions geteilt: Ausschnitte dürfen sie nicht verändern
+        for arr in (self._t, self.dense, self.indptr, self.indices, self.data):
+            if arr is not None:
+                arr.flags.writeable = False
+
+    def __len__(self) -> int:
+        return self.nnz
+
+    @property
+    def nbytes(self) -> int:
+        """Speicher der Matrix inklusive Zeitachse (ohne Label-Dict)."""
+        arrays = [self._t] + ([self.dense] if self.kind == "dense" else [self.indptr, self.indices, self.data])
+        return int(sum(a.nbytes for a in arrays))
+
+    def _cols(self, start=None, end=None) -> Tuple[int, int]:
+        lo = 0 if start is None else int(np.searchsorted(self._t, pd.Timestamp(start).as_unit("ns").value, side="left"))
+        hi = len(self._t) if end is None else int(np.searchsorted(self._t, pd.Timestamp(end).as_unit("ns").value, side="right"))
+        return lo, max(lo, hi)
+
+    def block(self, parameters: Optional[Iterable[str]] = None, start=None, end=None) -> Tuple[List[str], pd.DatetimeIndex, np.ndarray]:
+        """Dichter Ausschnitt (Parameter × Zeit, float32, NaN = kein Wert) für [start, end].
+
+        Unbekannte Parameter werden ignoriert. Bei der dichten Speicherung ist
+        der Ausschnitt für einen einzelnen Parameter ein View ohne Kopie.
+        """
+        names = self.parameters if parameters is None else [p for p in parameters if p in self.row_index]
+        rows = np.fromiter((self.row_index[p] for p in names), dtype=np.int64, count=len(names))
+        lo, hi = self._cols(start, end)
+        if self.kind == "dense":
+            out = self.dense[rows[0], lo:hi][None, :] if len(rows) == 1 else self.dense[rows, lo:hi]
+        else:
+            out = np.full((len(rows), hi - lo), np.nan, dtype=np.float32)
+            for i, r in enumerate(rows):
+                a, b = self.indptr[r], self.indptr[r + 1]
+                cols = self.indices[a:b]
+                # Spalten je Zeile sind sortiert: Fenster per binärer Suche
+                s, e = np.searchsorted(cols, lo), np.searchsorted(cols, hi)
+                out[i, cols[s:e] - lo] = self.data[a + s:a + e]
+        return names, self.times[lo:hi], out
+
+    def to_frame(self, parameters: Optional[Iterable[str]] = None, start=None, end=None, drop_empty: bool = True) -> pd.DataFrame:
+        """Ausschnitt als breiter Frame (Index: Zeit, Spalten: Parameter)."""
+        names, times, values = self.block(parameters, start, end)
+        frame = pd.DataFrame(values.T, index=times, columns=names)
+        return frame.dropna(how="all") if drop_empty else frame
+
+    def summary(self) -> Dict[str, object]:
+        return {"kind": self.kind, "shape": self.shape, "nnz": self.nnz, "density": round(self.density, 4), "nbytes": self.nbytes}
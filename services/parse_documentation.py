@@ -1,4 +1,61 @@
+import csv
+import io
+import re
+
 import pandas as pd
 
+NOTE_TIME_RE = re.compile(r"^\d{2}\.\d{2}\.\d{2}(?:\d{2})?\s+\d{2}:\d{2}$")
+COLUMNS = ["timestamp", "timestamp_parsed", "type", "author", "text"]
+
+
+def _iter_notes(block_name: str, text: str, DELIMITER: str):
+    """Liefert (timestamp, type, author, text) je Notiz eines Blocks, ohne ihn komplett zu zerlegen.
+
+    csv.reader verarbeitet die mehrzeiligen, gequoteten Notiztexte. Eine Zeile
+    mit Zeitstempel beginnt eine Notiz: das nächste nicht-leere Feld ist der
+    Verfasser, alle weiteren bilden den Text. Zeilen ohne Zeitstempel (z.B. nicht
+    gequotete Fortsetzungen) werden an die vorherige Notiz angehängt.
+    """
+    current = None
+    for row in csv.reader(io.StringIO(text), delimiter=DELIMITER):
+        cells = [c.strip() for c in row]
+        ts_idx = next((i for i, c in enumerate(cells) if NOTE_TIME_RE.match(c)), None)
+        if ts_idx is None:
+            rest = [c for c in cells if c]
+            # Kopfzeile (";Datum/Zeit;;Verfasser;;Notiz") und Leerzeilen überspringen
+            if current is None or not rest or "Datum/Zeit" in rest:
+                continue
+            current[3] = "\n".join([current[3]] + rest) if current[3] else "\n".join(rest)
+            continue
+        if current is not None:
+            yield tuple(current)
+        rest = [c for c in cells[ts_idx + 1:] if c]
+        author = rest[0] if len(rest) > 1 else None
+        body = "\n".join(rest[1:] if len(rest) > 1 else rest)
+        current = [cells[ts_idx], block_name, author, body]
+    if current is not None:
+        yield tuple(current)
+
+
 def parseDocumentation(data: dict, DELIMITER: str = ";") -> pd.DataFrame:
-    pass
\ No newline at end of file
+    """Arzt-/Pflegenotizen (Kategorie "Dokumentation") als eine Zeile je Notiz.
+
+    Args:
+        data: Block-Dict aus splitBlocks, z.B. split_blocks["Dokumentation"]
+              ({"Arztnotizen": text, "Pflegenotizen": text}).
+
+    Returns:
+        DataFrame mit timestamp (Rohtext), timestamp_parsed, type (Blockname),
+        author und text, nach Zeit sortiert.
+    """
+    records = []
+    for block_name, text in (data or {}).items():
+        if isinstance(text, str):
+            records.extend(_iter_notes(block_name, text, DELIMITER))
+    df = pd.DataFrame.from_records(records, columns=["timestamp", "type", "author", "text"])
+    ts = df["timestamp"].str.replace(r"\s+", " ", regex=True)
+    parsed = pd.to_datetime(ts, format="%d.%m.%Y %H:%M", errors="coerce")
+    # zweistellige Jahreszahlen wie in den Zahlenblöcken
+    parsed = parsed.fillna(pd.to_datetime(ts, format="%d.%m.%y %H:%M", errors="coerce"))
+    df.insert(1, "timestamp_parsed", parsed)
+    return df.sort_values("timestamp_parsed", kind="stable").reset_index(drop=True)[COLUMNS]
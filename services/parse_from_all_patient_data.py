@@ -1,34 +1,237 @@
+import os
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
 import pandas as pd
-import re
 from services.get_from_all_patient_data_by_string import get_from_all_patient_data_by_string
+from services.section_index import Query, SectionIndex, SectionMatcher
+
+TIME_PATTERN = r"^(\d{2}\.\d{2}\.\d{4} \d{2}:\d{2})"
+# Zahl mit optionalem Vergleichszeichen und optionaler Einheit dahinter, z.B. "4,1", "12 mmHg", "<5", "40%".
+# Die Einheit ist genau ein Token nach Leerraum, das mit Buchstabe, %, ° oder / beginnt; alles andere
+# ("1:2", "08:30", "12.09.2025", "30° Oberkörper") passt nicht und ergibt NaN.
+VALUE_PATTERN = r"^([<>]=?)?\s*([-+]?\d+(?:[.,]\d+)?)(?:\s*(%)|\s+((?=[^\W\d_]|[%°/])[\w%°/.^*·²³-]+))?\s*$"
+# Einheit im Parameternamen: "(ml/h)", "[mmHg]", "in %", "... l/min"
+PARAM_UNIT_PATTERN = r"(?:\(([^()]+)\)|\[([^\[\]]+)\]|\sin\s+(\S+)|\s(l/min|ml/h|ml/min|mmHg|%))\s*$"
+
+COLUMNS = ["Zeit", "timestamp_parsed", "Kategorie", "Sub-Kategorie", "Parameter", "Wert", "value_numeric", "unit"]
+
+# Prozess-Pool für den Block "ALLE Patientendaten": Anzahl Worker (0/1 = seriell)
+# und Mindestgröße des Blocks, ab der sich Start und Pickling lohnen
+PARALLEL_WORKERS = int(os.environ.get("ALLE_PARSE_WORKERS", 0))
+PARALLEL_MIN_BYTES = int(float(os.environ.get("ALLE_PARALLEL_MIN_MB", 8)) * 1024 * 1024)
+
+
+def _nth_nonempty(parts: pd.DataFrame, nonempty: np.ndarray, n: int) -> np.ndarray:
+    """n-tes (1-basiert) nicht-leeres Feld je Zeile über die kumulierte Summe der Maske."""
+    hit = nonempty & (np.cumsum(nonempty, axis=1) == n)
+    idx = hit.argmax(axis=1)
+    values = parts.to_numpy(dtype=object)[np.arange(len(parts)), idx]
+    return np.where(hit.any(axis=1), values, None)
+
+
+def _parse_rows(lines: List[str], DELIMITER: str = ";", groups: Optional[np.ndarray] = None) -> Tuple[pd.DataFrame, Optional[pd.Series]]:
+    """Datenzeilen aus `lines`; `pos` ist die Zeilennummer in `lines`.
+
+    Zeitstempel-Zeilen werden per Forward-Fill auf die folgenden Datenzeilen
+    übertragen — mit `groups` nur innerhalb einer Gruppe (Abschnitt). Zeilen vor
+    dem ersten Zeitstempel behalten Zeit = NaN; ob und woher sie einen
+    Zeitstempel erben, entscheidet der Aufrufer. Mit `groups` wird zusätzlich
+    der letzte Zeitstempel je Gruppe zurückgegeben.
+    """
+    stripped = pd.Series(lines).str.strip(DELIMITER)
+    times = stripped.str.extract(TIME_PATTERN, expand=False)
+    is_time = times.notna().to_numpy()
+    current_time = times.ffill() if groups is None else times.groupby(groups).ffill()
+
+    parts = stripped.str.split(DELIMITER, expand=True)
+    nonempty = parts.apply(lambda c: c.str.strip().fillna("").ne("")).to_numpy()
+    keep = ~is_time & (nonempty.sum(axis=1) >= 3)
+
+    parts = parts[keep]
+    nonempty = nonempty[keep]
+    out = pd.DataFrame({
+        "pos": np.flatnonzero(keep),
+        "Zeit": current_time[keep].to_numpy(),
+        "Parameter": pd.Series(_nth_nonempty(parts, nonempty, 1), dtype=object).str.strip().to_numpy(),
+        "Wert": pd.Series(_nth_nonempty(parts, nonempty, 2), dtype=object).str.strip().to_numpy(),
+    })
+    if groups is not None:
+        out.insert(0, "group", groups[keep])
+
+    value = out["Wert"].str.extract(VALUE_PATTERN)
+    numeric = pd.to_numeric(value[1].str.replace(",", ".", regex=False), errors="coerce")
+    out["value_numeric"] = numeric.where(value[0].isna()).astype(float)
+    # wenige verschiedene Parameter: Einheit je eindeutigem Namen bestimmen
+    names = pd.Series(out["Parameter"].dropna().unique(), dtype=object)
+    units = names.str.extract(PARAM_UNIT_PATTERN)
+    units = units[0].fillna(units[1]).fillna(units[2]).fillna(units[3])
+    param_unit = out["Parameter"].map(dict(zip(names, units)))
+    out["unit"] = value[2].fillna(value[3]).fillna(param_unit).astype(object)
+    out["unit"] = out["unit"].where(out["unit"].notna(), None)
+    last_times = times.groupby(groups).last() if groups is not None else None
+    return out, last_times
+
+
+def _finish(rows: pd.DataFrame, categories: np.ndarray, devices: np.ndarray) -> pd.DataFrame:
+    out = rows[["Zeit", "Parameter", "Wert", "value_numeric", "unit"]].reset_index(drop=True)
+    out.insert(1, "Kategorie", categories)
+    out.insert(2, "Sub-Kategorie", devices)
+    out.insert(1, "timestamp_parsed", pd.to_datetime(out["Zeit"], format="%d.%m.%Y %H:%M", errors="coerce"))
+    return out
+
+
+def parse_from_all_patient_data(dataset: dict, querry, DELIMITER: str = ";", index=None) -> pd.DataFrame:
+    """Therapie-Abschnitte (ECMO, Impella, Hämofilter, ...) als Long-Format.
+
+    Alle Zeilen der gefundenen Abschnitte werden in einem Durchgang vektorisiert
+    verarbeitet: Zeitstempel-Zeilen werden per Forward-Fill auf die folgenden
+    Datenzeilen übertragen (auch über Kategorie-/Gerätegrenzen hinweg, wie
+    bisher), Datenzeilen brauchen mindestens drei nicht-leere Felder; das erste
+    ist der Parameter, das zweite der Wert.
 
-def parse_from_all_patient_data(dataset: dict, querry: str, DELIMITER: str = ";") -> pd.DataFrame:
-    data = get_from_all_patient_data_by_string(dataset, querry, DELIMITER)
-    records = []
-    current_time = None
-    
+    Spalten:
+      Zeit (Rohtext), timestamp_parsed, Kategorie, Sub-Kategorie, Parameter,
+      Wert (Rohtext), value_numeric (float, NaN falls nicht numerisch oder
+      mit "<"/">"), unit (aus dem Wert oder dem Parameternamen, sonst None).
+    """
+    data = get_from_all_patient_data_by_string(dataset, querry, DELIMITER, index=index)
+
+    lines, categories, devices = [], [], []
     for category, entries in data.items():
-        for device, lines in entries.items():
-            for line in lines:
-                line = line.strip(";")
-                
-                # Zeitstempel
-                time_match = re.match(r"^(\d{2}\.\d{2}\.\d{4} \d{2}:\d{2})", line)
-                if time_match:
-                    current_time = time_match.group(1)
-                    continue
-                
-                # Datenzeilen mit mindestens 3 Segmenten
-                parts = [p for p in line.split(";") if p.strip() != ""]
-                if len(parts) >= 3 and current_time:
-                    parameter = parts[0].strip()
-                    value = parts[1].strip()
-                    records.append({
-                        "Zeit": current_time,
-                        "Kategorie": category,
-                        "Sub-Kategorie": device,
-                        "Parameter": parameter,
-                        "Wert": value
-                    })
-    
-    return pd.DataFrame(records)
\ No newline at end of file
+        for device, device_lines in entries.items():
+            lines.extend(device_lines)
+            categories.extend([category] * len(device_lines))
+            devices.extend([device] * len(device_lines))
+    if not lines:
+        return pd.DataFrame(columns=COLUMNS)
+
+    rows, _ = _parse_rows(lines, DELIMITER)
+    rows = rows[rows["Zeit"].notna()]
+    pos = rows["pos"].to_numpy()
+    return _finish(rows, np.asarray(categories, dtype=object)[pos], np.asarray(devices, dtype=object)[pos])
+
+
+def _parse_segment_chunk(segments: List[Tuple[int, List[str]]], DELIMITER: str = ";") -> Tuple[pd.DataFrame, Dict[int, str]]:
+    """Worker: zusammenhängende Abschnitte parsen, ohne Zeitübertrag zwischen Abschnitten."""
+    lines: List[str] = []
+    groups: List[int] = []
+    for seg, seg_lines in segments:
+        lines.extend(seg_lines)
+        groups.extend([seg] * len(seg_lines))
+    if not lines:
+        return pd.DataFrame(columns=["group", "pos", "Zeit", "Parameter", "Wert", "value_numeric", "unit"]), {}
+    rows, last_times = _parse_rows(lines, DELIMITER, groups=np.asarray(groups, dtype=np.int64))
+    return rows, {int(k): v for k, v in last_times.dropna().items()}
+
+
+def _chunks(segments: List[Tuple[int, List[str]]], n: int) -> List[List[Tuple[int, List[str]]]]:
+    """Abschnitte in `n` zusammenhängende Teile mit etwa gleich vielen Zeilen."""
+    sizes = np.cumsum([len(lines) for _, lines in segments])
+    if not len(sizes) or n <= 1:
+        return [segments]
+    cuts = np.searchsorted(sizes, sizes[-1] * np.arange(1, n) / n, side="right")
+    bounds = [0, *sorted(set(int(c) for c in cuts)), len(segments)]
+    return [segments[a:b] for a, b in zip(bounds, bounds[1:]) if b > a]
+
+
+_POOL: Optional[ProcessPoolExecutor] = None
+_POOL_WORKERS = 0
+_POOL_LOCK = threading.Lock()
+
+
+def _pool(workers: int) -> ProcessPoolExecutor:
+    """Prozessweiter Pool (spawn: die App parst in Hintergrund-Threads)."""
+    global _POOL, _POOL_WORKERS
+    with _POOL_LOCK:
+        if _POOL is None or _POOL_WORKERS != workers:
+            if _POOL is not None:
+                _POOL.shutdown(wait=False)
+            _POOL = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            _POOL_WORKERS = workers
+        return _POOL
+
+
+def parse_all_patient_data_sections(
+    dataset: dict,
+    queries: Dict[str, "Query | Sequence[Query]"],
+    DELIMITER: str = ";",
+    index: Optional[SectionIndex] = None,
+    workers: Optional[int] = None,
+) -> Dict[str, pd.DataFrame]:
+    """Mehrere Therapie-Abfragen auf einmal, die Abschnitte parallel geparst.
+
+    Der Block wird an den Grenzzeilen (`;;Header`) in Abschnitte zerlegt
+    (services/section_index.py); alle Abschnitte, die eine der Abfragen
+    treffen, werden einmal in `workers` Prozessen geparst. Danach wird je
+    Abfrage genau wie in `parse_from_all_patient_data` zusammengesetzt: gleiche
+    Reihenfolge (Header, nummerierte Sub-Header, Dokumentreihenfolge) und
+    Zeilen vor dem ersten Zeitstempel eines Abschnitts erben den letzten
+    Zeitstempel der in dieser Reihenfolge vorangehenden Abschnitte.
+    Ergebnis: Name -> Frame, identisch zu `parse_from_all_patient_data` je Abfrage.
+    """
+    workers = PARALLEL_WORKERS if workers is None else workers
+    if index is None:
+        index = SectionIndex(dataset["ALLE Patientendaten"], DELIMITER)
+    assignments = {
+        name: index.section_segments(SectionMatcher(list(q) if isinstance(q, (list, tuple)) else [q]))
+        for name, q in queries.items()
+    }
+    wanted = sorted({seg for headers in assignments.values() for subs in headers.values() for segs in subs.values() for seg in segs})
+    segments = [(seg, index.segments[seg]) for seg in wanted]
+
+    chunks = _chunks(segments, workers)
+    if workers > 1 and len(chunks) > 1:
+        results = list(_pool(workers).map(_parse_segment_chunk, chunks, [DELIMITER] * len(chunks)))
+    else:
+        results = [_parse_segment_chunk(segments, DELIMITER)]
+    parsed = pd.concat([r[0] for r in results], ignore_index=True)
+    last_times: Dict[int, str] = {}
+    for _, lt in results:
+        last_times.update(lt)
+
+    # Zeilen je Abschnitt liegen zusammenhängend und in Abschnittsreihenfolge vor
+    seg_col = parsed["group"].to_numpy(dtype=np.int64)
+    starts = np.searchsorted(seg_col, wanted, side="left")
+    ends = np.searchsorted(seg_col, wanted, side="right")
+    span = {seg: (int(a), int(b)) for seg, a, b in zip(wanted, starts, ends)}
+
+    out: Dict[str, pd.DataFrame] = {}
+    for name, subs in assignments.items():
+        take: List[np.ndarray] = []
+        categories: List[str] = []
+        devices: List[str] = []
+        carries: List[Optional[str]] = []
+        counts: List[int] = []
+        carry: Optional[str] = None
+        for category, entries in subs.items():
+            for device, segs in entries.items():
+                for seg in segs:
+                    a, b = span[seg]
+                    take.append(np.arange(a, b))
+                    categories.append(category)
+                    devices.append(device)
+                    carries.append(carry)
+                    counts.append(b - a)
+                    carry = last_times.get(seg, carry)
+        if not take or not sum(counts):
+            out[name] = pd.DataFrame(columns=COLUMNS)
+            continue
+        rows = parsed.take(np.concatenate(take))
+        counts_arr = np.asarray(counts)
+        zeit = rows["Zeit"].to_numpy(dtype=object)
+        inherited = np.repeat(np.asarray(carries, dtype=object), counts_arr)
+        missing = pd.isna(zeit)
+        zeit = np.where(missing, inherited, zeit)
+        rows = rows.assign(Zeit=zeit)
+        keep = pd.notna(zeit)
+        rows = rows[keep]
+        out[name] = _finish(
+            rows,
+            np.repeat(np.asarray(categories, dtype=object), counts_arr)[keep],
+            np.repeat(np.asarray(devices, dtype=object), counts_arr)[keep],
+        )
+    return out
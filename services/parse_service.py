@@ -0,0 +1,360 @@
+import argparse
+import hashlib
+import io
+import json
+import multiprocessing
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from logging_config import get_pipeline_logger
+
+logger = get_pipeline_logger()
+
+# Lokaler HTTP-Dienst: Export hochladen, geparste Frames als Arrow IPC oder JSON.
+#
+#   python -m services.parse_service --port 8765 --workers 4
+#
+#   POST /parse?datasets=vitals,lab&format=json   Body: Export (Bytes)
+#   POST /parse?datasets=vitals&format=arrow       genau ein Datensatz je Arrow-Antwort
+#   GET  /frames/<hash>/<datensatz>?format=arrow   bereits geparster Export ohne erneuten Upload
+#   GET  /health                                   Pool-, Warteschlangen- und Cache-Zustand
+#
+# Geparst wird mit services.datasets.PatientDatasets in einem begrenzten
+# Prozess-Pool; Anfragen über `workers + max_queue` hinaus werden mit 503
+# abgewiesen. Ergebnisse werden je (Inhalts-Hash, Datensatz, Format) im LRU-Cache
+# gehalten, gleichzeitige Uploads desselben Exports teilen sich einen Job.
+# Jede Antwort trägt Server-Timing (queue, parse, encode, total).
+
+# Frames, die der Dienst ausliefert (Indizes, Matrizen und Dosis-Kurven bleiben intern)
+FRAME_DATASETS = [
+    "vitals", "respirator", "lab", "ecmo", "impella", "rrt",
+    "medications", "medication_daily", "notes", "bilanz", "fluid_balance", "balance_daily",
+    "device_intervals", "device_presence_daily", "derived", "scores", "scores_daily",
+]
+DEFAULT_DATASETS = ["vitals", "respirator", "lab", "ecmo", "impella", "rrt"]
+FORMATS = {"arrow": "application/vnd.apache.arrow.stream", "json": "application/json"}
+
+SERVICE_MAX_UPLOAD_MB = int(os.environ.get("PARSE_SERVICE_MAX_UPLOAD_MB", os.environ.get("ALLOW_UPLOAD_MAX_MB", 50)))
+SERVICE_CACHE_MB = int(os.environ.get("PARSE_SERVICE_CACHE_MB", 512))
+
+
+def content_hash(raw: bytes) -> str:
+    """Gleicher Hash wie app_core._datasets_for_upload."""
+    return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+
+def _decode(raw: bytes) -> str:
+    try:
+        return raw.decode("utf-8")
+    except UnicodeDecodeError:
+        return raw.decode("latin-1")
+
+
+def _encode_frame(df, fmt: str) -> bytes:
+    if fmt == "arrow":
+        from services.export import write_arrow_ipc
+
+        buf = io.BytesIO()
+        write_arrow_ipc(df, buf)
+        return buf.getvalue()
+    return df.to_json(orient="split", index=False, date_format="iso", force_ascii=False).encode("utf-8")
+
+
+def parse_job(raw: bytes, names: Sequence[str], fmt: str, digest: str) -> dict:
+    """Im Worker-Prozess: Export parsen und die angefragten Frames kodieren.
+
+    Gibt die kodierten Frames, die Stufen-Messwerte und den Startzeitpunkt
+    (für die Wartezeit in der Warteschlange) zurück.
+    """
+    from services.datasets import PatientDatasets
+
+    started = time.time()
+    t0 = time.perf_counter()
+    datasets = PatientDatasets(_decode(raw), DELIMITER=";", label="parse_service", content_hash=digest)
+    frames = {name: datasets.get(name) for name in names}
+    parse_s = time.perf_counter() - t0
+    t1 = time.perf_counter()
+    encoded = {name: _encode_frame(df, fmt) for name, df in frames.items()}
+    return {
+        "started": started,
+        "parse_s": parse_s,
+        "encode_s": time.perf_counter() - t1,
+        "frames": encoded,
+        "rows": {name: len(df) for name, df in frames.items()},
+        "stages": [(s.stage, round(s.seconds, 4)) for s in datasets.run.stages],
+    }
+
+
+def _warmup() -> int:
+    import services.datasets  # noqa: F401  (Import der Pipeline vorziehen)
+
+    return os.getpid()
+
+
+class ServiceBusy(Exception):
+    """Warteschlange voll — Antwort 503 mit Retry-After."""
+
+
+@dataclass
+class ParseResult:
+    digest: str
+    frames: Dict[str, bytes]
+    rows: Dict[str, int]
+    cache: str
+    timings: Dict[str, float] = field(default_factory=dict)
+    stages: List[Tuple[str, float]] = field(default_factory=list)
+
+
+class ParseService:
+    """Begrenzter Prozess-Pool mit Warteschlange und Inhalts-Hash-Cache."""
+
+    def __init__(self, workers: int = 2, max_queue: int = 8, cache_bytes: int = SERVICE_CACHE_MB * 1024 * 1024):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.cache_bytes = cache_bytes
+        # spawn statt fork: der Server läuft mit mehreren Threads
+        self._pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        self._slots = threading.BoundedSemaphore(workers + max_queue)
+        self._lock = threading.Lock()
+        self._cache: "OrderedDict[Tuple[str, str, str], bytes]" = OrderedDict()
+        self._cache_size = 0
+        self._rows: Dict[Tuple[str, str], int] = {}
+        # laufende Jobs mit Einreichzeitpunkt (für die Wartezeit)
+        self._inflight: Dict[Tuple[str, Tuple[str, ...], str], Tuple[Future, float]] = {}
+        self.stats = {"requests": 0, "jobs": 0, "cache_hits": 0, "shared_jobs": 0, "rejected": 0}
+        self._pending = 0
+
+    def warmup(self) -> None:
+        """Alle Worker starten und die Pipeline importieren lassen."""
+        for f in [self._pool.submit(_warmup) for _ in range(self.workers)]:
+            f.result()
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=True, cancel_futures=True)
+
+    def _cached(self, digest: str, names: Sequence[str], fmt: str) -> Optional[Dict[str, bytes]]:
+        with self._lock:
+            keys = [(digest, n, fmt) for n in names]
+            if not all(k in self._cache for k in keys):
+                return None
+            for k in keys:
+                self._cache.move_to_end(k)
+            return {k[1]: self._cache[k] for k in keys}
+
+    def _store(self, digest: str, fmt: str, frames: Dict[str, bytes], rows: Dict[str, int]) -> None:
+        with self._lock:
+            for name, data in frames.items():
+                key = (digest, name, fmt)
+                if key in self._cache:
+                    continue
+                self._cache[key] = data
+                self._cache_size += len(data)
+                self._rows[(digest, name)] = rows[name]
+            while self._cache_size > self.cache_bytes and len(self._cache) > 1:
+                (old_digest, old_name, _), data = self._cache.popitem(last=False)
+                self._cache_size -= len(data)
+                # Zeilenzahl gilt für alle Formate; erst mit dem letzten Eintrag entfernen
+                if not any((old_digest, old_name, f) in self._cache for f in FORMATS):
+                    self._rows.pop((old_digest, old_name), None)
+
+    def parse(self, raw: bytes, names: Sequence[str], fmt: str) -> ParseResult:
+        t0 = time.perf_counter()
+        digest = content_hash(raw)
+        with self._lock:
+            self.stats["requests"] += 1
+        hit = self._cached(digest, names, fmt)
+        if hit is not None:
+            with self._lock:
+                self.stats["cache_hits"] += 1
+            return ParseResult(digest, hit, {n: self._rows.get((digest, n), 0) for n in names}, "hit", {"total": time.perf_counter() - t0})
+
+        job_key = (digest, tuple(names), fmt)
+        with self._lock:
+            job = self._inflight.get(job_key)
+            shared = job is not None
+            if shared:
+                self.stats["shared_jobs"] += 1
+            else:
+                if not self._slots.acquire(blocking=False):
+                    self.stats["rejected"] += 1
+                    raise ServiceBusy(f"{self.workers + self.max_queue} Anfragen in Arbeit — später erneut versuchen")
+                try:
+                    job = (self._pool.submit(parse_job, raw, list(names), fmt, digest), time.time())
+                except Exception:
+                    self._slots.release()
+                    raise
+                self.stats["jobs"] += 1
+                self._pending += 1
+                self._inflight[job_key] = job
+        if not shared:
+            def _done(f: Future, key=job_key) -> None:
+                # erst cachen, dann aus _inflight entfernen: keine Lücke für einen zweiten Job
+                if not f.cancelled() and f.exception() is None:
+                    self._store(digest, fmt, f.result()["frames"], f.result()["rows"])
+                self._slots.release()
+                with self._lock:
+                    self._pending -= 1
+                    self._inflight.pop(key, None)
+
+            job[0].add_done_callback(_done)
+        future, submitted = job
+        result = future.result()
+        timings = {
+            "queue": max(0.0, result["started"] - submitted),
+            "parse": result["parse_s"],
+            "encode": result["encode_s"],
+            "total": time.perf_counter() - t0,
+        }
+        return ParseResult(digest, result["frames"], result["rows"], "shared" if shared else "miss", timings, result["stages"])
+
+    def frame(self, digest: str, name: str, fmt: str) -> Optional[bytes]:
+        hit = self._cached(digest, [name], fmt)
+        return None if hit is None else hit[name]
+
+    def health(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "pending": self._pending,
+                "cache_entries": len(self._cache),
+                "cache_mb": round(self._cache_size / 1e6, 2),
+                **self.stats,
+            }
+
+
+def _server_timing(timings: Dict[str, float]) -> str:
+    return ", ".join(f"{k};dur={v * 1000:.1f}" for k, v in timings.items())
+
+
+def _json_body(result: ParseResult) -> bytes:
+    # Frames sind bereits JSON-kodiert: nur zusammensetzen, nicht erneut parsen
+    parts = [b'{"hash":', json.dumps(result.digest).encode(), b',"rows":', json.dumps(result.rows).encode(), b',"datasets":{']
+    for i, (name, data) in enumerate(result.frames.items()):
+        parts += [b"," if i else b"", json.dumps(name).encode(), b":", data]
+    parts.append(b"}}")
+    return b"".join(parts)
+
+
+class ParseRequestHandler(BaseHTTPRequestHandler):
+    service: ParseService = None
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, fmt, *args):
+        logger.info("parse_service: " + fmt, *args)
+
+    def _send(self, status: int, body: bytes, content_type: str = "application/json", headers: Optional[Dict[str, str]] = None) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _error(self, status: int, message: str, headers: Optional[Dict[str, str]] = None) -> None:
+        self._send(status, json.dumps({"error": message}, ensure_ascii=False).encode("utf-8"), headers=headers)
+
+    def _options(self, query: dict) -> Tuple[List[str], str]:
+        fmt = query.get("format", ["json"])[0]
+        if fmt not in FORMATS:
+            raise ValueError(f"Unbekanntes Format '{fmt}' (erlaubt: {', '.join(FORMATS)})")
+        names = [n for n in ",".join(query.get("datasets", [])).split(",") if n] or list(DEFAULT_DATASETS)
+        unknown = [n for n in names if n not in FRAME_DATASETS]
+        if unknown:
+            raise ValueError(f"Unbekannte Datensätze {unknown} (erlaubt: {', '.join(FRAME_DATASETS)})")
+        if fmt == "arrow" and len(names) != 1:
+            raise ValueError("format=arrow liefert genau einen Datensatz je Antwort")
+        return names, fmt
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == "/health":
+            return self._send(200, json.dumps(self.service.health()).encode("utf-8"))
+        m = re.fullmatch(r"/frames/([0-9a-f]{32})/(\w+)", url.path)
+        if not m:
+            return self._error(404, "Unbekannter Pfad")
+        try:
+            _, fmt = self._options({**parse_qs(url.query), "datasets": [m.group(2)]})
+        except ValueError as e:
+            return self._error(400, str(e))
+        data = self.service.frame(m.group(1), m.group(2), fmt)
+        if data is None:
+            return self._error(404, "Nicht im Cache — Export erneut per POST /parse hochladen")
+        self._send(200, data, FORMATS[fmt], {"X-Content-Hash": m.group(1), "X-Cache": "hit"})
+
+    def do_POST(self):
+        t0 = time.perf_counter()
+        url = urlparse(self.path)
+        if url.path != "/parse":
+            return self._error(404, "Unbekannter Pfad")
+        length = int(self.headers.get("Content-Length", 0))
+        if length <= 0:
+            return self._error(400, "Leerer Upload")
+        if length > SERVICE_MAX_UPLOAD_MB * 1024 * 1024:
+            return self._error(413, f"Upload größer als {SERVICE_MAX_UPLOAD_MB} MB")
+        try:
+            names, fmt = self._options(parse_qs(url.query))
+        except ValueError as e:
+            return self._error(400, str(e))
+        raw = self.rfile.read(length)
+        t_read = time.perf_counter() - t0
+        try:
+            result = self.service.parse(raw, names, fmt)
+        except ServiceBusy as e:
+            return self._error(503, str(e), {"Retry-After": "1"})
+        except Exception as e:
+            logger.exception("parse_service: parse failed")
+            return self._error(500, f"Parsen fehlgeschlagen: {e}")
+        timings = {"read": t_read, **result.timings}
+        timings["total"] = time.perf_counter() - t0
+        body = result.frames[names[0]] if fmt == "arrow" else _json_body(result)
+        headers = {
+            "X-Content-Hash": result.digest,
+            "X-Cache": result.cache,
+            "X-Rows": json.dumps(result.rows),
+            "Server-Timing": _server_timing(timings),
+        }
+        if result.stages:
+            # Stufen der Pipeline im Worker (services/instrumentation.py)
+            headers["X-Parse-Stages"] = json.dumps(result.stages, ensure_ascii=True)
+        self._send(200, body, FORMATS[fmt], headers)
+
+
+def make_server(service: ParseService, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+    handler = type("BoundParseRequestHandler", (ParseRequestHandler,), {"service": service})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Lokaler HTTP-Dienst zum Parsen von mlife-Exporten")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) - 1))
+    ap.add_argument("--max-queue", type=int, default=8)
+    args = ap.parse_args(argv)
+    service = ParseService(workers=args.workers, max_queue=args.max_queue)
+    service.warmup()
+    server = make_server(service, args.host, args.port)
+    logger.info("parse_service: http://%s:%d (%d Worker)", args.host, server.server_address[1], args.workers)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.shutdown()
+
+
+if __name__ == "__main__":
+    main()
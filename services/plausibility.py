@@ -0,0 +1,146 @@
+import re
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from services.units import factorize_pairs, unit_key
+
+# Kategorien der Spalte `flag` (fehlend = unauffällig)
+FLAGS = ("implausible", "low", "high")
+
+
+@dataclass(frozen=True)
+class RangeRule:
+    """Grenzen eines Parameters in seiner Standard-Einheit (services/units.py).
+
+    `plausible` sind physiologisch mögliche Grenzen — Werte außerhalb gelten
+    als Fehleingabe (MAP 700, Temperatur 3,7). `reference` ist der
+    Referenzbereich für die Markierung low/high; `None` als Grenze = offen.
+    Die Regel greift nur bei passender oder fehlender Einheit, damit nicht
+    umrechenbare Einheiten nicht falsch markiert werden. Mit `fraction` gelten
+    Werte ≤ 1 als Anteil (FiO2 0,4 = 40 %) und werden vor dem Vergleich mit
+    100 multipliziert — unabhängig von der dokumentierten Einheit.
+    """
+
+    name: str
+    pattern: re.Pattern
+    unit: Optional[str]
+    plausible: Tuple[Optional[float], Optional[float]]
+    reference: Tuple[Optional[float], Optional[float]] = (None, None)
+    fraction: bool = False
+
+    def applies(self, parameter: str, unit: Optional[str]) -> bool:
+        if not self.pattern.search(parameter):
+            return False
+        return unit is None or self.unit is None or unit_key(unit) == unit_key(self.unit)
+
+
+RANGE_RULES: Dict[str, RangeRule] = {}
+
+
+def register_range(rule: RangeRule) -> RangeRule:
+    RANGE_RULES[rule.name] = rule
+    return rule
+
+
+def _range(name: str, pattern: str, unit: Optional[str], plausible, reference=(None, None), fraction=False) -> RangeRule:
+    return register_range(RangeRule(name, re.compile(pattern, re.IGNORECASE), unit, plausible, reference, fraction))
+
+
+# Vitaldaten und Beatmung: nur physiologische Grenzen
+_range("Herzfrequenz", r"^(?:HF|Herzfrequenz|Puls)\b", "bpm", (0, 300))
+_range("Blutdruck", r"^(?:ART[sdm]?|NIBP|MAD|MAP)\b", "mmHg", (0, 300))
+_range("ZVD", r"^ZVD", "mmHg", (-10, 60))
+_range("Sättigung", r"^(?:SpO2|SaO2|SO2)\b", "%", (0, 100))
+_range("Temperatur", r"^Temp", "°C", (25, 45))
+_range("Atemfrequenz", r"^(?:AF|Atemfrequenz)\b", None, (0, 100))
+# FiO2 wird teils in %, teils als Anteil dokumentiert (wie in services/alignment.py)
+_range("FiO2", r"^FiO2\b", "%", (15, 100), fraction=True)
+_range("PEEP", r"^PEEP\b", "mbar", (0, 40))
+_range("Spitzendruck", r"^(?:Ppeak|Pinsp|Pplat)\b", "mbar", (0, 80))
+_range("Tidalvolumen", r"Tidalvolumen", "ml", (0, 3000))
+# Labor: physiologische Grenzen und Referenzbereiche (Erwachsene)
+_range("Kreatinin", r"^(?:KREATININ|CREA)\b", "mg/dl", (0.05, 30), (0.5, 1.2))
+_range("Bilirubin", r"^BILI", "mg/dl", (0, 60), (None, 1.2))
+_range("Glukose", r"^(?:GLUCOSE|GLUKOSE|BZ)\b", "mg/dl", (5, 2000), (70, 140))
+_range("Harnstoff", r"^(?:HARNSTOFF|UREA)\b", "mg/dl", (1, 500), (17, 43))
+_range("Hämoglobin", r"^(?:HB|Hämoglobin)\b", "g/dl", (1, 25), (12, 17.5))
+_range("Hämatokrit", r"^(?:HCT|HKT)\b", "%", (5, 75), (36, 50))
+_range("Kalium", r"^KALIUM\b", "mmol/l", (1, 12), (3.5, 5.1))
+_range("Natrium", r"^NATRIUM\b", "mmol/l", (90, 200), (135, 145))
+_range("Magnesium", r"^MAGNESIUM\b", "mmol/l", (0.1, 10), (0.7, 1.05))
+_range("Laktat", r"^(?:LACTAT|LAKTAT)\b", "mmol/l", (0, 30), (None, 2.2))
+_range("CRP", r"^CRP\b", "mg/l", (0, 700), (None, 5))
+_range("Procalcitonin", r"^PROCALCITONIN\b", "ng/ml", (0, 1000), (None, 0.5))
+_range("Thrombozyten", r"^PLT\b", "/nl", (0, 2000), (150, 400))
+_range("Leukozyten", r"^WBC\b", "/nl", (0, 500), (4, 10))
+_range("pH", r"^PH\b", None, (6.5, 8.0), (7.35, 7.45))
+_range("pCO2", r"^P(?:a)?CO2\b", "mmHg", (5, 200), (35, 45))
+# pO2 ohne Referenzbereich: arterielle und venöse BGA teilen den Parameternamen
+_range("pO2", r"^P(?:a)?O2\b", "mmHg", (10, 800))
+_range("INR", r"^INR\b", None, (0.5, 20), (0.85, 1.2))
+_range("PTT", r"^PTT\b", "s", (5, 250), (25, 38))
+_range("ATIII", r"^AT\s*III\b", "%", (0, 200), (80, 120))
+_range("GOT", r"^(?:GOT|AST)\b", "U/l", (0, 20000), (None, 50))
+_range("GPT", r"^(?:GPT|ALT)\b", "U/l", (0, 20000), (None, 50))
+_range("CK", r"^CK\b", "U/l", (0, 200000), (None, 190))
+_range("LDH", r"^LDH\b", "U/l", (0, 50000), (None, 250))
+
+
+def _bound(value: Optional[float], default: float) -> float:
+    return default if value is None else float(value)
+
+
+def flag_values(df: pd.DataFrame, rules: Optional[Iterable[RangeRule]] = None) -> pd.DataFrame:
+    """Markiere Werte eines Zahlen-Datensatzes (Long-Format) in der Spalte `flag`.
+
+    Die Regel wird je Paar (parameter, unit) einmal gesucht; ihre vier Grenzen
+    werden über die Paar-Codes auf alle Zeilen verteilt und mit einem
+    Vergleich über den ganzen Frame ausgewertet — kein Schritt je Wert.
+    `flag` ist kategorial ("implausible", "low", "high"; fehlend = im Bereich
+    oder ohne Regel). Erwartet normalisierte Einheiten (`normalize_units`).
+    """
+    if df is None or not {"parameter", "value"}.issubset(df.columns):
+        return df
+    out = df.copy()
+    if out.empty:
+        out["flag"] = pd.Categorical([], categories=FLAGS)
+        return out
+    rules = tuple(RANGE_RULES.values() if rules is None else rules)
+    if "unit" in df.columns:
+        codes, pairs = factorize_pairs(df)
+    else:
+        codes, params = pd.factorize(df["parameter"].fillna(""))
+        pairs = [(str(p), None) for p in params]
+
+    bounds = np.empty((len(pairs), 4))
+    fraction = np.zeros(len(pairs), dtype=bool)
+    for i, (parameter, unit) in enumerate(pairs):
+        rule = next((r for r in rules if r.applies(parameter, unit)), None)
+        if rule is None:
+            bounds[i] = (-np.inf, np.inf, -np.inf, np.inf)
+        else:
+            bounds[i] = (
+                _bound(rule.plausible[0], -np.inf), _bound(rule.plausible[1], np.inf),
+                _bound(rule.reference[0], -np.inf), _bound(rule.reference[1], np.inf),
+            )
+            fraction[i] = rule.fraction
+    row_bounds = bounds[codes]
+    numeric = pd.to_numeric(df["value"], errors="coerce").to_numpy(dtype=float)
+    numeric = np.where(fraction[codes] & (numeric <= 1), numeric * 100, numeric)
+    # NaN (Text, fehlend) fällt bei jedem Vergleich heraus und bleibt unmarkiert
+    implausible = (numeric < row_bounds[:, 0]) | (numeric > row_bounds[:, 1])
+    low = ~implausible & (numeric < row_bounds[:, 2])
+    high = ~implausible & (numeric > row_bounds[:, 3])
+    flag_codes = np.select([implausible, low, high], [0, 1, 2], default=-1)
+    out["flag"] = pd.Categorical.from_codes(flag_codes, categories=FLAGS)
+    return out
+
+
+def implausible_rows(df: pd.DataFrame) -> pd.Series:
+    """Maske der als unplausibel markierten Zeilen (False ohne Spalte `flag`)."""
+    if df is None or "flag" not in df.columns:
+        return pd.Series(False, index=getattr(df, "index", None), dtype=bool)
+    return (df["flag"] == "implausible").fillna(False).astype(bool)
@@ -0,0 +1,385 @@
+import asyncio
+import json
+import logging
+import os
+import random
+import re
+import ssl
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urlencode, urlsplit
+
+logger = logging.getLogger(__name__)
+
+# Statuscodes, bei denen ein erneuter Versuch sinnvoll ist (Überlast, Gateway, Timeout)
+RETRY_STATUS = {408, 425, 429, 500, 502, 503, 504}
+
+
+class RedcapError(Exception):
+    """Fehler beim Import in REDCap (HTTP-Status != 200 oder ungültige Antwort)."""
+
+    def __init__(self, message: str, status: Optional[int] = None, body: str = ""):
+        super().__init__(message)
+        self.status = status
+        self.body = body
+
+
+@dataclass
+class ImportResult:
+    """Zusammenfassung eines Imports über alle Batches."""
+
+    records: int = 0
+    batches: int = 0
+    imported: int = 0
+    retries: int = 0
+    bytes_sent: int = 0
+    elapsed_s: float = 0.0
+    errors: List[str] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+
+def _field_name(view: str, parameter: str) -> str:
+    """Erzeuge einen REDCap-kompatiblen Feldnamen (a-z, 0-9, _; max. 100 Zeichen)."""
+    raw = f"{view}_{parameter}".lower()
+    raw = re.sub(r"[^a-z0-9]+", "_", raw).strip("_")
+    if not raw or not raw[0].isalpha():
+        raw = f"f_{raw}"
+    return raw[:100]
+
+
+def payload_to_records(
+    payload: Dict[str, Any],
+    record_id_field: str = "record_id",
+    daily_instrument: Optional[str] = None,
+) -> List[Dict[str, str]]:
+    """Wandle das `overview_payload` aus `views/overview.py` in flache REDCap-Records um.
+
+    Werte ohne Datum landen im Basis-Record des Patienten. Werte mit Datum werden pro
+    Tag gruppiert; ist `daily_instrument` gesetzt, wird daraus je Tag eine Instanz des
+    wiederholenden Instruments (redcap_repeat_instance = laufende Tagesnummer).
+
+    Ohne `daily_instrument` kommen auch datierte Werte in den Basis-Record; hat ein
+    Feld dann Werte an mehreren Tagen, würde nur der letzte importiert — in dem Fall
+    wird ein ValueError mit den betroffenen Feldern ausgelöst.
+    """
+    patient_key = str(payload.get("patient_key", "")).strip()
+    base: Dict[str, str] = {record_id_field: patient_key}
+    per_day: Dict[str, Dict[str, str]] = {}
+    base_dates: Dict[str, set] = {}
+    for entry in payload.get("parameters", []):
+        name = _field_name(str(entry.get("view", "")), str(entry.get("parameter", "")))
+        value = entry.get("value")
+        value = "" if value is None else str(value)
+        date = entry.get("date")
+        if date is None or str(date) in ("", "None", "NaT"):
+            base[name] = value
+        elif daily_instrument is None:
+            base_dates.setdefault(name, set()).add(str(date))
+            base[name] = value
+        else:
+            per_day.setdefault(str(date), {})[name] = value
+
+    conflicts = {name: sorted(dates) for name, dates in base_dates.items() if len(dates) > 1}
+    if conflicts:
+        listed = "; ".join(f"{name} ({len(dates)} Tage)" for name, dates in sorted(conflicts.items()))
+        raise ValueError(f"Werte an mehreren Tagen ohne wiederholendes Instrument (REDCAP_DAILY_INSTRUMENT): {listed}")
+
+    records = [base]
+    for instance, date in enumerate(sorted(per_day), start=1):
+        rec = {
+            record_id_field: patient_key,
+            "redcap_repeat_instrument": daily_instrument or "",
+            "redcap_repeat_instance": str(instance),
+        }
+        rec.update(per_day[date])
+        records.append(rec)
+    return records
+
+
+def batch_records(
+    records: Iterable[Dict[str, Any]],
+    max_batch_bytes: int = 500_000,
+    max_batch_records: int = 1000,
+) -> Iterator[List[Dict[str, Any]]]:
+    """Teile Records in Batches, deren JSON-Größe `max_batch_bytes` nicht überschreitet.
+
+    Ein einzelner Record, der größer als das Limit ist, wird als eigener Batch gesendet
+    (REDCap lehnt ihn dann ggf. ab, aber er wird nicht stillschweigend verworfen).
+    """
+    batch: List[Dict[str, Any]] = []
+    size = 2  # "[]"
+    for rec in records:
+        rec_size = len(json.dumps(rec, ensure_ascii=False).encode("utf-8")) + 1
+        if batch and (size + rec_size > max_batch_bytes or len(batch) >= max_batch_records):
+            yield batch
+            batch = []
+            size = 2
+        batch.append(rec)
+        size += rec_size
+    if batch:
+        yield batch
+
+
+class _Connection:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+
+    def close(self) -> None:
+        try:
+            self.writer.close()
+        except Exception:
+            pass
+
+
+class ConnectionPool:
+    """Kleiner HTTP/1.1-Keep-Alive-Pool auf Basis von asyncio-Streams.
+
+    Hält höchstens `max_connections` offene Verbindungen zu genau einem Host; freie
+    Verbindungen werden wiederverwendet, statt für jeden Batch neu aufzubauen.
+    """
+
+    def __init__(self, url: str, max_connections: int = 4, timeout: float = 30.0):
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https"):
+            raise ValueError(f"Nicht unterstütztes URL-Schema: {url}")
+        self.host = parts.hostname or "localhost"
+        self.port = parts.port or (443 if parts.scheme == "https" else 80)
+        self.path = parts.path or "/"
+        self.ssl = ssl.create_default_context() if parts.scheme == "https" else None
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self._idle: List[_Connection] = []
+        self._slots = asyncio.Semaphore(max_connections)
+        self.opened = 0
+
+    async def _acquire(self) -> _Connection:
+        await self._slots.acquire()
+        while self._idle:
+            conn = self._idle.pop()
+            if not conn.writer.is_closing() and not conn.reader.at_eof():
+                return conn
+            conn.close()
+        try:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(self.host, self.port, ssl=self.ssl), self.timeout
+            )
+        except BaseException:
+            self._slots.release()
+            raise
+        self.opened += 1
+        return _Connection(reader, writer)
+
+    def _release(self, conn: _Connection, reusable: bool) -> None:
+        if reusable:
+            self._idle.append(conn)
+        else:
+            conn.close()
+        self._slots.release()
+
+    async def post_form(self, fields: Dict[str, str]) -> Tuple[int, bytes]:
+        body = urlencode(fields).encode("utf-8")
+        head = (
+            f"POST {self.path} HTTP/1.1\r\n"
+            f"Host: {self.host}:{self.port}\r\n"
+            "Content-Type: application/x-www-form-urlencoded\r\n"
+            "Accept: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "Connection: keep-alive\r\n\r\n"
+        ).encode("ascii")
+        conn = await self._acquire()
+        reusable = False
+        try:
+            conn.writer.write(head + body)
+            await conn.writer.drain()
+            status, headers, data = await asyncio.wait_for(_read_response(conn.reader), self.timeout)
+            reusable = headers.get("connection", "").lower() != "close"
+            return status, data
+        finally:
+            self._release(conn, reusable)
+
+    async def close(self) -> None:
+        while self._idle:
+            conn = self._idle.pop()
+            conn.close()
+            try:
+                await conn.writer.wait_closed()
+            except Exception:
+                pass
+
+
+async def _read_response(reader: asyncio.StreamReader) -> Tuple[int, Dict[str, str], bytes]:
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("Verbindung vom Server geschlossen")
+    try:
+        status = int(status_line.split(b" ", 2)[1])
+    except (IndexError, ValueError):
+        raise ConnectionError(f"Ungültige Statuszeile: {status_line!r}")
+    headers: Dict[str, str] = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    if headers.get("transfer-encoding", "").lower() == "chunked":
+        chunks = []
+        while True:
+            size = int((await reader.readline()).split(b";")[0], 16)
+            if size == 0:
+                await reader.readline()
+                break
+            chunks.append(await reader.readexactly(size))
+            await reader.readline()
+        return status, headers, b"".join(chunks)
+    length = int(headers.get("content-length", "0"))
+    return status, headers, await reader.readexactly(length) if length else b""
+
+
+class RedcapImportClient:
+    """Asynchroner REDCap-API-Client für Record-Importe.
+
+    - Records werden größenbegrenzt gebatcht (`batch_records`).
+    - Höchstens `concurrency` Batches sind gleichzeitig unterwegs, über einen
+      gemeinsamen Keep-Alive-Verbindungspool.
+    - Überlast/Netzwerkfehler werden mit exponentiellem Backoff (mit Jitter)
+      wiederholt; 4xx-Fehler (z.B. ungültiges Feld) dagegen nicht.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        token: str,
+        concurrency: int = 4,
+        max_batch_bytes: int = 500_000,
+        max_batch_records: int = 1000,
+        max_retries: int = 5,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+        timeout: float = 60.0,
+        overwrite: bool = False,
+    ):
+        self.url = url
+        self.token = token
+        self.concurrency = max(1, int(concurrency))
+        self.max_batch_bytes = max_batch_bytes
+        self.max_batch_records = max_batch_records
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self.overwrite = overwrite
+        self._pool: Optional[ConnectionPool] = None
+
+    async def __aenter__(self) -> "RedcapImportClient":
+        self._pool = ConnectionPool(self.url, max_connections=self.concurrency, timeout=self.timeout)
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        if self._pool is not None:
+            await self._pool.close()
+            self._pool = None
+
+    def _form(self, batch: List[Dict[str, Any]]) -> Dict[str, str]:
+        return {
+            "token": self.token,
+            "content": "record",
+            "action": "import",
+            "format": "json",
+            "type": "flat",
+            "overwriteBehavior": "overwrite" if self.overwrite else "normal",
+            "returnContent": "count",
+            "returnFormat": "json",
+            "data": json.dumps(batch, ensure_ascii=False),
+        }
+
+    def _backoff(self, attempt: int) -> float:
+        delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        return delay * (0.5 + random.random() / 2)
+
+    async def _send_batch(self, batch: List[Dict[str, Any]], result: ImportResult) -> int:
+        assert self._pool is not None, "Client muss mit 'async with' verwendet werden"
+        form = self._form(batch)
+        attempt = 0
+        while True:
+            try:
+                status, body = await self._pool.post_form(form)
+            except (ConnectionError, OSError, asyncio.TimeoutError, asyncio.IncompleteReadError) as e:
+                status, body, err = None, b"", f"{type(e).__name__}: {e}"
+            else:
+                err = None
+                if status == 200:
+                    result.bytes_sent += len(form["data"])
+                    try:
+                        return int(json.loads(body or b"{}").get("count", len(batch)))
+                    except (ValueError, AttributeError):
+                        return len(batch)
+                if status not in RETRY_STATUS:
+                    raise RedcapError(
+                        f"REDCap-Import abgelehnt (HTTP {status}): {body[:500].decode('utf-8', 'replace')}",
+                        status=status,
+                        body=body.decode("utf-8", "replace"),
+                    )
+            if attempt >= self.max_retries:
+                raise RedcapError(
+                    f"REDCap-Import nach {attempt + 1} Versuchen fehlgeschlagen: {err or f'HTTP {status}'}",
+                    status=status,
+                    body=body.decode("utf-8", "replace"),
+                )
+            delay = self._backoff(attempt)
+            logger.warning("REDCap batch failed (%s), retry %d in %.2fs", err or f"HTTP {status}", attempt + 1, delay)
+            result.retries += 1
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def import_records(self, records: Iterable[Dict[str, Any]]) -> ImportResult:
+        """Importiere alle Records; Fehler einzelner Batches werden in `errors` gesammelt."""
+        result = ImportResult()
+        t0 = time.perf_counter()
+        sem = asyncio.Semaphore(self.concurrency)
+
+        async def _run(batch):
+            async with sem:
+                try:
+                    result.imported += await self._send_batch(batch, result)
+                except RedcapError as e:
+                    result.errors.append(str(e))
+
+        tasks = []
+        for batch in batch_records(records, self.max_batch_bytes, self.max_batch_records):
+            result.records += len(batch)
+            result.batches += 1
+            tasks.append(asyncio.create_task(_run(batch)))
+        if tasks:
+            await asyncio.gather(*tasks)
+        result.elapsed_s = time.perf_counter() - t0
+        logger.info(
+            "REDCap import: %d records in %d batches, %d imported, %d retries, %.2fs",
+            result.records, result.batches, result.imported, result.retries, result.elapsed_s,
+        )
+        return result
+
+
+def import_records(url: str, token: str, records: Iterable[Dict[str, Any]], **kwargs) -> ImportResult:
+    """Synchroner Wrapper (z.B. für Streamlit), der einen eigenen Event-Loop startet."""
+
+    async def _main():
+        async with RedcapImportClient(url, token, **kwargs) as client:
+            return await client.import_records(records)
+
+    return asyncio.run(_main())
+
+
+def redcap_config_from_env() -> Optional[Tuple[str, str]]:
+    """Liefert (url, token) aus REDCAP_API_URL / REDCAP_API_TOKEN oder None."""
+    url = os.environ.get("REDCAP_API_URL", "").strip()
+    token = os.environ.get("REDCAP_API_TOKEN", "").strip()
+    if not url or not token:
+        return None
+    return url, token
@@ -0,0 +1,329 @@
+import csv
+import io
+import json
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Spaltennamen eines REDCap-Data-Dictionary-Exports
+DD_FIELD = "Variable / Field Name"
+DD_FORM = "Form Name"
+DD_TYPE = "Field Type"
+DD_CHOICES = "Choices, Calculations, OR Slider Labels"
+DD_VALIDATION = "Text Validation Type OR Show Slider Number"
+DD_MIN = "Text Validation Min"
+DD_MAX = "Text Validation Max"
+DD_ANNOTATION = "Field Annotation"
+
+# Annotation im Data Dictionary, die ein REDCap-Feld einem mlife-Parameter zuordnet,
+# z.B. @MLIFE="df3_lab:KREATININ" (mehrere Tags pro Feld erlaubt).
+# @MLIFE-DATE markiert das Datumsfeld eines täglich wiederholten Instruments.
+_MLIFE_TAG = re.compile(r'@MLIFE="([^":]+):([^"]+)"')
+_MLIFE_DATE_TAG = "@MLIFE-DATE"
+
+_NUMERIC_VALIDATIONS = ("number", "number_1dp", "number_2dp", "number_1dp_comma_decimal", "number_2dp_comma_decimal", "number_comma_decimal")
+# Datumsfelder werden unabhängig vom Anzeigeformat im Format Y-M-D importiert
+_DATE_VALIDATIONS = ("date_ymd", "date_dmy", "date_mdy")
+# Zahl in Positionsschreibweise, wie sie REDCaps Zahlen-Validierung annimmt (nach Komma -> Punkt)
+_PLAIN_NUMBER = r"^-?\d+(?:\.\d+)?$"
+
+ENTRY_COLUMNS = ["patient_key", "view", "parameter", "date", "value"]
+
+
+@dataclass
+class DataDictionary:
+    """Geladenes REDCap Data Dictionary plus Zuordnung (view, parameter) -> Feldname."""
+
+    fields: pd.DataFrame
+    mapping: pd.DataFrame
+    record_id_field: str
+    repeating_forms: frozenset = frozenset()
+    date_fields: Dict[str, str] = field(default_factory=dict)
+
+    @classmethod
+    def from_csv(
+        cls,
+        path_or_buffer,
+        repeating_forms: Iterable[str] = (),
+        mapping: Optional[Dict[Tuple[str, str], str]] = None,
+    ) -> "DataDictionary":
+        """Lade ein Data Dictionary (CSV-Export aus REDCap).
+
+        Die Zuordnung zu mlife-Parametern kommt aus den @MLIFE-Annotationen;
+        `mapping` ({(view, parameter): feldname}) ergänzt bzw. überschreibt sie.
+        """
+        dd = pd.read_csv(path_or_buffer, dtype=str, keep_default_na=False)
+        for col in (DD_FORM, DD_TYPE, DD_CHOICES, DD_VALIDATION, DD_MIN, DD_MAX, DD_ANNOTATION):
+            if col not in dd.columns:
+                dd[col] = ""
+        fields = pd.DataFrame({
+            "field_name": dd[DD_FIELD].str.strip(),
+            "form_name": dd[DD_FORM].str.strip(),
+            "field_type": dd[DD_TYPE].str.strip().str.lower(),
+            "validation": dd[DD_VALIDATION].str.strip().str.lower(),
+            "min": pd.to_numeric(dd[DD_MIN].str.replace(",", ".", regex=False), errors="coerce"),
+            "max": pd.to_numeric(dd[DD_MAX].str.replace(",", ".", regex=False), errors="coerce"),
+            "choices": dd[DD_CHOICES],
+            "annotation": dd[DD_ANNOTATION],
+        })
+        fields = fields[fields["field_name"] != ""].reset_index(drop=True)
+
+        tags = fields["annotation"].str.extractall(_MLIFE_TAG)
+        if not tags.empty:
+            tags.index = tags.index.get_level_values(0)
+            pairs = pd.DataFrame({
+                "view": tags[0].str.strip().to_numpy(),
+                "parameter": tags[1].str.strip().to_numpy(),
+                "field_name": fields["field_name"].to_numpy()[tags.index.to_numpy()],
+            })
+        else:
+            pairs = pd.DataFrame(columns=["view", "parameter", "field_name"])
+        if mapping:
+            extra = pd.DataFrame([(v, p, f) for (v, p), f in mapping.items()], columns=["view", "parameter", "field_name"])
+            pairs = pd.concat([extra, pairs], ignore_index=True)
+        pairs = pairs.drop_duplicates(subset=["view", "parameter"], keep="first").reset_index(drop=True)
+        unknown = set(pairs["field_name"]) - set(fields["field_name"])
+        if unknown:
+            raise ValueError(f"Zuordnung verweist auf unbekannte REDCap-Felder: {sorted(unknown)}")
+
+        date_fields = dict(zip(
+            fields.loc[fields["annotation"].str.contains(_MLIFE_DATE_TAG, regex=False), "form_name"],
+            fields.loc[fields["annotation"].str.contains(_MLIFE_DATE_TAG, regex=False), "field_name"],
+        ))
+        return cls(
+            fields=fields,
+            mapping=pairs,
+            record_id_field=fields["field_name"].iloc[0],
+            repeating_forms=frozenset(repeating_forms),
+            date_fields=date_fields,
+        )
+
+    def choice_codes(self) -> pd.DataFrame:
+        """Erlaubte Codes für radio/dropdown/checkbox-Felder als (field_name, code)-Paare."""
+        sub = self.fields[self.fields["field_type"].isin(["radio", "dropdown", "yesno", "truefalse"])]
+        codes = sub["choices"].str.split("|").explode().str.split(",", n=1).str[0].str.strip()
+        out = pd.DataFrame({"field_name": sub.loc[codes.index, "field_name"].to_numpy(), "code": codes.to_numpy()})
+        yn = sub.loc[sub["field_type"].isin(["yesno", "truefalse"]), "field_name"]
+        out = pd.concat([out[out["code"].notna() & (out["code"] != "")],
+                         pd.DataFrame({"field_name": np.repeat(yn.to_numpy(), 2), "code": ["0", "1"] * len(yn)})])
+        return out.drop_duplicates().reset_index(drop=True)
+
+    def columns(self) -> List[str]:
+        """Spaltenreihenfolge der Import-Datei (Record-ID, Repeat-Spalten, Felder in DD-Reihenfolge)."""
+        used = set(self.mapping["field_name"]) | set(self.date_fields.values())
+        cols = [self.record_id_field]
+        if self.repeating_forms:
+            cols += ["redcap_repeat_instrument", "redcap_repeat_instance"]
+        cols += [f for f in self.fields["field_name"] if f in used and f != self.record_id_field]
+        return cols
+
+
+def entries_from_payloads(payloads: Iterable[dict], chunk_patients: int = 500) -> Iterator[pd.DataFrame]:
+    """Wandle Übersicht-Payloads (je Patient) in Eintrags-Frames mit ENTRY_COLUMNS um.
+
+    Es wird ein Frame je `chunk_patients` Patienten erzeugt (spaltenweise aus Listen
+    aufgebaut), damit nicht pro Patient ein eigener DataFrame entsteht.
+    """
+    cols: Dict[str, list] = {c: [] for c in ENTRY_COLUMNS}
+    n = 0
+    for payload in payloads:
+        key = str(payload.get("patient_key", "")).strip()
+        for p in payload.get("parameters", []):
+            cols["patient_key"].append(key)
+            cols["view"].append(p.get("view"))
+            cols["parameter"].append(p.get("parameter"))
+            cols["date"].append(p.get("date"))
+            cols["value"].append(p.get("value"))
+        n += 1
+        if n >= chunk_patients:
+            yield pd.DataFrame(cols, columns=ENTRY_COLUMNS)
+            cols = {c: [] for c in ENTRY_COLUMNS}
+            n = 0
+    if n:
+        yield pd.DataFrame(cols, columns=ENTRY_COLUMNS)
+
+
+def validate_entries(entries: pd.DataFrame, dd: DataDictionary) -> pd.DataFrame:
+    """Ordne Einträge Feldern zu und prüfe Typ/Bereich spaltenweise (vektorisiert).
+
+    Liefert `entries` ergänzt um `field_name`, `form_name`, `value_out` (normalisierter
+    Wert) und `error` (leer, wenn gültig). Mehrere verschiedene Werte für dasselbe
+    Feld in derselben Import-Zeile (Basis-Record bzw. Tagesinstanz) sind Fehler,
+    statt dass beim Pivotieren einer davon stillschweigend übrig bleibt.
+    """
+    e = entries.merge(dd.mapping, on=["view", "parameter"], how="left")
+    e = e.merge(dd.fields[["field_name", "form_name", "field_type", "validation", "min", "max"]], on="field_name", how="left")
+    raw = e["value"].astype("string").str.strip().fillna("")
+    out = raw.copy()
+    error = pd.Series("", index=e.index, dtype="string")
+
+    error = error.mask(e["field_name"].isna(), "nicht zugeordnet")
+    empty = raw == ""
+    mapped = e["field_name"].notna() & ~empty
+
+    numeric_like = e["validation"].isin(_NUMERIC_VALIDATIONS) | (e["validation"] == "integer")
+    normalized = raw.str.replace(",", ".", regex=False).str.replace(r"^\+", "", regex=True)
+    num = pd.to_numeric(normalized, errors="coerce")
+    num = num.where(np.isfinite(num.astype(float)))
+    bad_num = mapped & numeric_like & num.isna()
+    error = error.mask(bad_num, "keine Zahl")
+    bad_int = mapped & (e["validation"] == "integer") & num.notna() & (num != num.round())
+    error = error.mask(bad_int, "keine Ganzzahl")
+    below = mapped & numeric_like & num.notna() & e["min"].notna() & (num < e["min"])
+    above = mapped & numeric_like & num.notna() & e["max"].notna() & (num > e["max"])
+    error = error.mask(below, "unter Minimum").mask(above, "über Maximum")
+    ok_num = mapped & numeric_like & num.notna()
+    out = out.mask(ok_num & (e["validation"] == "integer"), num.round().astype("Int64").astype("string"))
+    # Dezimalzahlen unverändert (normalisiert) übernehmen; nur Exponentschreibweise
+    # ("1e-05") wird ohne Stellenverlust positional ausgeschrieben
+    decimal = ok_num & (e["validation"] != "integer")
+    out = out.mask(decimal, normalized)
+    exponent = decimal & ~normalized.str.match(_PLAIN_NUMBER).fillna(False).astype(bool)
+    if exponent.any():
+        out = out.mask(exponent, pd.Series(
+            [np.format_float_positional(v, trim="-") for v in num[exponent].to_numpy(dtype=float)],
+            index=e.index[exponent], dtype="string",
+        ))
+
+    is_date = mapped & e["validation"].isin(_DATE_VALIDATIONS)
+    if is_date.any():
+        parsed = pd.to_datetime(raw.where(is_date), errors="coerce", dayfirst=True)
+        error = error.mask(is_date & parsed.isna(), "kein Datum")
+        out = out.mask(is_date & parsed.notna(), parsed.dt.strftime("%Y-%m-%d").astype("string"))
+
+    codes = dd.choice_codes()
+    is_choice = mapped & e["field_type"].isin(["radio", "dropdown", "yesno", "truefalse"])
+    if is_choice.any():
+        key = e["field_name"].astype("string") + "\x00" + raw
+        allowed = codes["field_name"] + "\x00" + codes["code"]
+        error = error.mask(is_choice & ~key.isin(allowed), "ungültiger Code")
+
+    # Import-Zeile je Wert wie in `_wide_records`: Tagesinstanz oder Basis-Record
+    repeating = e["form_name"].isin(dd.repeating_forms) & e["date"].notna()
+    day = pd.to_datetime(e["date"].astype("string"), errors="coerce").dt.strftime("%Y-%m-%d").where(repeating, "")
+    ok = mapped & (error == "")
+    slots = pd.DataFrame({"patient_key": e["patient_key"], "field_name": e["field_name"], "day": day, "value": out})[ok]
+    conflict = slots.groupby(["patient_key", "field_name", "day"], dropna=False)["value"].transform("nunique") > 1
+    conflict = conflict.reindex(e.index, fill_value=False)
+    error = error.mask(conflict & ~repeating, "mehrere Werte ohne Wiederholung").mask(conflict & repeating, "mehrere Werte am selben Tag")
+
+    e["value_out"] = out.where(error == "", "")
+    e["error"] = error
+    return e
+
+
+def _wide_records(valid: pd.DataFrame, dd: DataDictionary, columns: List[str]) -> pd.DataFrame:
+    """Pivotiere gültige Einträge zu REDCap-Zeilen (Basis-Record + Tagesinstanzen)."""
+    rid = dd.record_id_field
+    valid = valid.copy()
+    repeating = valid["form_name"].isin(dd.repeating_forms) & valid["date"].notna()
+    valid["redcap_repeat_instrument"] = valid["form_name"].where(repeating, "")
+    day = pd.to_datetime(valid["date"].astype("string"), errors="coerce")
+    valid["_day"] = day.dt.strftime("%Y-%m-%d").where(repeating, "")
+    # Tagesnummer je Patient und Instrument: dichter Rang über die sortierten Tage
+    valid["_daynum"] = day.where(repeating)
+    valid["redcap_repeat_instance"] = (
+        valid.groupby(["patient_key", "redcap_repeat_instrument"])["_daynum"].rank(method="dense").astype("Int64").astype("string")
+    ).where(repeating, "")
+
+    keys = ["patient_key", "redcap_repeat_instrument", "redcap_repeat_instance"]
+    wide = valid.pivot_table(index=keys, columns="field_name", values="value_out", aggfunc="last").reset_index()
+    wide.columns.name = None
+
+    days = valid.loc[repeating, keys + ["_day"]].drop_duplicates(subset=keys)
+    if not days.empty and dd.date_fields:
+        wide = wide.merge(days, on=keys, how="left")
+        for form, date_field in dd.date_fields.items():
+            sel = wide["redcap_repeat_instrument"] == form
+            wide.loc[sel, date_field] = wide.loc[sel, "_day"]
+
+    # Basis-Record immer zuerst, dann Instanzen in Tagesreihenfolge
+    wide["_inst"] = pd.to_numeric(wide["redcap_repeat_instance"], errors="coerce").fillna(0)
+    wide = wide.sort_values(["patient_key", "redcap_repeat_instrument", "_inst"], kind="stable")
+    wide = wide.rename(columns={"patient_key": rid})
+    return wide.reindex(columns=columns).fillna("")
+
+
+@dataclass
+class CompileResult:
+    patients: int = 0
+    entries: int = 0
+    records: int = 0
+    invalid: int = 0
+    unmapped: int = 0
+    errors_sample: List[dict] = field(default_factory=list)
+
+
+def compile_import_file(
+    entries: Iterable[pd.DataFrame],
+    dd: DataDictionary,
+    out: TextIO,
+    fmt: str = "csv",
+    errors_out: Optional[TextIO] = None,
+    max_error_samples: int = 100,
+) -> CompileResult:
+    """Kompiliere Einträge vieler Patienten streamend in eine REDCap-Importdatei.
+
+    `entries` ist ein Iterator über Frames mit ENTRY_COLUMNS (z.B. aus
+    `entries_from_payloads`); jeder Frame wird als Ganzes validiert und sofort als
+    Zeilen geschrieben. Der Speicherbedarf hängt also nur von der Chunk-Größe ab,
+    nicht von der Gesamtzahl der Patienten. Die Einträge eines Patienten dürfen nicht
+    über mehrere Chunks verteilt sein.
+    Ungültige Werte werden leer exportiert und (optional) nach `errors_out` geschrieben.
+    """
+    if fmt not in ("csv", "json"):
+        raise ValueError(f"Unbekanntes Format: {fmt}")
+    columns = dd.columns()
+    result = CompileResult()
+    writer = csv.writer(out, lineterminator="\n") if fmt == "csv" else None
+    err_writer = csv.writer(errors_out, lineterminator="\n") if errors_out is not None else None
+    if writer is not None:
+        writer.writerow(columns)
+    else:
+        out.write("[")
+    if err_writer is not None:
+        err_writer.writerow(ENTRY_COLUMNS + ["field_name", "error"])
+    first_json = True
+
+    def _flush(chunk: pd.DataFrame):
+        nonlocal first_json
+        checked = validate_entries(chunk, dd)
+        bad = checked["error"] != ""
+        result.entries += len(checked)
+        result.invalid += int((bad & checked["field_name"].notna()).sum())
+        result.unmapped += int(checked["field_name"].isna().sum())
+        if bad.any():
+            bad_rows = checked.loc[bad, ENTRY_COLUMNS + ["field_name", "error"]]
+            if err_writer is not None:
+                err_writer.writerows(bad_rows.astype("string").fillna("").itertuples(index=False, name=None))
+            room = max_error_samples - len(result.errors_sample)
+            if room > 0:
+                result.errors_sample.extend(bad_rows.head(room).astype(object).where(bad_rows.head(room).notna(), None).to_dict("records"))
+        valid = checked[checked["field_name"].notna()]
+        wide = _wide_records(valid, dd, columns)
+        result.records += len(wide)
+        if writer is not None:
+            writer.writerows(wide.itertuples(index=False, name=None))
+        else:
+            for rec in wide.to_dict("records"):
+                out.write(("" if first_json else ",") + json.dumps(rec, ensure_ascii=False))
+                first_json = False
+
+    for frame in entries:
+        if frame.empty:
+            continue
+        result.patients += int(frame["patient_key"].nunique())
+        _flush(frame)
+    if writer is None:
+        out.write("]")
+    return result
+
+
+def compile_payload_to_string(payload: dict, dd: DataDictionary, fmt: str = "csv") -> Tuple[str, CompileResult]:
+    """Bequeme Variante für einen einzelnen Patienten (z.B. Download in der Übersicht)."""
+    buf = io.StringIO()
+    result = compile_import_file(entries_from_payloads([payload]), dd, buf, fmt=fmt)
+    return buf.getvalue(), result
@@ -0,0 +1,157 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Hashable, Iterable, Optional, Tuple
+
+import pandas as pd
+
+from logging_config import get_pipeline_logger
+from services.datasets import _frame_nbytes, _freeze, read_only_view
+
+logger = get_pipeline_logger()
+
+# Obergrenze für alle zwischengespeicherten Ansichts-Ergebnisse des Prozesses (MB)
+RESULT_CACHE_MAX_MB = int(os.environ.get("VIEW_RESULT_CACHE_MAX_MB", 256))
+
+# (Inhalts-Hash des Exports, Datensatzname), z.B. (datasets.content_hash, "vitals")
+DatasetKey = Tuple[str, str]
+
+
+def result_key(
+    dataset: DatasetKey,
+    view: str,
+    params: Optional[Iterable] = None,
+    devices: Optional[Iterable] = None,
+    start_dt=None,
+    end_dt=None,
+    mode: str = "raw",
+    **options: Hashable,
+) -> tuple:
+    """Schlüssel eines gefilterten/aggregierten Ergebnisses.
+
+    Parameter und Geräte sind Mengen — die Reihenfolge der Auswahl ändert das
+    Ergebnis nicht. `mode` ist die Aggregation ("raw", "daily"), `options`
+    weitere Schalter, die das Ergebnis bestimmen (z.B. exclude_implausible).
+    """
+    return (
+        tuple(dataset), view,
+        frozenset(params or ()), frozenset(devices or ()),
+        start_dt, end_dt, mode,
+        tuple(sorted(options.items())),
+    )
+
+
+class ResultCache:
+    """LRU-Cache der gefilterten und aggregierten Frames der Ansichten.
+
+    Der Schlüssel beginnt mit dem Datensatz (`DatasetKey`), danach folgt der
+    Zustand der Ansicht (`result_key`). Ein erneut gewählter Zustand — zurück
+    zur vorherigen Parameterauswahl, Tagesmittel aus und wieder an — kommt
+    ohne Rechnung aus dem Cache; die Übersicht nutzt dieselben Einträge wie
+    die Ansichten. Gespeicherte Frames sind wie die Datensätze schreibgeschützt
+    (`_freeze`), jeder Abruf liefert eine flache Kopie. Überschreitet die Summe
+    `max_bytes`, fallen die am längsten nicht genutzten Einträge heraus;
+    Ergebnisse größer als das Budget werden nicht gespeichert.
+    """
+
+    def __init__(self, max_bytes: int = RESULT_CACHE_MAX_MB * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[tuple, Tuple[pd.DataFrame, int]]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._nbytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple) -> Optional[pd.DataFrame]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return read_only_view(entry[0])
+
+    def get_or_compute(self, key: tuple, compute: Callable[[], pd.DataFrame]) -> pd.DataFrame:
+        """Ergebnis zu `key`; bei einem Fehltreffer `compute()` ausführen und speichern.
+
+        `compute` läuft ohne Lock, damit andere Sessions nicht warten; rechnen
+        zwei Sessions denselben Zustand gleichzeitig, gewinnt der letzte Eintrag.
+        """
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+        frame = compute()
+        with self._lock:
+            self.misses += 1
+        if not isinstance(frame, pd.DataFrame):
+            return frame
+        nbytes = _frame_nbytes(frame)
+        if nbytes > self.max_bytes:
+            logger.debug("result cache: %s not cached (%.1f MB over budget)", key[:2], nbytes / 1e6)
+            return frame
+        _freeze(frame)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._nbytes -= old[1]
+            self._entries[key] = (frame, nbytes)
+            self._nbytes += nbytes
+            self.evict()
+        return read_only_view(frame)
+
+    def evict(self) -> int:
+        """Entferne LRU-Einträge, bis der Speicher unter `max_bytes` liegt."""
+        removed = 0
+        with self._lock:
+            while self._entries and self._nbytes > self.max_bytes:
+                _, (_, nbytes) = self._entries.popitem(last=False)
+                self._nbytes -= nbytes
+                removed += 1
+        return removed
+
+    def discard(self, content_hash: str) -> int:
+        """Alle Einträge eines Exports entfernen (z.B. wenn die Registry ihn verwirft)."""
+        with self._lock:
+            keys = [k for k in self._entries if k[0][0] == content_hash]
+            for k in keys:
+                self._nbytes -= self._entries.pop(k)[1]
+        return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._nbytes = 0
+
+    @property
+    def nbytes(self) -> int:
+        with self._lock:
+            return self._nbytes
+
+    def __contains__(self, key: tuple) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_CACHE: Optional[ResultCache] = None
+_CACHE_LOCK = threading.Lock()
+
+
+def get_result_cache() -> ResultCache:
+    """Der Ergebnis-Cache des Prozesses (von allen Streamlit-Sessions geteilt)."""
+    global _CACHE
+    with _CACHE_LOCK:
+        if _CACHE is None:
+            _CACHE = ResultCache()
+        return _CACHE
+
+
+def cached_result(dataset: Optional[DatasetKey], view: str, compute: Callable[[], pd.DataFrame], **state) -> pd.DataFrame:
+    """`compute()` über den Ergebnis-Cache; ohne `dataset` (Tests, alte Aufrufer) direkt.
+
+    `state` sind die übrigen Felder von `result_key`.
+    """
+    if dataset is None:
+        return compute()
+    return get_result_cache().get_or_compute(result_key(dataset, view, **state), compute)
@@ -0,0 +1,199 @@
+import re
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from services.alignment import SeriesRef, select_series
+from services.units import unit_key
+
+DETAIL_COLUMNS = ["period", "score", "component", "criterion", "worst_value", "points"]
+
+
+@dataclass(frozen=True)
+class Criterion:
+    """Ein Kriterium einer Score-Komponente: schlechtester Wert je Fenster -> Punkte.
+
+    `thresholds` aufsteigend, `points` hat ein Element mehr (Punkte unterhalb der
+    ersten Schwelle, zwischen den Schwellen, ab der letzten). Mit
+    `upper_inclusive=True` gehört ein Wert genau auf der Schwelle zum oberen
+    Bereich (x >= t), sonst zum unteren (x > t). `worst` ist "min" oder "max".
+    `transform(values, context)` rechnet Einheiten um (z.B. mg/h -> µg/kg/min);
+    Kriterien mit `requires` werden nur ausgewertet, wenn diese Kontext-Werte
+    (z.B. weight_kg) bekannt sind. Mit `unit` zählen nur Zeilen in dieser
+    Einheit (Frames ohne Spalte `unit` gelten als passend) — z.B. bleiben
+    Perfusor-Raten in ml/h ohne bekannte Konzentration unbewertet.
+    """
+
+    name: str
+    source: SeriesRef
+    worst: str
+    thresholds: Tuple[float, ...]
+    points: Tuple[int, ...]
+    upper_inclusive: bool = True
+    transform: Optional[Callable[[np.ndarray, dict], np.ndarray]] = None
+    requires: Tuple[str, ...] = ()
+    unit: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class ScoreComponent:
+    """Komponente = Maximum der Punkte ihrer Kriterien im selben Fenster."""
+
+    name: str
+    criteria: Tuple[Criterion, ...]
+
+
+@dataclass(frozen=True)
+class ScoreDefinition:
+    """Score = Summe der Komponenten je Fenster (`freq`, Standard: Kalendertag)."""
+
+    name: str
+    components: Tuple[ScoreComponent, ...]
+    freq: str = "D"
+
+    def required_datasets(self) -> List[str]:
+        out: List[str] = []
+        for comp in self.components:
+            for crit in comp.criteria:
+                if crit.source.dataset not in out:
+                    out.append(crit.source.dataset)
+        return out
+
+
+SCORE_DEFINITIONS: Dict[str, ScoreDefinition] = {}
+
+
+def register_score(definition: ScoreDefinition) -> ScoreDefinition:
+    SCORE_DEFINITIONS[definition.name] = definition
+    return definition
+
+
+def _norepinephrine_ug_kg_min(mg_per_h: np.ndarray, context: dict) -> np.ndarray:
+    return mg_per_h * 1000.0 / 60.0 / float(context["weight_kg"])
+
+
+_VASOPRESSORS = re.compile(r"^(?:Noradrenalin|Norepinephrin|Adrenalin|Epinephrin|Suprarenin|Arterenol).* – max\. Rate$", re.IGNORECASE)
+_INOTROPES = re.compile(r"^(?:Dobutamin|Dopamin).* – max\. Rate$", re.IGNORECASE)
+
+# SOFA nach Vincent et al. 1996; Atmung ohne die Bedingung "beatmet" für 3/4 Punkte,
+# Niere ohne Urinmenge
+register_score(ScoreDefinition(
+    name="SOFA",
+    components=(
+        ScoreComponent("Atmung", (
+            Criterion("PaO2/FiO2", SeriesRef("derived", "PaO2/FiO2 (Horovitz)"), "min", (100, 200, 300, 400), (4, 3, 2, 1, 0)),
+        )),
+        ScoreComponent("Gerinnung", (
+            Criterion("Thrombozyten", SeriesRef("lab", "PLT"), "min", (20, 50, 100, 150), (4, 3, 2, 1, 0)),
+        )),
+        ScoreComponent("Leber", (
+            Criterion("Bilirubin", SeriesRef("lab", "BILI (TOT.)"), "max", (1.2, 2.0, 6.0, 12.0), (0, 1, 2, 3, 4)),
+        )),
+        ScoreComponent("Kreislauf", (
+            Criterion("MAP", SeriesRef("vitals", "ARTm"), "min", (70,), (1, 0)),
+            Criterion("Dobutamin/Dopamin", SeriesRef("medication_daily", _INOTROPES), "max", (0,), (0, 2), upper_inclusive=False),
+            Criterion("Vasopressor", SeriesRef("medication_daily", _VASOPRESSORS), "max", (0,), (0, 3), upper_inclusive=False),
+            Criterion(
+                "Noradrenalin > 0,1 µg/kg/min",
+                SeriesRef("medication_daily", re.compile(r"^Noradrenalin.* – max\. Rate$", re.IGNORECASE)),
+                "max", (0.1,), (0, 4), upper_inclusive=False,
+                transform=_norepinephrine_ug_kg_min, requires=("weight_kg",), unit="mg/h",
+            ),
+        )),
+        ScoreComponent("Niere", (
+            Criterion("Kreatinin", SeriesRef("lab", "KREATININ"), "max", (1.2, 2.0, 3.5, 5.0), (0, 1, 2, 3, 4)),
+        )),
+    ),
+))
+
+
+def required_datasets(names: Optional[Iterable[str]] = None) -> List[str]:
+    out: List[str] = []
+    for n in (names if names is not None else SCORE_DEFINITIONS):
+        for ds in SCORE_DEFINITIONS[n].required_datasets():
+            if ds not in out:
+                out.append(ds)
+    return out
+
+
+def evaluate_scores(
+    frames: Dict[str, pd.DataFrame],
+    definitions: Optional[Sequence[ScoreDefinition]] = None,
+    context: Optional[dict] = None,
+) -> pd.DataFrame:
+    """Alle Kriterien aller Scores für alle Fenster in einem Durchlauf.
+
+    Die Messreihen aller Kriterien werden zu einem Frame zusammengefasst; der
+    schlechteste Wert je (Kriterium, Fenster) kommt aus einem einzigen groupby.
+    Pro Kriterium bleibt nur die Punktvergabe per np.digitize — keine Schleife
+    über Tage. Ergebnis im Long-Format: period, score, component, criterion,
+    worst_value, points.
+    """
+    context = context or {}
+    definitions = list(definitions) if definitions is not None else list(SCORE_DEFINITIONS.values())
+    criteria: List[Tuple[ScoreDefinition, ScoreComponent, Criterion]] = [
+        (d, comp, crit)
+        for d in definitions
+        for comp in d.components
+        for crit in comp.criteria
+        if all(context.get(k) is not None for k in crit.requires)
+    ]
+    parts = []
+    for cid, (definition, _, crit) in enumerate(criteria):
+        frame = frames.get(crit.source.dataset)
+        if crit.unit is not None and frame is not None and "unit" in frame.columns:
+            frame = frame[frame["unit"].map(unit_key) == unit_key(crit.unit)]
+        series = select_series(frame, crit.source.parameter, crit.source.panel)
+        if series.empty:
+            continue
+        values = series["value"].to_numpy(dtype=float)
+        if crit.transform is not None:
+            values = crit.transform(values, context)
+        parts.append(pd.DataFrame({"cid": cid, "period": series["timestamp_parsed"].dt.floor(definition.freq), "value": values}))
+    if not parts:
+        return pd.DataFrame(columns=DETAIL_COLUMNS)
+
+    batch = pd.concat(parts, ignore_index=True)
+    agg = batch.groupby(["cid", "period"], sort=True)["value"].agg(["min", "max"]).reset_index()
+    use_max = np.array([crit.worst == "max" for _, _, crit in criteria])
+    agg["worst_value"] = np.where(use_max[agg["cid"].to_numpy()], agg["max"], agg["min"])
+    points = np.empty(len(agg), dtype=int)
+    for cid, rows in agg.groupby("cid", sort=False).indices.items():
+        crit = criteria[cid][2]
+        bins = np.digitize(agg["worst_value"].to_numpy()[rows], crit.thresholds, right=not crit.upper_inclusive)
+        points[rows] = np.asarray(crit.points)[bins]
+    agg["points"] = points
+    agg["score"] = [criteria[c][0].name for c in agg["cid"]]
+    agg["component"] = [criteria[c][1].name for c in agg["cid"]]
+    agg["criterion"] = [criteria[c][2].name for c in agg["cid"]]
+    return agg[DETAIL_COLUMNS]
+
+
+def score_table(detail: pd.DataFrame) -> pd.DataFrame:
+    """Breite Tabelle je (Score, Fenster): Punkte je Komponente, Summe und Anzahl bewerteter Komponenten."""
+    if detail is None or detail.empty:
+        return pd.DataFrame(columns=["score", "period", "Gesamt", "Komponenten"])
+    comp = detail.groupby(["score", "period", "component"], sort=True)["points"].max().unstack("component")
+    comp["Gesamt"] = comp.sum(axis=1, min_count=1)
+    comp["Komponenten"] = comp.drop(columns="Gesamt").notna().sum(axis=1)
+    comp.columns.name = None
+    return comp.reset_index()
+
+
+def scores_long(detail: pd.DataFrame) -> pd.DataFrame:
+    """Punkte je Komponente und Gesamtpunkte im Long-Format der Zahlen-Views (für die Übersicht)."""
+    cols = ["timestamp", "timestamp_parsed", "parameter", "unit", "value"]
+    table = score_table(detail)
+    if table.empty:
+        return pd.DataFrame(columns=cols)
+    long = table.drop(columns="Komponenten").melt(id_vars=["score", "period"], var_name="component", value_name="value").dropna(subset=["value"])
+    out = pd.DataFrame({
+        "timestamp_parsed": long["period"],
+        "parameter": long["score"] + " " + long["component"],
+        "unit": "Punkte",
+        "value": long["value"].astype(float),
+    })
+    out.insert(0, "timestamp", out["timestamp_parsed"].dt.strftime("%Y-%m-%d"))
+    return out.sort_values(["timestamp_parsed", "parameter"], kind="stable").reset_index(drop=True)[cols]
@@ -0,0 +1,136 @@
+import re
+from typing import Dict, Iterable, List, Optional, Pattern, Tuple, Union
+
+Query = Union[str, Pattern]
+
+
+class SectionMatcher:
+    """Mehrere Suchbegriffe für Header aus "ALLE Patientendaten".
+
+    Strings werden wie bisher als case-insensitive Teilstrings geprüft
+    (`query.lower() in header.lower()`), kompilierte Regex-Objekte per
+    `search`. Alle Regex-Begriffe werden zu einem case-insensitiven Muster
+    zusammengefasst.
+    """
+
+    def __init__(self, queries: Iterable[Query]):
+        self.substrings: List[str] = []
+        regexes: List[str] = []
+        for q in queries:
+            if isinstance(q, re.Pattern):
+                regexes.append(q.pattern)
+            else:
+                self.substrings.append(str(q).lower())
+        self.regex: Optional[Pattern] = re.compile("|".join(f"(?:{r})" for r in regexes), re.IGNORECASE) if regexes else None
+
+    def __call__(self, header: str) -> bool:
+        lowered = header.lower()
+        if any(s in lowered for s in self.substrings):
+            return True
+        return bool(self.regex is not None and self.regex.search(header))
+
+
+def compile_matcher(*queries: Query) -> SectionMatcher:
+    """z.B. `compile_matcher("ecmo", re.compile(r"^impella"))`."""
+    return SectionMatcher(queries)
+
+
+class SectionIndex:
+    """Einmaliger Index über den Block "ALLE Patientendaten".
+
+    Beim Aufbau wird der Text genau einmal zeilenweise zerlegt:
+    - `headers`: alle Header (dritte Spalte von `;;Header`-Zeilen, ohne "Datum"),
+      als Set in derselben Einfügereihenfolge wie `extract_all_patient_data_headers`;
+    - `events`: alle Grenzzeilen (dritte Spalte ist ein Header) als (Header, Zeile);
+    - `segments[i]`: die Inhaltszeilen (>= 3 Felder) zwischen Grenze i und i+1.
+
+    Abfragen laufen danach nur noch über die Grenzen und die Zeilen der
+    getroffenen Abschnitte.
+    """
+
+    def __init__(self, text: str, DELIMITER: str = ";"):
+        self.DELIMITER = DELIMITER
+        # nur die ersten drei Felder werden gebraucht; >= 3 Felder <=> maxsplit-Ergebnis >= 3
+        rows: List[Tuple[int, str, str]] = []
+        headers = set()
+        for i, line in enumerate(text.splitlines()):
+            parts = line.split(DELIMITER, 3)
+            if len(parts) < 3:
+                continue
+            rows.append((i, line, parts[2]))
+            if parts[0] == "" and parts[1] == "" and parts[2] and parts[2] != "Datum":
+                headers.add(parts[2])
+        self.headers = headers
+
+        self.events: List[Tuple[str, str]] = []
+        self.event_lines: List[int] = []
+        self.segments: List[List[str]] = []
+        current: Optional[List[str]] = None
+        for i, line, key in rows:
+            if key in headers:
+                current = []
+                self.events.append((key, line))
+                self.event_lines.append(i)
+                self.segments.append(current)
+            elif current is not None:
+                current.append(line)
+        self.n_lines = rows[-1][0] + 1 if rows else 0
+
+    @property
+    def line_ranges(self) -> Dict[str, List[Tuple[int, int]]]:
+        """Header -> Zeilenbereiche [Grenzzeile, nächste Grenzzeile) im Block."""
+        out: Dict[str, List[Tuple[int, int]]] = {}
+        ends = self.event_lines[1:] + [self.n_lines]
+        for (key, _), start, end in zip(self.events, self.event_lines, ends):
+            out.setdefault(key, []).append((start, end))
+        return out
+
+    def matching_headers(self, matcher: SectionMatcher) -> List[str]:
+        return [header for header in self.headers if matcher(header)]
+
+    def section_segments(self, matcher: SectionMatcher) -> Dict[str, Dict[str, List[int]]]:
+        """Header -> nummerierte Sub-Header -> Indizes in `segments` (Dokumentreihenfolge).
+
+        Die Zustandsmaschine ist unverändert übernommen, läuft aber nur über die
+        Grenzzeilen. Die Zuordnung hängt nur von den Grenzen ab, nicht vom Inhalt
+        der Abschnitte — vorab (z.B. parallel) geparste Abschnitte lassen sich
+        damit genau wie `sections()` zusammensetzen.
+        """
+        matching_headers = self.matching_headers(matcher)
+        matching = set(matching_headers)
+        result: Dict[str, Dict[str, List[int]]] = {header: {} for header in matching_headers}
+        if not matching:
+            return result
+
+        current_header: Optional[str] = None
+        current_sub_header_counter = 1
+        current_sub_header: Optional[str] = None
+        current_sub_header_line: Optional[str] = None
+
+        for seg, (key, line) in enumerate(self.events):
+            if key in matching:
+                if key == current_header:
+                    if current_sub_header_line is None:
+                        current_sub_header_line = line
+                    elif line != current_sub_header_line:
+                        current_sub_header_counter += 1
+                        current_sub_header_line = line
+                else:
+                    current_sub_header_counter = 1
+
+                current_header = key
+                current_sub_header = f"{current_header} {current_sub_header_counter}"
+                result[current_header].setdefault(current_sub_header, []).append(seg)
+            else:
+                current_header = None
+                current_sub_header = None
+                current_sub_header_line = None
+                current_sub_header_counter = 1
+        return result
+
+    def sections(self, matcher: SectionMatcher) -> Dict[str, Dict[str, List[str]]]:
+        """Header -> nummerierte Sub-Header -> Zeilen, wie `get_from_all_patient_data_by_string`."""
+        return {
+            header: {sub: [line for seg in segs for line in self.segments[seg]] for sub, segs in subs.items()}
+            for header, subs in self.section_segments(matcher).items()
+        }
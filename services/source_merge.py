@@ -0,0 +1,127 @@
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from logging_config import get_pipeline_logger
+from services.alignment import _match
+from services.plausibility import implausible_rows
+
+logger = get_pipeline_logger()
+
+REPORT_COLUMNS = ["panel", "parameter", "rows", "removed"]
+
+
+@dataclass(frozen=True)
+class MergeRule:
+    """Zusammenführen der Quellen (Panels) einer Block-Kategorie.
+
+    `priority` sind die Panels in absteigender Priorität; nicht genannte
+    Panels kommen danach. Ein Wert wird verworfen, wenn ein behaltener Wert
+    einer höheren Quelle zum selben Parameter höchstens `tolerance` entfernt
+    liegt; innerhalb einer Quelle nur bei identischem Zeitpunkt. `aliases`
+    bildet abweichende Parameternamen einer Quelle auf einen gemeinsamen
+    Schlüssel ab (nur zum Vergleich, die Namen bleiben erhalten).
+    """
+
+    priority: Tuple[str, ...]
+    tolerance: pd.Timedelta = pd.Timedelta(minutes=5)
+    aliases: Dict[str, str] = field(default_factory=dict)
+
+
+# Online (Gerät, lückenlose Reihe) vor manueller Eingabe; Kategorien aus services/headers.py
+MERGE_RULES: Dict[str, MergeRule] = {
+    "Vitaldaten": MergeRule(
+        priority=("Online erfasste Vitaldaten", "Manuell erfasste Vitaldaten"),
+        aliases={"Herzfrequenz (bpm)": "HF", "Temperatur in C": "Temp"},
+    ),
+    "Respiratordaten": MergeRule(
+        priority=("Online erfasste Respiratorwerte", "Beatmung", "Manuell erfasste Respiratorwerte"),
+    ),
+}
+
+
+def register_merge(category: str, rule: MergeRule) -> MergeRule:
+    MERGE_RULES[category] = rule
+    return rule
+
+
+def mark_duplicates(df: pd.DataFrame, rule: MergeRule) -> np.ndarray:
+    """Maske der Zeilen, die ein Wert einer höheren Quelle bereits abdeckt.
+
+    Alle Zeilen werden einmal nach (Schlüssel, Zeit, Rang) sortiert; gleiche
+    Nachbarn sind exakte Duplikate. Für das Toleranzfenster wird je Rang eine
+    binäre Suche gegen die behaltenen Zeilen höherer Quellen gemacht — die
+    Zeitachse der Schlüssel ist dazu so gestaffelt (Abstand > 2 × Toleranz),
+    dass Treffer nie über Parametergrenzen reichen. Als unplausibel markierte
+    Werte (Spalte `flag`) gehen hinter alle plausiblen.
+    """
+    n = len(df)
+    dup = np.zeros(n, dtype=bool)
+    if n == 0:
+        return dup
+    times = df["timestamp_parsed"]
+    valid = times.notna().to_numpy()
+    if not valid.any():
+        return dup
+
+    param_codes, params = pd.factorize(df["parameter"].fillna(""))
+    key_codes = pd.factorize(pd.Index([rule.aliases.get(p, p) for p in params]))[0][param_codes]
+    ranks = {panel: i for i, panel in enumerate(rule.priority)}
+    rank = df["panel"].map(ranks).fillna(len(rule.priority)).to_numpy(dtype=np.int64)
+    rank = rank + implausible_rows(df).to_numpy() * (len(rule.priority) + 1)
+
+    # Sekunden relativ zum Beginn, je Schlüssel um `stride` versetzt
+    secs = times.to_numpy(dtype="datetime64[s]").astype(np.int64)
+    tol = int(rule.tolerance.total_seconds())
+    start = secs[valid].min()
+    stride = int(secs[valid].max() - start) + 2 * tol + 1
+    pos = key_codes.astype(np.int64) * stride + (secs - start)
+
+    idx = np.flatnonzero(valid)
+    order = idx[np.lexsort((idx, rank[idx], pos[idx]))]
+    same = pos[order][1:] == pos[order][:-1]
+    dup[order[1:][same]] = True
+
+    if tol > 0:
+        levels = np.unique(rank[valid])
+        for level in levels[1:]:
+            kept_above = valid & ~dup & (rank < level)
+            candidates = np.flatnonzero(valid & ~dup & (rank == level))
+            if not kept_above.any() or not len(candidates):
+                continue
+            hit = _match(pos[candidates], np.sort(pos[kept_above]), tol, "nearest")
+            dup[candidates[hit >= 0]] = True
+    return dup
+
+
+def merge_sources(df: pd.DataFrame, rule: Optional[MergeRule]) -> pd.DataFrame:
+    """Entferne Mehrfachwerte aus mehreren Quellen einer Kategorie.
+
+    Der Bericht (je Panel und Parameter: Zeilen, entfernt) steht als Tupel in
+    `attrs["source_merge"]` — pandas reicht attrs an gefilterte Frames weiter
+    und vergleicht sie bei concat, deshalb kein DataFrame. Ohne Regel oder ohne
+    Duplikate bleibt der Frame unverändert.
+    """
+    if df is None or rule is None or df.empty or not {"panel", "parameter", "timestamp_parsed"}.issubset(df.columns):
+        return df
+    dup = mark_duplicates(df, rule)
+    if not dup.any():
+        return df
+    report = (
+        pd.DataFrame({"panel": df["panel"].astype(object), "parameter": df["parameter"].astype(object), "removed": dup})
+        .groupby(["panel", "parameter"], sort=False)["removed"].agg(rows="size", removed="sum")
+        .reset_index()
+    )
+    report = report[report["removed"] > 0].reset_index(drop=True)[REPORT_COLUMNS]
+    logger.info("merge_sources removed=%d of %d rows (%s)", int(dup.sum()), len(df), ", ".join(f"{p}: {int(r)}" for p, r in report.groupby("panel")["removed"].sum().items()))
+    out = df[~dup].reset_index(drop=True)
+    out.attrs["source_merge"] = tuple(report.itertuples(index=False, name=None))
+    return out
+
+
+def merge_report(df: Optional[pd.DataFrame]) -> pd.DataFrame:
+    """Bericht von `merge_sources` zu einem (ggf. gefilterten) Frame; leer ohne Merge."""
+    rows = getattr(df, "attrs", {}).get("source_merge", ())
+    return pd.DataFrame(list(rows), columns=REPORT_COLUMNS)
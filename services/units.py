@@ -0,0 +1,158 @@
+import re
+from dataclasses import dataclass
+from functools import lru_cache, partial
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass(frozen=True)
+class UnitRule:
+    """Standard-Einheit eines Analyten und Faktoren aus den übrigen Einheiten.
+
+    `pattern` wird gegen den Parameternamen geprüft (ohne Einheit, wie ihn
+    `parse_numerics._extract_name_unit` liefert). `factors` bildet Einheiten auf
+    den Faktor ab, mit dem ein Wert multipliziert die Standard-Einheit ergibt;
+    Schreibweisen werden über `unit_key` verglichen (µmol/l = umol/L).
+    """
+
+    analyte: str
+    pattern: re.Pattern
+    canonical: str
+    factors: Dict[str, float]
+
+    def factor(self, unit: Optional[str]) -> Optional[float]:
+        key = unit_key(unit)
+        if key is None:
+            return None
+        if key == unit_key(self.canonical):
+            return 1.0
+        return self._keyed_factors().get(key)
+
+    def _keyed_factors(self) -> Dict[str, float]:
+        return {unit_key(u): f for u, f in self.factors.items()}
+
+
+UNIT_RULES: Dict[str, UnitRule] = {}
+
+
+def register_unit(rule: UnitRule) -> UnitRule:
+    UNIT_RULES[rule.analyte] = rule
+    _lookup.cache_clear()
+    return rule
+
+
+def unit_key(unit: Optional[str]) -> Optional[str]:
+    """Vergleichsform einer Einheit: klein, ohne Leerzeichen, µ/μ -> u."""
+    if unit is None or (isinstance(unit, float) and np.isnan(unit)):
+        return None
+    key = str(unit).strip().casefold().replace("µ", "u").replace("μ", "u").replace(" ", "")
+    return key or None
+
+
+def resolve_unit(parameter: str, unit: Optional[str], rules: Iterable[UnitRule]) -> Tuple[float, Optional[str]]:
+    """(Faktor, Standard-Einheit) für ein Paar Parameter/Einheit.
+
+    Die erste passende Regel entscheidet; ohne Regel oder bei unbekannter bzw.
+    fehlender Einheit (1.0, None) — der Wert bleibt dann unverändert.
+    """
+    for rule in rules:
+        if rule.pattern.search(parameter):
+            factor = rule.factor(unit)
+            return (1.0, None) if factor is None else (factor, rule.canonical)
+    return 1.0, None
+
+
+@lru_cache(maxsize=4096)
+def _lookup(parameter: str, unit: Optional[str]) -> Tuple[float, Optional[str]]:
+    return resolve_unit(parameter, unit, UNIT_RULES.values())
+
+
+def _resolve_with(rules: Tuple[UnitRule, ...], parameter: str, unit: Optional[str]) -> Tuple[float, Optional[str]]:
+    return resolve_unit(parameter, unit, rules)
+
+
+# Standard-Einheit = Einheit des mlife-Exports und der Score-Schwellen (services/scores.py)
+register_unit(UnitRule("Kreatinin", re.compile(r"^(?:KREATININ|CREA)\b", re.IGNORECASE), "mg/dl", {"µmol/l": 1 / 88.4, "mg/l": 0.1}))
+register_unit(UnitRule("Bilirubin", re.compile(r"^BILI", re.IGNORECASE), "mg/dl", {"µmol/l": 1 / 17.1, "mg/l": 0.1}))
+register_unit(UnitRule("Glukose", re.compile(r"^(?:GLUCOSE|GLUKOSE|BZ)\b", re.IGNORECASE), "mg/dl", {"mmol/l": 18.016}))
+register_unit(UnitRule("Harnstoff", re.compile(r"^(?:HARNSTOFF|UREA)\b", re.IGNORECASE), "mg/dl", {"mmol/l": 6.006}))
+register_unit(UnitRule("Hämoglobin", re.compile(r"^(?:HB|Hämoglobin)\b", re.IGNORECASE), "g/dl", {"g/l": 0.1, "mmol/l": 1.611}))
+register_unit(UnitRule("Laktat", re.compile(r"^(?:LACTAT|LAKTAT)\b", re.IGNORECASE), "mmol/l", {"mg/dl": 1 / 9.008}))
+register_unit(UnitRule("CRP", re.compile(r"^CRP\b", re.IGNORECASE), "mg/l", {"mg/dl": 10.0}))
+register_unit(UnitRule("Partialdruck", re.compile(r"^(?:PO2|PCO2|PaO2|PaCO2)\b", re.IGNORECASE), "mmHg", {"kPa": 7.50062}))
+register_unit(UnitRule("Beatmungsdruck", re.compile(r"^(?:PEEP|Ppeak|Pmean|Pplat|Pinsp)\b", re.IGNORECASE), "mbar", {"cmH2O": 0.980665, "hPa": 1.0}))
+register_unit(UnitRule("Temperatur", re.compile(r"^Temp", re.IGNORECASE), "°C", {"C": 1.0, "Grad C": 1.0}))
+
+
+def factorize_pairs(df: pd.DataFrame) -> Tuple[np.ndarray, List[Tuple[str, Optional[str]]]]:
+    """Codes je Zeile und die verschiedenen Paare (parameter, unit) eines Long-Frames.
+
+    Regeln werden je Paar einmal ausgewertet und über die Codes auf alle Zeilen
+    verteilt; fehlende Einheiten erscheinen als None.
+    """
+    # Paar-Codes aus den Codes beider Spalten (fehlende Einheit = Code 0)
+    param_codes, params = pd.factorize(df["parameter"].fillna(""))
+    unit_codes, units = pd.factorize(df["unit"])
+    n_units = len(units) + 1
+    codes, pair_keys = pd.factorize(param_codes * n_units + unit_codes + 1)
+    pairs = [(str(params[p]), str(units[u - 1]) if u else None) for p, u in zip(*np.divmod(pair_keys, n_units))]
+    return codes, pairs
+
+
+def normalize_units(df: pd.DataFrame, rules: Optional[Iterable[UnitRule]] = None) -> pd.DataFrame:
+    """Rechne einen Zahlen-Datensatz (Long-Format) in die Standard-Einheiten um.
+
+    Die Regel wird je Paar (parameter, unit) einmal nachgeschlagen; Faktoren und
+    Zieleinheiten werden dann über die Codes von `pd.factorize` auf alle Zeilen
+    verteilt und `value` in einem Schritt multipliziert. Textwerte wie "<4"
+    bleiben in ihrer Einheit stehen, ebenso Einheiten ohne bekannten Faktor.
+    Die Original-Einheit steht in `unit_raw`, `value_raw` bleibt unverändert.
+    `rules` ersetzt die Registry (z.B. in Tests).
+    """
+    if df is None or not {"parameter", "unit", "value"}.issubset(df.columns):
+        return df
+    out = df.copy()
+    out.insert(out.columns.get_loc("unit") + 1, "unit_raw", df["unit"].copy())
+    if out.empty:
+        return out
+
+    lookup = _lookup if rules is None else partial(_resolve_with, tuple(rules))
+    codes, pairs = factorize_pairs(df)
+    resolved = [lookup(p, u) for p, u in pairs]
+    factors = np.array([f for f, _ in resolved], dtype=float)[codes]
+    canonical = np.array([c for _, c in resolved], dtype=object)[codes]
+
+    numeric = pd.to_numeric(df["value"], errors="coerce").to_numpy(dtype=float)
+    known = pd.notna(canonical)
+    # Schreibvarianten (Faktor 1) werden immer vereinheitlicht, Umrechnungen nur für Zahlen
+    relabel = known & ((factors == 1.0) | ~np.isnan(numeric))
+    convert = relabel & (factors != 1.0)
+    # Spalten-dtypes bleiben erhalten (value: float oder object mit Text, unit: object)
+    if convert.any():
+        values = out["value"].to_numpy(copy=True)
+        values[convert] = numeric[convert] * factors[convert]
+        out["value"] = pd.Series(values, index=out.index, dtype=out["value"].dtype)
+    if relabel.any():
+        units = out["unit"].to_numpy(dtype=object, copy=True)
+        units[relabel] = canonical[relabel]
+        out["unit"] = pd.Series(units, index=out.index, dtype=out["unit"].dtype)
+    return out
+
+
+def converted_rows(df: pd.DataFrame) -> pd.Series:
+    """Zeilen, deren Einheit `normalize_units` geändert hat (umgerechnet oder umbenannt)."""
+    if df is None or not {"unit", "unit_raw"}.issubset(df.columns):
+        return pd.Series(False, index=getattr(df, "index", None), dtype=bool)
+    raw, unit = df["unit_raw"].astype(object), df["unit"].astype(object)
+    return raw.notna() & (raw != unit)
+
+
+def mixed_units(df: pd.DataFrame) -> Dict[str, list]:
+    """Parameter, die (nach der Normalisierung) noch in mehreren Einheiten vorliegen."""
+    if df is None or df.empty or not {"parameter", "unit"}.issubset(df.columns):
+        return {}
+    units = df[["parameter", "unit"]].astype(object).dropna().drop_duplicates()
+    counts = units.groupby("parameter")["unit"].agg(list)
+    return {p: sorted(map(str, u)) for p, u in counts.items() if len(u) > 1}
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.alignment import DERIVED_PARAMETERS, align_asof, compute_derived, select_series
+
+
+def _series(times, values, groups=None):
+    return pd.DataFrame({
+        "timestamp_parsed": pd.to_datetime(times),
+        "value": np.asarray(values, dtype=float),
+        "group": groups if groups is not None else ["a"] * len(times),
+    })
+
+
+@pytest.mark.parametrize("direction", ["backward", "forward", "nearest"])
+def test_align_asof_matches_merge_asof(direction):
+    rng = np.random.default_rng(3)
+    t0 = pd.Timestamp("2025-09-14")
+    left = _series(np.sort(t0 + pd.to_timedelta(rng.integers(0, 3000, 200), unit="min")), rng.normal(size=200))
+    right = _series(np.sort(t0 + pd.to_timedelta(rng.choice(3000, 150, replace=False), unit="min")), rng.normal(size=150))
+    tol = pd.Timedelta(minutes=30)
+
+    got = align_asof(left, right, tolerance=tol, direction=direction)
+    expected = pd.merge_asof(
+        left, right.rename(columns={"value": "value_right"}).drop(columns="group"),
+        on="timestamp_parsed", tolerance=tol, direction=direction,
+    )
+    np.testing.assert_array_equal(got["value_right"].to_numpy(), expected["value_right"].to_numpy())
+    assert (got["lag"].dropna().abs() <= tol).all()
+
+
+def test_align_by_group_and_horovitz():
+    left = _series(["2025-09-14 10:00", "2025-09-14 10:00"], [80, 90], groups=["ECMO 1", "ECMO 2"])
+    right = _series(["2025-09-14 09:00", "2025-09-14 09:50", "2025-09-14 10:30"], [1.0, 2.0, 3.0], groups=["ECMO 1", "ECMO 2", "ECMO 1"])
+    pairs = align_asof(left, right, tolerance=pd.Timedelta(hours=2), by_group=True)
+    assert pairs["value_right"].tolist() == [1.0, 2.0]
+
+    lab = pd.DataFrame({
+        "panel": ["Labor: Blutgase arteriell", "Labor: Blutgase venös", "Labor: Blutgase arteriell"],
+        "parameter": ["PO2", "PO2", "PO2"],
+        "timestamp_parsed": pd.to_datetime(["2025-09-14 05:00", "2025-09-14 05:00", "2025-09-14 12:00"]),
+        "value": [84.0, 40.0, 90.0],
+    })
+    resp = pd.DataFrame({
+        "panel": "Online erfasste Respiratorwerte",
+        "parameter": "FiO2",
+        "timestamp_parsed": pd.to_datetime(["2025-09-14 04:45", "2025-09-14 05:15", "2025-09-14 10:00"]),
+        "value": [40.0, 60.0, 50.0],
+    })
+    assert len(select_series(lab, "PO2", panel="arteriell")) == 2
+    out = compute_derived(DERIVED_PARAMETERS["PaO2/FiO2 (Horovitz)"], {"lab": lab, "respirator": resp})
+    # FiO2 in % is converted; the 12:00 gas has no setting within the 1 h tolerance
+    assert out["value"].tolist() == [pytest.approx(210.0)]
+    assert out["panel"].tolist() == ["Abgeleitet"]
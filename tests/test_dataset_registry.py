@@ -0,0 +1,73 @@
+import pytest
+
+from services.dataset_registry import DatasetRegistry
+from services.datasets import PatientDatasets
+from tools.synthetic_export import generate_export
+
+
+def _factory(text, calls):
+    def make():
+        calls.append(1)
+        return PatientDatasets(text, ";")
+    return make
+
+
+def test_sessions_share_one_bundle_and_read_only_frames():
+    text = generate_export(stay_days=1)
+    registry = DatasetRegistry()
+    calls = []
+    a = registry.acquire("h1", "session-a", _factory(text, calls))
+    b = registry.acquire("h1", "session-b", _factory(text, calls))
+    assert a is b and len(calls) == 1
+    assert registry.refcount("h1") == 2
+
+    va, vb = a.get("vitals"), b.get("vitals")
+    assert va is not vb
+    va["local"] = 1
+    assert "local" not in vb.columns
+    with pytest.raises(ValueError):
+        a.handle("vitals").get()["timestamp_parsed"].values[0] = None
+
+
+def test_eviction_skips_referenced_and_drops_lru():
+    text = generate_export(stay_days=1)
+    registry = DatasetRegistry(max_bytes=1)
+    calls = []
+    registry.acquire("old", "s1", _factory(text, calls))
+    registry.acquire("new", "s2", _factory(text, calls))
+    # both still referenced: nothing evicted despite the cap
+    assert len(registry) == 2
+
+    registry.release("old", "s1")
+    assert registry.evict() == ["old"]
+    assert "new" in registry
+
+    # references that were idle longer than the timeout no longer protect an entry
+    registry.session_idle_s = 0
+    assert registry.evict() == ["new"]
+
+
+def test_eviction_after_loads_stops_background_worker():
+    import threading
+
+    text = generate_export(stay_days=1)
+    registry = DatasetRegistry(max_bytes=3 * len(text))
+    old = registry.acquire("old", "s1", _factory(text, []))
+    gate, running = threading.Event(), threading.Event()
+    old.register("gate", lambda: (running.set(), gate.wait(10))[1])
+    old.start_background(["gate", "vitals", "respirator", "lab"])
+    assert running.wait(10)
+    registry.release("old", "s1")
+
+    new = registry.acquire("new", "s2", _factory(text, []))
+    # two raw texts fit under the cap: acquire alone evicts nothing
+    assert "old" in registry
+    # the cap is checked again once the lazy frames are actually loaded
+    new.get("vitals")
+    new.get("lab")
+    assert "old" not in registry and "new" in registry
+    # the evicted bundle's worker stops after the running dataset instead of parsing the rest
+    gate.set()
+    old._worker.join(10)
+    assert not old._worker.is_alive()
+    assert not {"vitals", "respirator", "lab"} & set(old.loaded())
@@ -0,0 +1,59 @@
+from services.datasets import PatientDatasets
+from tools.synthetic_export import generate_export
+
+
+def test_datasets_are_parsed_lazily_and_once():
+    ds = PatientDatasets(generate_export(stay_days=2), ";")
+    assert ds.loaded() == []
+
+    start, end = ds.time_bounds()
+    assert ds.loaded() == []
+    assert [s.stage for s in ds.run.stages] == ["cleanCSV", "splitBlocks"]
+
+    vitals = ds.handle("vitals").get()
+    assert ds.handle("vitals").get() is vitals
+    assert ds.loaded() == ["vitals"]
+    # unit normalization, plausibility flags and the source merge are nested stages of the parser
+    assert [s.stage for s in ds.run.stages][2:] == [
+        "normalize_units[Vitaldaten]", "flag_values[Vitaldaten]", "merge_sources[Vitaldaten]", "parseNumerics[Vitaldaten]",
+    ]
+
+    # the header scan agrees with the parsed timestamps
+    assert start <= vitals["timestamp_parsed"].min()
+    assert end >= vitals["timestamp_parsed"].max()
+    for name in ("respirator", "lab"):
+        ds.get(name)
+    assert ds.time_bounds() == (start, end)
+
+
+def test_background_worker_parses_prioritized_dataset_first():
+    ds = PatientDatasets(generate_export(stay_days=2), ";")
+    ds.start_background(["vitals", "respirator", "lab", "ecmo"])
+    assert ds.prioritize("ecmo")
+    assert ds.handle("ecmo").wait(30)
+    assert ds.handle("lab").wait(30)
+    # impella, rrt and medications are not in the worker order
+    assert 0 < ds.progress().fraction < 1.0
+
+    stages = [s.stage for s in ds.run.stages]
+    assert stages[:2] == ["cleanCSV", "splitBlocks"]
+    assert stages.index("parse_from_all_patient_data[ecmo]") < stages.index("parseNumerics[Labor]")
+    # datasets outside the worker order are left to the caller
+    assert ds.handle("rrt").status == "pending"
+    assert not ds.prioritize("rrt")
+    assert not ds.get("rrt").empty
+
+
+def test_progress_counts_every_source_block_of_a_dataset():
+    from services.datasets import _block_bytes
+    from services.device_intervals import INTERVAL_BLOCKS
+
+    ds = PatientDatasets(generate_export(stay_days=2), ";")
+    blocks = ds.blocks
+    before = ds.progress()
+    ds.get("device_intervals")
+    after = ds.progress()
+    # Katheter, Drainagen and Wunden are all parsed by the one handle
+    expected = sum(_block_bytes(blocks.get(kind, {})) for kind in INTERVAL_BLOCKS)
+    assert expected > _block_bytes(blocks.get("Katheter", {}))
+    assert after.done_bytes - before.done_bytes == expected
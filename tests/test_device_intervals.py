@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+
+from services.device_intervals import DeviceIntervalIndex, daily_presence_long, parseIntervals
+
+KATHETER = "\n".join([
+    ";Bezeichnung;;Lokalisation;;Anlage;;Entfernung;",
+    ";ZVK 4-lumig;;V. jugularis interna rechts;;14.09.2025 08:00;;17.09.2025 00:00;",
+    ";Arterie;;A. radialis links;;15.09.2025 06:00;;;",
+])
+DRAINAGEN = "\n".join([
+    ";Bezeichnung;;Lokalisation;;Anlage;;Entfernung;",
+    ";Thoraxdrainage;;Pleura links;;16.09.2025 11:00;;16.09.2025 11:00;",
+])
+
+
+def test_parse_intervals_and_daily_presence():
+    df = parseIntervals({"Katheter": KATHETER, "Drainagen": DRAINAGEN}, ";")
+    assert df["device"].tolist() == ["ZVK 4-lumig", "Arterie", "Thoraxdrainage"]
+    assert df.loc[1, "site"] == "A. radialis links" and pd.isna(df.loc[1, "removal_time"])
+
+    daily = daily_presence_long(df, until=pd.Timestamp("2025-09-16 23:00"))
+    days = daily.groupby("parameter")["timestamp"].agg(list)
+    # removal exactly at midnight does not count for the new day; open intervals run until `until`
+    assert days["Katheter: ZVK 4-lumig (V. jugularis interna rechts)"] == ["2025-09-14", "2025-09-15", "2025-09-16"]
+    assert days["Katheter: Arterie (A. radialis links)"] == ["2025-09-15", "2025-09-16"]
+    assert (daily["value"] == 1).all()
+
+
+def test_interval_index_matches_brute_force():
+    rng = np.random.default_rng(7)
+    n = 300
+    start = pd.Timestamp("2025-01-01") + pd.to_timedelta(rng.integers(0, 5000, n), unit="min")
+    end = pd.Series(start + pd.to_timedelta(rng.integers(0, 2000, n), unit="min"))
+    end[rng.random(n) < 0.1] = pd.NaT
+    df = pd.DataFrame({"kind": "Katheter", "device": [f"d{i}" for i in range(n)], "site": None, "insert_time": start, "removal_time": end})
+    index = DeviceIntervalIndex(df)
+    open_end = df["removal_time"].fillna(pd.Timestamp.max)
+    lasting = open_end > df["insert_time"]
+
+    for q in pd.Timestamp("2025-01-01") + pd.to_timedelta(rng.integers(-60, 7000, 100), unit="min"):
+        in_place = (df["insert_time"] <= q) & (open_end > q)
+        assert set(index.at(q).index) == set(df.index[in_place])
+        assert index.count_at([q])[0] == in_place.sum()
+        b = q + pd.Timedelta(minutes=int(rng.integers(1, 600)))
+        overlap = (df["insert_time"] < b) & (open_end > q) & lasting
+        assert set(index.overlapping(q, b).index) == set(df.index[overlap])
@@ -0,0 +1,53 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.export import write_csv, write_parquet, write_xlsx
+
+
+def _frame(n=1000):
+    t = pd.date_range("2025-09-14", periods=n, freq="min")
+    return pd.DataFrame({
+        "timestamp_parsed": t,
+        "date": t.date,
+        "parameter": np.where(np.arange(n) % 2, "HF", "ARTm"),
+        "value": np.where(np.arange(n) % 7 == 0, np.nan, np.arange(n) / 3),
+        # therapy views mix numbers and text in 'Wert'
+        "Wert": [("läuft" if i % 5 == 0 else i) for i in range(n)],
+    })
+
+
+def test_csv_chunks_match_single_write():
+    df = _frame()
+    buf = io.BytesIO()
+    size = write_csv(df, buf, chunk_rows=64)
+    assert size == len(buf.getvalue())
+    assert buf.getvalue().decode("utf-8") == df.to_csv(index=False, sep=";", lineterminator="\n")
+
+
+def test_parquet_roundtrip_in_row_groups():
+    pq = pytest.importorskip("pyarrow.parquet")
+    df = _frame()
+    buf = io.BytesIO()
+    write_parquet(df, buf, chunk_rows=300)
+    buf.seek(0)
+    assert pq.ParquetFile(buf).num_row_groups == 4
+    back = pd.read_parquet(buf)
+    pd.testing.assert_series_equal(back["value"], df["value"])
+    assert back["timestamp_parsed"].tolist() == df["timestamp_parsed"].tolist()
+    assert back["date"].tolist() == df["date"].tolist()
+    assert back["Wert"].tolist() == [str(v) for v in df["Wert"]]
+
+
+def test_xlsx_roundtrip():
+    openpyxl = pytest.importorskip("openpyxl")
+    df = _frame(50)
+    buf = io.BytesIO()
+    write_xlsx(df, buf, chunk_rows=16)
+    buf.seek(0)
+    rows = list(openpyxl.load_workbook(buf, read_only=True).active.iter_rows(values_only=True))
+    assert rows[0] == tuple(df.columns)
+    assert len(rows) == 51
+    assert rows[1][3] is None and rows[2][3] == pytest.approx(1 / 3)
@@ -0,0 +1,80 @@
+import pandas as pd
+import pytest
+
+from services.fluid_balance import INTAKE, OUTPUT, balance_table, classify_items, daily_balance_long, parseBilanz, rrt_net_removal
+
+BILANZ = "\n".join([
+    ";;14.09.25 22:00;14.09.25 23:00;15.09.25 00:00;15.09.25 01:00",
+    ";Infusionen [ml];100;100;;50",
+    ";Urin [ml];-80;;120;40",
+    ";Spülung [l];;0,5;;",
+    ";Sonstiges [ml];10;-20;;",
+])
+
+
+def test_parse_bilanz_classifies_and_signs():
+    df = parseBilanz({"Bilanz": BILANZ}, ";")
+    by_item = df.groupby("item").agg(direction=("direction", "first"), volume=("volume_ml", "sum"))
+    assert by_item.loc["Urin", "direction"] == OUTPUT and by_item.loc["Urin", "volume"] == 240
+    # liters are converted, unknown items fall back to the sign of the value
+    assert by_item.loc["Spülung", "volume"] == 500
+    assert df.loc[df["item"] == "Sonstiges", "direction"].tolist() == ["Einfuhr", "Ausfuhr"]
+    assert (df["signed_ml"] == df["volume_ml"].where(df["direction"] != OUTPUT, -df["volume_ml"])).all()
+
+
+def test_parse_bilanz_skips_summary_rows():
+    summaries = [
+        ";Einfuhr gesamt [ml];100;100;;50",
+        ";Ausfuhr gesamt [ml];-80;;-120;-40",
+        ";Gesamtbilanz [ml];20;100;-120;10",
+    ]
+    df = parseBilanz({"Bilanz": BILANZ + "\n" + "\n".join(summaries)}, ";")
+    expected = parseBilanz({"Bilanz": BILANZ}, ";")
+    pd.testing.assert_frame_equal(df, expected)
+    assert not df["item"].str.contains("gesamt", case=False).any()
+
+
+def test_rrt_removal_splits_at_midnight_and_caps_gaps():
+    rrt = pd.DataFrame({
+        "timestamp_parsed": pd.to_datetime(["2025-09-14 22:00", "2025-09-15 02:00", "2025-09-15 12:00"]),
+        "Sub-Kategorie": ["Hämofilter 1"] * 3,
+        "Parameter": ["Patientenentzug (ml/h)"] * 3,
+        "value_numeric": [100.0, 50.0, 60.0],
+    })
+    removal = rrt_net_removal(rrt)
+    per_day = removal.groupby(removal["timestamp_parsed"].dt.date)["volume_ml"].sum()
+    # 22-24h at 100 ml/h on day 1; 0-2h at 100 + 2-6h at 50 (capped gap) + 12-16h at 60 on day 2
+    assert per_day.tolist() == [200.0, 200.0 + 200.0 + 240.0]
+
+
+
+def test_rrt_removal_splits_at_every_midnight():
+    rrt = pd.DataFrame({
+        "timestamp_parsed": pd.to_datetime(["2025-09-14 20:00"]),
+        "Sub-Kategorie": ["Hämofilter 1"],
+        "Parameter": ["Patientenentzug (ml/h)"],
+        "value_numeric": [10.0],
+    })
+    removal = rrt_net_removal(rrt, max_gap=pd.Timedelta(hours=52))
+    per_day = removal.groupby(removal["timestamp_parsed"].dt.date)["volume_ml"].sum()
+    # 20-24h, then two full days; the interval ends at midnight, no empty fourth day
+    assert per_day.tolist() == [40.0, 240.0, 240.0]
+    assert removal["volume_ml"].sum() == 520.0
+
+
+def test_classify_items_missing_name_falls_back_to_sign():
+    items = pd.Series(["Urin", None, float("nan")])
+    direction = classify_items(items, pd.Series([10.0, 5.0, -5.0]))
+    assert direction.tolist() == [OUTPUT, INTAKE, OUTPUT]
+
+def test_balance_table_cumulative_and_daily_long():
+    entries = pd.concat([parseBilanz({"Bilanz": BILANZ}, ";")], ignore_index=True)
+    daily = balance_table(entries, freq="D")
+    assert daily["Bilanz"].tolist() == pytest.approx((daily["Einfuhr"] - daily["Ausfuhr"]).tolist())
+    assert daily["Bilanz kumulativ"].tolist() == pytest.approx(daily["Bilanz"].cumsum().tolist())
+    hourly = balance_table(entries, freq=None)
+    assert hourly["Bilanz kumulativ"].iloc[-1] == pytest.approx(daily["Bilanz kumulativ"].iloc[-1])
+
+    long = daily_balance_long(entries)
+    assert set(["Einfuhr", "Ausfuhr", "Bilanz", "Urin"]) <= set(long["parameter"])
+    assert (long["unit"] == "ml").all() and long["timestamp"].str.match(r"\d{4}-\d{2}-\d{2}").all()
@@ -0,0 +1,72 @@
+import threading
+import time
+import tracemalloc
+
+import pytest
+
+import services.instrumentation as instrumentation
+from services.instrumentation import PipelineRun
+
+
+def _sleep(seconds, result=None):
+    time.sleep(seconds)
+    return result
+
+
+def test_nested_stages_count_once():
+    run = PipelineRun(label="t")
+
+    def outer():
+        inner = run.stage("inner", _sleep, 0.02, "x" * 10)
+        run.stage("inner2", lambda: run.stage("innermost", _sleep, 0.01))
+        return inner
+
+    run.stage("outer", outer)
+    run.stage("second", _sleep, 0.01)
+    records = {s.stage: s for s in run.stages}
+    assert [(records[n].depth, records[n].parent) for n in ("outer", "inner", "inner2", "innermost", "second")] == [
+        (0, None), (1, "outer"), (1, "outer"), (2, "inner2"), (0, None),
+    ]
+    assert run.total_seconds == pytest.approx(records["outer"].seconds + records["second"].seconds)
+    df = run.to_frame()
+    assert df.loc[df["depth"] == 0, "share"].sum() == pytest.approx(1.0)
+    assert records["inner"].rows == 1 and records["inner"].input_bytes == 0
+
+
+@pytest.mark.parametrize("enabled", [False, True])
+def test_memory_trace_switch(monkeypatch, enabled):
+    monkeypatch.setattr(instrumentation, "TRACE_MEMORY", enabled)
+    run = PipelineRun()
+    run.stage("outer", lambda: run.stage("inner", lambda: bytearray(2_000_000)))
+    records = {s.stage: s for s in run.stages}
+    # only the outermost stage owns tracemalloc; nested stages are part of its peak
+    assert records["inner"].peak_mb is None
+    if enabled:
+        assert records["outer"].peak_mb >= 2.0
+    else:
+        assert records["outer"].peak_mb is None
+    assert not tracemalloc.is_tracing()
+
+
+def test_concurrent_stages_do_not_share_a_peak(monkeypatch):
+    monkeypatch.setattr(instrumentation, "TRACE_MEMORY", True)
+    run = PipelineRun()
+    started, release = threading.Event(), threading.Event()
+
+    def worker():
+        run.stage("worker", lambda: (started.set(), release.wait(5)))
+
+    t = threading.Thread(target=worker)
+    t.start()
+    started.wait(5)
+    # overlaps with the worker's traced stage: its peak would contain both
+    run.stage("script", _sleep, 0.01)
+    assert tracemalloc.is_tracing()
+    release.set()
+    t.join(5)
+    records = {s.stage: s for s in run.stages}
+    assert records["worker"].peak_mb is None and records["script"].peak_mb is None
+    assert not tracemalloc.is_tracing()
+    # alone again: measured
+    run.stage("alone", _sleep, 0.01)
+    assert run.stages[-1].peak_mb is not None
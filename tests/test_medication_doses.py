@@ -0,0 +1,46 @@
+import pandas as pd
+import pytest
+
+from services.medication_doses import DoseCurves, daily_dose_long, parse_concentration
+
+NORA = "Noradrenalin Perfusor 5mg/50ml"
+
+
+def _meds():
+    return pd.DataFrame({
+        "medication": [NORA, NORA, NORA, "Vasopressin Perfusor 40 IE / 40 ml | Empressin 40 I.E./2ml", "Pantoprazol 40mg"],
+        "concentration": ["5 mg 50 mL 1 Perfusorspritze"] * 3 + ["40 I.E. 2 mL 1 Amp. | 5,852 mmol 38 mL 0,76 Glasflasche", "40 mg 1 Amp."],
+        "start_parsed": pd.to_datetime(["2025-09-14 22:00", "2025-09-15 01:00", "2025-09-15 00:00", "2025-09-15 06:00", "2025-09-15 08:00"]),
+        "stop_parsed": pd.to_datetime(["2025-09-15 02:00", "2025-09-15 03:00", "2025-09-15 01:30", "2025-09-15 07:00", None]),
+        "rate": [10.0, 5.0, 2.0, 1.5, None],
+    })
+
+
+def test_parse_concentration_mixtures_and_units():
+    assert parse_concentration("5 mg 50 mL 1 Perfusorspritze") == (5.0, "mg", 50.0)
+    assert parse_concentration("40 I.E. 2 mL 1 Amp. | 5,852 mmol 38 mL 0,76 Glasflasche") == (40.0, "IE", 40.0)
+    assert parse_concentration("500 µg 50 ml")[:2] == (0.5, "mg")
+    amount, unit, volume = parse_concentration("40 mg 1 Amp.")
+    assert (amount, unit) == (40.0, "mg") and pd.isna(volume)
+
+
+def test_dose_curves_integrate_and_daily():
+    curves = DoseCurves(_meds())
+    # parallel syringes add up: 00:00-01:00 10+2, 01:00-01:30 10+5+2, 01:30-02:00 10+5
+    window = curves.integrate("2025-09-15 00:30", "2025-09-15 01:45").set_index("medication")
+    assert window.loc[NORA, "volume_ml"] == pytest.approx(0.5 * 12 + 0.5 * 17 + 0.25 * 15)
+    assert window.loc[NORA, "dose"] == pytest.approx(window.loc[NORA, "volume_ml"] * 0.1)
+
+    daily = curves.daily().set_index(["date", "medication"])
+    day1, day2 = pd.Timestamp("2025-09-14"), pd.Timestamp("2025-09-15")
+    assert daily.loc[(day1, NORA), "total_ml"] == pytest.approx(20.0)
+    assert daily.loc[(day2, NORA), "total_ml"] == pytest.approx(20.0 + 10.0 + 3.0)
+    assert daily.loc[(day2, NORA), "max_rate_ml_h"] == pytest.approx(17.0)
+    assert daily.loc[(day2, "Vasopressin Perfusor 40 IE / 40 ml"), "total_dose"] == pytest.approx(1.5)
+    assert daily.loc[(day2, "Pantoprazol 40mg"), ["total_dose", "boluses"]].tolist() == [40.0, 1]
+    # integrating over a whole day matches the daily table
+    assert curves.integrate(day2, day2 + pd.Timedelta(days=1), NORA)["dose"].iloc[0] == pytest.approx(daily.loc[(day2, NORA), "total_dose"])
+
+    long = daily_dose_long(curves.daily())
+    rate = long[(long["parameter"] == f"{NORA} – max. Rate") & (long["timestamp"] == "2025-09-15")]
+    assert rate[["unit", "value"]].values.tolist() == [["mg/h", pytest.approx(1.7)]]
@@ -0,0 +1,44 @@
+from services.clean_csv import cleanCSV
+from services.note_index import NoteIndex, normalize
+from services.parse_documentation import parseDocumentation
+from services.split_blocks import splitBlocks
+from tools.synthetic_export import generate_export
+
+BLOCK = "\n".join([
+    ";Datum/Zeit;;Verfasser;;Notiz",
+    ';14.09.2025 08:10;;Dr. Weber;;"Kanülenwechsel durchgeführt.',
+    'Keine Blutung."',
+    ";14.09.2025 20:45;;Pfl. Maier;;Blutung an der Einstichstelle, Kompression angelegt.",
+    ";15.09.2025 07:00;;Dr. Schulz;;Straße frei; Kanuelenwechsel geplant",
+])
+
+
+def test_parse_documentation_multiline_and_types():
+    notes = parseDocumentation({"Arztnotizen": BLOCK, "Pflegenotizen": ""}, ";")
+    assert notes["author"].tolist() == ["Dr. Weber", "Pfl. Maier", "Dr. Schulz"]
+    assert notes["text"].iloc[0] == "Kanülenwechsel durchgeführt.\nKeine Blutung."
+    # the unquoted ';' splits the last note into two cells, both kept as text
+    assert notes["text"].iloc[2] == "Straße frei\nKanuelenwechsel geplant"
+    assert notes["timestamp_parsed"].notna().all() and (notes["type"] == "Arztnotizen").all()
+
+    blocks = splitBlocks(cleanCSV(generate_export(stay_days=2)), ";")
+    synthetic = parseDocumentation(blocks["Dokumentation"], ";")
+    assert set(synthetic["type"]) == {"Arztnotizen", "Pflegenotizen"}
+    assert synthetic["text"].str.contains("\n").all()
+
+
+def test_note_index_terms_phrases_and_wildcards():
+    index = NoteIndex(parseDocumentation({"Arztnotizen": BLOCK}, ";"))
+    assert normalize("Kanülenwechsel") == normalize("KANUELENWECHSEL") == "kanuelenwechsel"
+    assert normalize("Straße") == "strasse"
+
+    assert index.search("kanülenwechsel")["author"].tolist() == ["Dr. Weber", "Dr. Schulz"]
+    assert index.search("blutung")["hits"].tolist() == [1, 1]
+    assert index.search('"Kompression angelegt"')["author"].tolist() == ["Pfl. Maier"]
+    assert index.search('"angelegt Kompression"').empty
+    assert index.search("blutung kanülenwechsel")["author"].tolist() == ["Dr. Weber"]
+    assert len(index.search("*wechsel")) == 2 and len(index.search("einstich*")) == 1
+    assert index.search("strasse")["author"].tolist() == ["Dr. Schulz"]
+    assert len(index.search("")) == 3
+    assert index.search("nichtvorhanden").empty
+    assert "elapsed_ms" in index.search("blutung").attrs
@@ -0,0 +1,70 @@
+import re
+
+import pandas as pd
+import pytest
+
+from services.parse_from_all_patient_data import parse_all_patient_data_sections, parse_from_all_patient_data
+
+# Abschnitte mit Datenzeilen vor dem ersten Zeitstempel (Übertrag aus dem
+# vorangehenden Abschnitt), wiederholten Headern mit anderer Grenzzeile
+# (nummerierte Sub-Header) und einem nicht gesuchten Header dazwischen.
+BLOCK = "\n".join([
+    ";;ECMO;Cardiohelp A;",
+    "14.09.2025 08:00;;;;",
+    ";;;Blutfluss l/min;3,5;PFL1",
+    ";;Impella;CP;",
+    ";;;P-Level;P4;PFL1",
+    "14.09.2025 09:00;;;;",
+    ";;;Flow l/min;2,1;PFL1",
+    ";;ECMO;Cardiohelp B;",
+    ";;;Blutfluss l/min;4,0;PFL2",
+    "14.09.2025 10:00;;;;",
+    ";;;Drehzahl (rpm);3000;PFL2",
+    ";;ECMO;Cardiohelp C;",
+    ";;;Gasfluss l/min;<1;PFL2",
+    ";;ECMO;Cardiohelp B;",
+    "14.09.2025 11:00;;;;",
+    ";;;Gasfluss l/min;2,0;PFL2",
+    ";;Lagerung;Bauchlage;",
+    "14.09.2025 12:00;;;;",
+    ";;;Dauer;4 h;PFL3",
+    ";;Hämofilter;Prismaflex;",
+    ";;;Blutfluss ml/min;120;PFL4",
+    "14.09.2025 13:00;;;;",
+    ";;;Entzug (ml/h);50;PFL4",
+])
+
+QUERIES = {"ecmo": "ecmo", "impella": "impella", "rrt": "hämofilter", "both": ["ecmo", re.compile(r"^Impella")]}
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_sections_match_serial_parser(workers):
+    data = {"ALLE Patientendaten": BLOCK}
+    result = parse_all_patient_data_sections(data, QUERIES, workers=workers)
+    for name, query in QUERIES.items():
+        expected = parse_from_all_patient_data(data, query)
+        pd.testing.assert_frame_equal(result[name], expected)
+
+    ecmo = result["ecmo"]
+    # the third consecutive ECMO section with a different boundary line opens "ECMO 2"
+    assert ecmo["Sub-Kategorie"].tolist() == ["ECMO 1"] * 4 + ["ECMO 2"]
+    # sections without their own leading timestamp inherit the previous section's last one
+    assert ecmo["Zeit"].tolist() == ["14.09.2025 08:00", "14.09.2025 08:00", "14.09.2025 10:00", "14.09.2025 10:00", "14.09.2025 11:00"]
+    # RRT: the only matching section starts without a timestamp and has no predecessor -> row dropped
+    assert result["rrt"]["Parameter"].tolist() == ["Entzug (ml/h)"]
+
+
+def test_datasets_use_section_pool_for_large_blocks(monkeypatch):
+    import services.parse_from_all_patient_data as therapy_parser
+    from services.datasets import PatientDatasets
+    from tools.synthetic_export import generate_export
+
+    text = generate_export(stay_days=2, medication_rows=3, seed=3)
+    serial = PatientDatasets(text)
+    expected = {name: serial.get(name) for name in ("ecmo", "impella", "rrt")}
+    monkeypatch.setattr(therapy_parser, "PARALLEL_WORKERS", 2)
+    monkeypatch.setattr(therapy_parser, "PARALLEL_MIN_BYTES", 0)
+    parallel = PatientDatasets(text)
+    for name, frame in expected.items():
+        pd.testing.assert_frame_equal(parallel.get(name), frame)
+    assert "therapy_sections" in parallel.loaded() and "therapy_sections" not in serial.loaded()
@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.param_matrix import ParameterMatrix
+
+
+def _long(rng, parameters, times, fill):
+    grid = pd.MultiIndex.from_product([parameters, times], names=["parameter", "timestamp_parsed"]).to_frame(index=False)
+    grid = grid[rng.random(len(grid)) < fill].reset_index(drop=True)
+    grid["value"] = rng.normal(size=len(grid)).round(3)
+    return grid
+
+
+@pytest.mark.parametrize("fill, kind", [(0.9, "dense"), (0.05, "csr")])
+def test_block_matches_pivot(fill, kind):
+    rng = np.random.default_rng(11)
+    times = pd.date_range("2025-09-14", periods=300, freq="15min")
+    df = _long(rng, [f"P{i}" for i in range(20)], times, fill)
+    matrix = ParameterMatrix(df)
+    assert matrix.kind == kind and matrix.nnz == len(df)
+    assert matrix.nbytes > 0
+
+    params, start, end = ["P3", "P17", "unbekannt", "P0"], times[40], times[200]
+    wide = matrix.to_frame(params, start, end, drop_empty=False)
+    window = df[df["timestamp_parsed"].between(start, end) & df["parameter"].isin(params)]
+    expected = window.pivot(index="timestamp_parsed", columns="parameter", values="value").reindex(index=wide.index, columns=wide.columns)
+    assert list(wide.columns) == ["P3", "P17", "P0"]
+    assert wide.index[0] >= start and wide.index[-1] <= end
+    np.testing.assert_allclose(wide.to_numpy(), expected.to_numpy(dtype=np.float32), rtol=1e-6)
+
+
+def test_duplicates_are_averaged_and_slices_are_read_only():
+    df = pd.DataFrame({
+        "parameter": ["HF", "HF", "SpO2"],
+        "timestamp_parsed": pd.to_datetime(["2025-09-14 00:00"] * 3),
+        "value": [80.0, 90.0, 97.0],
+    })
+    matrix = ParameterMatrix(df)
+    names, times, values = matrix.block(["HF"])
+    assert values.tolist() == [[85.0]]
+    with pytest.raises(ValueError):
+        values[0, 0] = 1.0
@@ -0,0 +1,77 @@
+import http.client
+import io
+import json
+import threading
+
+import pandas as pd
+import pytest
+
+from services.datasets import PatientDatasets
+from services.parse_service import ParseService, make_server
+from tools.synthetic_export import generate_export
+
+
+@pytest.fixture(scope="module")
+def server():
+    service = ParseService(workers=1, max_queue=2)
+    httpd = make_server(service)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd.server_address[1]
+    httpd.shutdown()
+    httpd.server_close()
+    service.shutdown()
+
+
+def _request(port, method, path, body=None):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=120)
+    try:
+        conn.request(method, path, body=body)
+        resp = conn.getresponse()
+        return resp.status, dict(resp.getheaders()), resp.read()
+    finally:
+        conn.close()
+
+
+def test_parse_json_arrow_and_cache(server):
+    text = generate_export(stay_days=1, medication_rows=3, seed=7)
+    raw = text.encode("utf-8")
+    expected = PatientDatasets(text).get("lab")
+
+    status, headers, body = _request(server, "POST", "/parse?datasets=lab,ecmo&format=json", raw)
+    assert status == 200 and headers["X-Cache"] == "miss"
+    assert "parse;dur=" in headers["Server-Timing"]
+    payload = json.loads(body)
+    lab = pd.read_json(io.StringIO(json.dumps(payload["datasets"]["lab"])), orient="split")
+    assert payload["rows"]["lab"] == len(expected) == len(lab)
+    assert lab["value"].tolist() == pytest.approx(expected["value"].tolist(), nan_ok=True)
+
+    status, headers, _ = _request(server, "POST", "/parse?datasets=lab,ecmo&format=json", raw)
+    assert headers["X-Cache"] == "hit"
+
+    pa = pytest.importorskip("pyarrow")
+    status, headers, body = _request(server, "POST", "/parse?datasets=lab&format=arrow", raw)
+    table = pa.ipc.open_stream(body).read_all()
+    assert status == 200 and table.num_rows == len(expected)
+    status, _, cached = _request(server, "GET", f"/frames/{headers['X-Content-Hash']}/lab?format=arrow")
+    assert status == 200 and cached == body
+
+    status, _, body = _request(server, "POST", "/parse?datasets=lab,vitals&format=arrow", raw)
+    assert status == 400
+    status, _, _ = _request(server, "POST", "/parse?datasets=vitals_matrix", raw)
+    assert status == 400
+
+
+def test_evicted_cache_entries_drop_their_row_counts():
+    service = ParseService(workers=1, max_queue=0, cache_bytes=10)
+    try:
+        service._store("d1", "json", {"lab": b"x" * 6}, {"lab": 3})
+        service._store("d1", "arrow", {"lab": b"y" * 4}, {"lab": 3})
+        assert service._rows == {("d1", "lab"): 3}
+        # evicts d1/lab/json; the arrow entry still needs the row count
+        service._store("d2", "json", {"lab": b"z" * 5}, {"lab": 5})
+        assert ("d1", "lab") in service._rows
+        service._store("d3", "json", {"lab": b"w" * 5}, {"lab": 7})
+        assert set(service._rows) == {("d2", "lab"), ("d3", "lab")}
+    finally:
+        service.shutdown()
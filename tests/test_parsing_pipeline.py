@@ -3,21 +3,29 @@ from services.clean_csv import cleanCSV
 from services.split_blocks import splitBlocks
 from services.parse_numerics import parseNumerics
 from services.parse_from_all_patient_data import parse_from_all_patient_data
+from services.parseMedications import parseMedications
+from tools.synthetic_export import generate_export
 
 
-def test_parsing_pipeline_smoke():
+def _load_sample() -> str:
+    """Real export from data/gesamte_akte.csv if present, otherwise a synthetic one."""
     sample_path = os.path.join(os.path.dirname(__file__), "..", "data", "gesamte_akte.csv")
     sample_path = os.path.abspath(sample_path)
-    assert os.path.exists(sample_path), f"Sample data not found: {sample_path}"
+    if not os.path.exists(sample_path):
+        return generate_export(stay_days=3)
 
     with open(sample_path, "rb") as f:
         raw = f.read()
 
     # try utf-8 then latin-1
     try:
-        content = raw.decode("utf-8")
+        return raw.decode("utf-8")
     except UnicodeDecodeError:
-        content = raw.decode("latin-1")
+        return raw.decode("latin-1")
+
+
+def test_parsing_pipeline_smoke():
+    content = _load_sample()
 
     cleaned = cleanCSV(content)
     assert isinstance(cleaned, str) and len(cleaned) > 0
@@ -36,3 +44,63 @@ def test_parsing_pipeline_smoke():
     ecmo = parse_from_all_patient_data(blocks.get("ALLE Patientendaten", {}), "ecmo", ";")
     # ecmo could be empty, but function should return a dataframe
     assert ecmo is not None
+
+
+def test_synthetic_export_roundtrip():
+    text = generate_export(stay_days=2, interval_min=30, lab_panels=3, medication_rows=7)
+    assert text == generate_export(stay_days=2, interval_min=30, lab_panels=3, medication_rows=7)
+
+    cleaned = cleanCSV(text)
+    # page headers/footers and interval notes are removed by cleanCSV
+    assert "Ausdruck: Gesamte Akte" not in cleaned and "Seite " not in cleaned
+    assert "Intervall:" not in cleaned
+
+    blocks = splitBlocks(cleaned, ";")
+    vitals = parseNumerics(blocks["Vitaldaten"], ";")
+    assert vitals["timestamp_parsed"].notna().all()
+    assert (vitals["panel"] == "Online erfasste Vitaldaten").sum() == 2 * 48 * 8
+    assert len(blocks["Labor"]) == 3
+
+    for query in ("ecmo", "impella", "hämofilter"):
+        assert not parse_from_all_patient_data(blocks["ALLE Patientendaten"], query, ";").empty
+
+    meds = parseMedications(blocks["Medikamentengaben"], ";")
+    # multiline quoted cells are expanded into one row per rate change
+    assert meds["medication"].nunique() == 7
+    assert len(meds) > 7 and meds["start_parsed"].notna().all()
+
+
+def test_therapy_parser_typed_columns():
+    block = "\n".join([
+        ";;Hämofilter;multiFiltrate;",
+        ";;;Blut (ml/min);120;PFL",
+        "14.09.2025 08:00;;;;",
+        ";;;Blut (ml/min);120;PFL",
+        ";;;Patientenentzug (ml/h);150;PFL",
+        ";;;Citrat; 4,2 mmol/l ;PFL",
+        ";;;Filter;<5;PFL",
+        ";;;nur zwei;Felder",
+        "14.09.2025 10:00;;;;",
+        ";;;Modus;CVVHD;PFL",
+    ])
+    df = parse_from_all_patient_data({"ALLE Patientendaten": block}, "hämofilter", ";")
+    # rows before the first timestamp and with fewer than three fields are skipped
+    assert df["Parameter"].tolist() == ["Blut (ml/min)", "Patientenentzug (ml/h)", "Citrat", "Filter", "Modus"]
+    assert df["Zeit"].tolist() == ["14.09.2025 08:00"] * 4 + ["14.09.2025 10:00"]
+    assert df["timestamp_parsed"].iloc[-1].hour == 10
+    assert df["Wert"].tolist() == ["120", "150", "4,2 mmol/l", "<5", "CVVHD"]
+    assert df["value_numeric"].iloc[0] == 120.0 and df["value_numeric"].iloc[2] == 4.2
+    assert df["value_numeric"].iloc[[3, 4]].isna().all()
+    assert df["unit"].tolist()[:3] == ["ml/min", "ml/h", "mmol/l"]
+
+
+def test_therapy_parser_rejects_non_numeric_values():
+    values = ["1:2", "08:30", "12.09.2025", "30° Oberkörper", "7 mg/dl Kontrolle", "40%", "37,2 °C", "3,5 l/min"]
+    block = "\n".join([";;Lagerung;Bett;", "14.09.2025 08:00;;;;"] + [f";;;P{i};{v};PFL" for i, v in enumerate(values)])
+    df = parse_from_all_patient_data({"ALLE Patientendaten": block}, "lagerung", ";")
+    assert df["Wert"].tolist() == values
+    # ratios, times, dates and free text are no numbers (formerly 1.0, 8.0, 12.09, 30.0, 7.0)
+    assert df["value_numeric"].iloc[:5].isna().all()
+    assert df["unit"].iloc[:5].isna().all()
+    assert df["value_numeric"].iloc[5:].tolist() == [40.0, 37.2, 3.5]
+    assert df["unit"].iloc[5:].tolist() == ["%", "°C", "l/min"]
@@ -0,0 +1,33 @@
+import os
+
+import pytest
+
+from tools.bench_pipeline import run_benchmark, scaling_report
+
+# The default run only checks that every stage is measured (1x). Wall-clock
+# scaling checks depend on machine speed and are opt-in (BENCH_FULL=1, 1x/10x/50x,
+# takes minutes): a stage fails when it grows clearly superlinearly.
+BENCH_FULL = os.environ.get("BENCH_FULL") == "1"
+SCALES = [1, 10, 50] if BENCH_FULL else [1]
+MAX_TIME_PER_SCALE = 3.0
+
+
+@pytest.fixture(scope="module")
+def report():
+    results = []
+    for scale in SCALES:
+        results += run_benchmark(scale, repeat=3 if scale == 1 else 1)
+    return scaling_report(results)
+
+
+def test_all_stages_measured(report):
+    assert set(report["scale"]) == set(SCALES)
+    assert (report["seconds"] > 0).all() and (report["peak_mb"] > 0).all()
+    assert report.groupby("stage")["rows"].min().gt(0).all()
+
+
+@pytest.mark.skipif(not BENCH_FULL, reason="timing check, opt-in with BENCH_FULL=1")
+def test_stages_scale_roughly_linearly(report):
+    largest = report[report["scale"] == max(SCALES)]
+    offenders = largest[largest["time_per_scale"] > MAX_TIME_PER_SCALE]
+    assert offenders.empty, offenders.to_string()
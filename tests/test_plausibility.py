@@ -0,0 +1,67 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+from services.plausibility import RangeRule, flag_values, implausible_rows
+from views.numeric_view import daily_means
+
+
+def _numerics(rows):
+    df = pd.DataFrame(rows, columns=["parameter", "unit", "timestamp_parsed", "value"])
+    df["timestamp_parsed"] = pd.to_datetime(df["timestamp_parsed"])
+    return df
+
+
+def test_flags_implausible_low_and_high_in_one_pass():
+    df = _numerics([
+        ("ARTm", "mmHg", "2025-09-14 08:00", 75.0),
+        ("ARTm", "mmHg", "2025-09-14 09:00", 700.0),
+        ("Temp", "°C", "2025-09-14 08:00", 3.7),
+        ("Temperatur in C", None, "2025-09-14 09:00", 37.2),
+        ("KALIUM", "mmol/l", "2025-09-14 08:00", 3.1),
+        ("KALIUM", "mmol/l", "2025-09-14 12:00", 5.9),
+        ("KREATININ", "µmol/l", "2025-09-14 08:00", 300.0),  # unconverted unit: rule does not apply
+        ("PH", None, "2025-09-14 08:00", "<7"),
+        ("CK", "U/l", "2025-09-14 08:00", 100.0),
+        ("Unbekannt", "x", "2025-09-14 08:00", 1e9),
+    ])
+    out = flag_values(df)
+    assert out["flag"].astype(object).where(out["flag"].notna(), None).tolist() == [
+        None, "implausible", "implausible", None, "low", "high", None, None, None, None,
+    ]
+    assert isinstance(out["flag"].dtype, pd.CategoricalDtype)
+    assert implausible_rows(out).tolist() == [False, True, True] + [False] * 7
+    assert not implausible_rows(df).any()
+
+
+def test_daily_means_exclude_implausible_by_default():
+    df = _numerics([
+        ("ARTm", "mmHg", "2025-09-14 08:00", 70.0),
+        ("ARTm", "mmHg", "2025-09-14 09:00", 80.0),
+        ("ARTm", "mmHg", "2025-09-14 10:00", 700.0),
+    ])
+    daily = daily_means(df)
+    assert daily[["value_mean", "count_numeric", "count_total", "count_implausible"]].values.tolist() == [[75.0, 2, 3, 1]]
+    assert daily_means(df, exclude_implausible=False)["value_mean"].iloc[0] == 850.0 / 3
+
+
+def test_custom_rules_with_open_bounds():
+    rule = RangeRule("X", re.compile("^X$"), None, (0, None), (None, 10))
+    out = flag_values(_numerics([("X", None, "2025-09-14", v) for v in (-1.0, 5.0, 11.0, 1e12, np.nan)]), rules=[rule])
+    assert out["flag"].astype(object).where(out["flag"].notna(), None).tolist() == ["implausible", None, "high", "high", None]
+
+
+def test_fio2_as_fraction_is_plausible():
+    df = _numerics([
+        ("FiO2", None, "2025-09-14 08:00", 0.4),
+        ("FiO2 in %", "%", "2025-09-14 09:00", 0.6),
+        ("FiO2", "%", "2025-09-14 10:00", 40.0),
+        ("FiO2", "%", "2025-09-14 11:00", 1.0),
+        ("FiO2", None, "2025-09-14 12:00", 0.1),  # 10 %: below the plausible bound
+        ("FiO2", "%", "2025-09-14 13:00", 400.0),
+    ])
+    out = flag_values(df)
+    assert out["flag"].astype(object).where(out["flag"].notna(), None).tolist() == [
+        None, None, None, None, "implausible", "implausible",
+    ]
@@ -0,0 +1,71 @@
+import asyncio
+
+import pytest
+
+from services.redcap_client import RedcapImportClient, batch_records, payload_to_records
+from tools.redcap_stub_server import RedcapStubServer
+
+
+def _payload(patient_key="P1", days=3, params=5):
+    return {
+        "patient_key": patient_key,
+        "parameters": [
+            {"view": "df3_lab", "parameter": f"KREATININ {p}", "date": f"2025-09-1{d}", "value": str(p + d)}
+            for d in range(days)
+            for p in range(params)
+        ],
+    }
+
+
+def test_payload_to_records_repeating_instances():
+    records = payload_to_records(_payload(), daily_instrument="tagesdaten")
+    # base record + one instance per day
+    assert len(records) == 4
+    assert [r.get("redcap_repeat_instance") for r in records[1:]] == ["1", "2", "3"]
+    assert "df3_lab_kreatinin_0" in records[1]
+
+
+def test_payload_to_records_without_instrument_rejects_several_days():
+    # one dated value per field is fine in the base record
+    records = payload_to_records(_payload(days=1, params=2))
+    assert records == [{"record_id": "P1", "df3_lab_kreatinin_0": "0", "df3_lab_kreatinin_1": "1"}]
+    # several days for one field would keep only the last value
+    with pytest.raises(ValueError, match="df3_lab_kreatinin_0 \\(3 Tage\\)"):
+        payload_to_records(_payload(days=3, params=2))
+
+
+def test_batch_records_respects_size_limit():
+    records = [{"record_id": str(i), "x": "a" * 100} for i in range(50)]
+    batches = list(batch_records(records, max_batch_bytes=1000))
+    assert sum(len(b) for b in batches) == 50
+    assert len(batches) > 1
+
+
+def test_import_with_retries_and_bounded_concurrency():
+    async def _main():
+        async with RedcapStubServer(latency=0.01, fail_first=2) as server:
+            records = [r for i in range(20) for r in payload_to_records(_payload(f"P{i}"), daily_instrument="tagesdaten")]
+            async with RedcapImportClient(
+                server.url, server.token, concurrency=3, max_batch_bytes=2000, backoff_base=0.01
+            ) as client:
+                result = await client.import_records(records)
+            return server, result, len(records)
+
+    server, result, n = asyncio.run(_main())
+    assert result.ok, result.errors
+    assert result.retries == 2
+    assert len(server.records) == n
+    assert server.max_inflight <= 3
+    assert server.connections <= 3
+
+
+def test_import_does_not_retry_client_errors():
+    async def _main():
+        async with RedcapStubServer() as server:
+            async with RedcapImportClient(server.url, "WRONG", backoff_base=0.01) as client:
+                result = await client.import_records([{"record_id": "1"}])
+            return server, result
+
+    server, result = asyncio.run(_main())
+    assert not result.ok and "403" in result.errors[0]
+    assert server.requests == 1
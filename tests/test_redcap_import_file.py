@@ -0,0 +1,83 @@
+import io
+import json
+
+import pandas as pd
+
+from services.redcap_import_file import DataDictionary, compile_import_file, entries_from_payloads, validate_entries
+
+DD_CSV = '''Variable / Field Name,Form Name,Field Type,Field Label,"Choices, Calculations, OR Slider Labels",Text Validation Type OR Show Slider Number,Text Validation Min,Text Validation Max,Field Annotation
+record_id,stammdaten,text,Record ID,,,,,
+ecmo_ja,stammdaten,yesno,ECMO,,,,,"@MLIFE=""mcs_ecmo:ECMO Ein/Ausbau"""
+tag_datum,tagesdaten,text,Datum,,date_ymd,,,@MLIFE-DATE
+kreatinin,tagesdaten,text,Kreatinin,,number,0,30,"@MLIFE=""df3_lab:KREATININ"""
+map,tagesdaten,text,MAP,,integer,10,250,"@MLIFE=""df1_vitals:ARTm"""
+'''
+
+
+def _payloads(n):
+    for i in range(n):
+        yield {
+            "patient_key": f"P{i}",
+            "parameters": [
+                {"view": "mcs_ecmo", "parameter": "ECMO Ein/Ausbau", "date": None, "value": "1"},
+                {"view": "df3_lab", "parameter": "KREATININ", "date": "2025-09-15", "value": "1,2"},
+                {"view": "df3_lab", "parameter": "KREATININ", "date": "2025-09-14", "value": "99"},
+                {"view": "df1_vitals", "parameter": "ARTm", "date": "2025-09-14", "value": "72"},
+                {"view": "df1_vitals", "parameter": "HF", "date": "2025-09-14", "value": "80"},
+            ],
+        }
+
+
+def test_compile_csv_expands_days_and_validates():
+    dd = DataDictionary.from_csv(io.StringIO(DD_CSV), repeating_forms=["tagesdaten"])
+    out, errors = io.StringIO(), io.StringIO()
+    result = compile_import_file(entries_from_payloads(_payloads(3), chunk_patients=2), dd, out, errors_out=errors)
+
+    df = pd.read_csv(io.StringIO(out.getvalue()), dtype=str, keep_default_na=False)
+    assert list(df.columns) == ["record_id", "redcap_repeat_instrument", "redcap_repeat_instance", "ecmo_ja", "tag_datum", "kreatinin", "map"]
+    assert result.patients == 3 and result.records == 9
+    assert result.invalid == 3 and result.unmapped == 3
+    p0 = df[df["record_id"] == "P0"]
+    assert p0["redcap_repeat_instance"].tolist() == ["", "1", "2"]
+    assert p0["tag_datum"].tolist() == ["", "2025-09-14", "2025-09-15"]
+    # 99 > max -> leer exportiert, 1,2 -> 1.2
+    assert p0["kreatinin"].tolist() == ["", "", "1.2"]
+    assert "über Maximum" in errors.getvalue()
+
+
+def test_compile_json():
+    dd = DataDictionary.from_csv(io.StringIO(DD_CSV), repeating_forms=["tagesdaten"])
+    out = io.StringIO()
+    compile_import_file(entries_from_payloads(_payloads(1)), dd, out, fmt="json")
+    records = json.loads(out.getvalue())
+    assert records[0]["ecmo_ja"] == "1" and records[1]["map"] == "72"
+
+
+def test_numbers_keep_precision_and_conflicts_are_errors():
+    dd = DataDictionary.from_csv(io.StringIO(DD_CSV))
+    payload = {
+        "patient_key": "P1",
+        "parameters": [
+            {"view": "df3_lab", "parameter": "KREATININ", "date": "2025-09-14", "value": "12,3456789"},
+            {"view": "df1_vitals", "parameter": "ARTm", "date": "2025-09-14", "value": "72"},
+            # no repeating instrument: a second day would silently replace the first
+            {"view": "df1_vitals", "parameter": "ARTm", "date": "2025-09-15", "value": "80"},
+        ],
+    }
+    out, errors = io.StringIO(), io.StringIO()
+    result = compile_import_file(entries_from_payloads([payload]), dd, out, errors_out=errors)
+    df = pd.read_csv(io.StringIO(out.getvalue()), dtype=str, keep_default_na=False)
+    assert df["kreatinin"].tolist() == ["12.3456789"]
+    assert df["map"].tolist() == [""] and result.invalid == 2
+    assert errors.getvalue().count("mehrere Werte ohne Wiederholung") == 2
+
+    dd = DataDictionary.from_csv(io.StringIO(DD_CSV + 'menge,stammdaten,text,Menge,,number,,,"@MLIFE=""df1_vitals:Menge"""\n'))
+    entries = pd.DataFrame({
+        "patient_key": "P1", "view": "df1_vitals", "parameter": "Menge", "date": None,
+        "value": ["123456,7", "1e-05", "+0,5", "inf"],
+    })
+    checked = validate_entries(entries.iloc[[0]], dd)
+    assert checked["value_out"].tolist() == ["123456.7"]
+    checked = validate_entries(entries.iloc[1:].assign(patient_key=["P2", "P3", "P4"]), dd)
+    assert checked["value_out"].tolist() == ["0.00001", "0.5", ""]
+    assert checked["error"].tolist() == ["", "", "keine Zahl"]
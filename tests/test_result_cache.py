@@ -0,0 +1,95 @@
+import pandas as pd
+import pytest
+
+import services.result_cache as result_cache
+from services.result_cache import ResultCache, result_key
+from tools.synthetic_export import generate_export
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    fresh = ResultCache()
+    monkeypatch.setattr(result_cache, "_CACHE", fresh)
+    return fresh
+
+
+def _frame(n):
+    return pd.DataFrame({"value": range(n)})
+
+
+def test_lru_budget_and_read_only_entries():
+    cache = ResultCache(max_bytes=3 * _frame(100).memory_usage(index=True, deep=True).sum())
+    calls = []
+
+    def compute(n):
+        calls.append(n)
+        return _frame(n)
+
+    first = cache.get_or_compute(result_key(("h1", "vitals"), "numeric", params=["HF", "SpO2"]), lambda: compute(100))
+    # selection order does not change the key
+    again = cache.get_or_compute(result_key(("h1", "vitals"), "numeric", params=["SpO2", "HF"]), lambda: compute(100))
+    assert calls == [100] and cache.hits == 1
+    pd.testing.assert_frame_equal(first, again)
+    with pytest.raises(ValueError):
+        again["value"].values[0] = -1
+    again["local"] = 1
+    assert "local" not in cache.get(result_key(("h1", "vitals"), "numeric", params=["HF", "SpO2"])).columns
+
+    for mode in ("daily", "raw2", "raw3"):
+        cache.get_or_compute(result_key(("h1", "vitals"), "numeric", mode=mode), lambda: compute(100))
+    # budget of three entries: the least recently used one is gone
+    assert len(cache) == 3 and cache.nbytes <= cache.max_bytes
+    assert result_key(("h1", "vitals"), "numeric", params=["HF", "SpO2"]) not in cache
+
+    # larger than the whole budget: returned, not stored
+    big = cache.get_or_compute(result_key(("h1", "lab"), "numeric"), lambda: _frame(1000))
+    assert len(big) == 1000 and result_key(("h1", "lab"), "numeric") not in cache
+
+    cache.get_or_compute(result_key(("h2", "vitals"), "numeric"), lambda: _frame(10))
+    assert cache.discard("h1") == 2 and len(cache) == 1
+
+
+def test_views_reuse_cached_results(cache):
+    from services.datasets import PatientDatasets
+    from views.numeric_view import daily_means, filter_numeric, numeric_results
+    from views.therapy import daily_means_by_device, filter_therapy, therapy_results
+
+    datasets = PatientDatasets(generate_export(stay_days=2, seed=5))
+    vitals = datasets.get("vitals")
+    params = sorted(vitals["parameter"].dropna().unique())[:2]
+    start, end = datasets.time_bounds()
+    key = (datasets.content_hash, "vitals")
+
+    grouped = numeric_results(vitals, params, start, end, avg_daily=True, dataset_key=key)
+    expected = daily_means(filter_numeric(vitals, params, start, end))
+    pd.testing.assert_frame_equal(grouped.reset_index(drop=True), expected.reset_index(drop=True))
+    misses = cache.misses
+    # toggling back to the same state (also from the overview) is served from the cache
+    numeric_results(vitals, params, start, end, dataset_key=key)
+    again = numeric_results(vitals, list(reversed(params)), start, end, avg_daily=True, dataset_key=key)
+    assert cache.misses == misses and cache.hits >= 2
+    pd.testing.assert_frame_equal(again, grouped)
+    # a different switch is a different state
+    numeric_results(vitals, params, start, end, avg_daily=True, exclude_implausible=False, dataset_key=key)
+    assert cache.misses == misses + 1
+
+    ecmo = datasets.get("ecmo")
+    devices = sorted(ecmo["Sub-Kategorie"].dropna().unique())
+    daily = therapy_results(ecmo, devices, [], start, end, avg_daily=True, dataset_key=(datasets.content_hash, "ecmo"))
+    pd.testing.assert_frame_equal(daily, daily_means_by_device(filter_therapy(ecmo, devices, [], start, end)))
+    misses = cache.misses
+    therapy_results(ecmo, devices[::-1], [], start, end, avg_daily=True, dataset_key=(datasets.content_hash, "ecmo"))
+    assert cache.misses == misses
+
+
+def test_registry_eviction_discards_results(cache):
+    from services.dataset_registry import DatasetRegistry
+    from services.datasets import PatientDatasets
+
+    text = generate_export(stay_days=1)
+    registry = DatasetRegistry(max_bytes=1)
+    registry.acquire("old", "s1", lambda: PatientDatasets(text, ";"))
+    cache.get_or_compute(result_key(("old", "vitals"), "numeric"), lambda: _frame(10))
+    registry.release("old", "s1")
+    registry.acquire("new", "s2", lambda: PatientDatasets(text, ";"))
+    assert "old" not in registry and len(cache) == 0
@@ -0,0 +1,67 @@
+import pandas as pd
+
+from services.alignment import SeriesRef
+from services.scores import Criterion, ScoreComponent, ScoreDefinition, evaluate_scores, score_table, scores_long
+
+
+def _long(parameter, times, values, panel="Labor: Blutbild"):
+    return pd.DataFrame({
+        "panel": panel,
+        "parameter": parameter,
+        "timestamp_parsed": pd.to_datetime(times),
+        "value": values,
+    })
+
+
+def test_worst_value_per_day_and_thresholds():
+    lab = pd.concat([
+        _long("PLT", ["2025-09-14 06:00", "2025-09-14 18:00", "2025-09-15 06:00"], [160.0, 95.0, 150.0]),
+        _long("KREATININ", ["2025-09-14 06:00", "2025-09-15 06:00"], [1.9, 2.0]),
+    ], ignore_index=True)
+    vitals = _long("ARTm", ["2025-09-14 01:00", "2025-09-15 01:00"], [72.0, 65.0], panel="Online erfasste Vitaldaten")
+    meds = pd.DataFrame({
+        "parameter": ["Noradrenalin Perfusor 5mg/50ml – max. Rate"],
+        "timestamp_parsed": pd.to_datetime(["2025-09-15"]),
+        "value": [0.9],
+    })
+    detail = evaluate_scores({"lab": lab, "vitals": vitals, "medication_daily": meds})
+    table = score_table(detail).set_index("period")
+    day1, day2 = pd.Timestamp("2025-09-14"), pd.Timestamp("2025-09-15")
+    # worst platelet count of day 1 is 95 (<100 -> 2); exactly 150 scores 0
+    assert table.loc[day1, "Gerinnung"] == 2 and table.loc[day2, "Gerinnung"] == 0
+    assert table.loc[day1, "Niere"] == 1 and table.loc[day2, "Niere"] == 2
+    # any norepinephrine -> 3, even though MAP < 70 alone would give 1
+    assert table.loc[day1, "Kreislauf"] == 0 and table.loc[day2, "Kreislauf"] == 3
+    assert table.loc[day2, "Gesamt"] == 5 and table.loc[day2, "Komponenten"] == 3
+
+    # with a known weight the dose criterion applies: 0.9 mg/h at 70 kg = 0.21 µg/kg/min -> 4
+    weighted = score_table(evaluate_scores({"lab": lab, "vitals": vitals, "medication_daily": meds}, context={"weight_kg": 70})).set_index("period")
+    assert weighted.loc[day2, "Kreislauf"] == 4
+
+    long = scores_long(detail)
+    assert set(long["parameter"]) == {"SOFA Gerinnung", "SOFA Niere", "SOFA Kreislauf", "SOFA Gesamt"}
+
+
+def test_norepinephrine_in_ml_per_hour_is_not_dosed():
+    # without a parsed concentration the daily maximum stays in ml/h: no dose, only "any vasopressor"
+    meds = pd.DataFrame({
+        "parameter": ["Noradrenalin Perfusor – max. Rate", "Noradrenalin Perfusor 5mg/50ml – max. Rate"],
+        "unit": ["ml/h", "mg/h"],
+        "timestamp_parsed": pd.to_datetime(["2025-09-14", "2025-09-15"]),
+        "value": [8.0, 0.3],
+    })
+    detail = evaluate_scores({"medication_daily": meds}, context={"weight_kg": 70})
+    dose = detail[detail["criterion"] == "Noradrenalin > 0,1 µg/kg/min"]
+    # 0.3 mg/h at 70 kg = 0.07 µg/kg/min
+    assert dose["period"].tolist() == [pd.Timestamp("2025-09-15")] and dose["points"].tolist() == [0]
+    assert score_table(detail).set_index("period")["Kreislauf"].tolist() == [3, 3]
+
+
+def test_new_score_is_just_a_definition():
+    fever = ScoreDefinition("Fieber", (
+        ScoreComponent("Temperatur", (Criterion("Temp", SeriesRef("vitals", "Temp"), "max", (38.0, 39.0), (0, 1, 2)),)),
+    ), freq="12h")
+    vitals = _long("Temp", ["2025-09-14 01:00", "2025-09-14 11:00", "2025-09-14 13:00"], [37.0, 39.2, 38.0])
+    detail = evaluate_scores({"vitals": vitals}, definitions=[fever])
+    assert detail["points"].tolist() == [2, 1]
+    assert detail["period"].tolist() == list(pd.to_datetime(["2025-09-14 00:00", "2025-09-14 12:00"]))
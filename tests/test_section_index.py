@@ -0,0 +1,117 @@
+import re
+from typing import Dict, List, Optional
+
+from services.get_from_all_patient_data_by_string import get_from_all_patient_data_by_string
+from services.helpers import extract_all_patient_data_headers
+from services.section_index import SectionIndex, compile_matcher
+from tools.synthetic_export import generate_export
+from services.clean_csv import cleanCSV
+from services.split_blocks import splitBlocks
+
+
+def _legacy(data, query, DELIMITER=";"):
+    """Lineare Referenz-Implementierung (Stand vor dem SectionIndex)."""
+    headers = extract_all_patient_data_headers(data["ALLE Patientendaten"], DELIMITER)
+
+    matching_headers = [header for header in headers if query.lower() in header.lower()]
+
+    lines = data["ALLE Patientendaten"].splitlines()
+    result: Dict[str, Dict[str, List[str]]] = {header: {} for header in matching_headers}
+
+    current_header: Optional[str] = None
+    current_sub_header_counter = 1
+    current_sub_header: Optional[str] = None
+    current_sub_header_line: Optional[str] = None
+    buffer: List[str] = []
+
+    for line in lines:
+        parts = line.split(DELIMITER)
+        if len(parts) < 3:
+            continue
+
+        key = parts[2]
+
+        if key in headers:
+            if current_header is not None and current_sub_header is not None and buffer:
+                result[current_header].setdefault(current_sub_header, []).extend(buffer)
+                buffer = []
+
+            if key in matching_headers:
+                if key == current_header:
+                    if current_sub_header_line is None:
+                        current_sub_header_line = line
+                    elif line != current_sub_header_line:
+                        current_sub_header_counter += 1
+                        current_sub_header_line = line
+                else:
+                    current_sub_header_counter = 1
+
+                current_header = key
+                current_sub_header = f"{current_header} {current_sub_header_counter}"
+                result[current_header].setdefault(current_sub_header, [])
+            else:
+                current_header = None
+                current_sub_header = None
+                current_sub_header_line = None
+                current_sub_header_counter = 1
+        else:
+            if current_header is not None:
+                buffer.append(line)
+
+    if current_header is not None and current_sub_header is not None and buffer:
+        result[current_header].setdefault(current_sub_header, []).extend(buffer)
+
+    return result
+
+
+TRICKY = "\n".join([
+    ";;Datum;;",
+    "14.09.2025 08:00;;;;",
+    ";;ECMO;Cardiohelp A;",
+    ";;;Blutfluss;4,1;PFL",
+    "14.09.2025 09:00;;;;",
+    ";;ECMO;Cardiohelp A;",
+    ";;;Blutfluss;4,0;PFL",
+    ";;ECMO;Cardiohelp B;",
+    ";;;Blutfluss;3,2;PFL",
+    "x;y",
+    ";;ECMO-Zubehör;Oxygenator;",
+    ";;;Wechsel;1;PFL",
+    ";;Lagerung;;",
+    ";;;Bauchlage;ja;PFL",
+    ";;ECMO;Cardiohelp B;",
+    ";;;Gasfluss;2;PFL",
+    ";;Impella;CP;",
+    ";;;P-Level;P4;PFL",
+    ";;ECMO;Cardiohelp B;",
+    ";;;Gasfluss;3;PFL",
+])
+
+
+def _blocks():
+    blocks = splitBlocks(cleanCSV(generate_export(stay_days=2)), ";")
+    return blocks["ALLE Patientendaten"]
+
+
+def test_section_index_matches_linear_scan():
+    for data in ({"ALLE Patientendaten": TRICKY}, _blocks()):
+        index = SectionIndex(data["ALLE Patientendaten"])
+        assert index.headers == extract_all_patient_data_headers(data["ALLE Patientendaten"])
+        for query in ("ecmo", "ECMO", "impella", "hämofilter", "lagerung", "zubehör", "", "nicht vorhanden"):
+            expected = _legacy(data, query)
+            got = get_from_all_patient_data_by_string(data, query, index=index)
+            assert got == expected
+            assert list(got) == list(expected)
+
+
+def test_multi_pattern_matcher():
+    index = SectionIndex(TRICKY)
+    matcher = compile_matcher("impella", re.compile(r"^ecmo$"))
+    assert sorted(index.matching_headers(matcher)) == ["ECMO", "Impella"]
+    sections = index.sections(matcher)
+    # the first repetition of a header only records its line, the next differing one
+    # counts up; any other header in between restarts the numbering
+    assert sections["ECMO"]["ECMO 1"][:3] == [";;;Blutfluss;4,1;PFL", "14.09.2025 09:00;;;;", ";;;Blutfluss;4,0;PFL"]
+    assert sections["ECMO"]["ECMO 2"] == [";;;Blutfluss;3,2;PFL"]
+    assert ";;;Wechsel;1;PFL" not in sum(sections["ECMO"].values(), [])
+    assert index.line_ranges["Lagerung"] == [(12, 14)]
@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+
+from services.plausibility import flag_values
+from services.source_merge import MergeRule, mark_duplicates, merge_report, merge_sources
+
+ONLINE, MANUAL = "Online erfasste Vitaldaten", "Manuell erfasste Vitaldaten"
+RULE = MergeRule(priority=(ONLINE, MANUAL), tolerance=pd.Timedelta(minutes=5), aliases={"Herzfrequenz (bpm)": "HF"})
+
+
+def _vitals(rows):
+    df = pd.DataFrame(rows, columns=["panel", "parameter", "timestamp_parsed", "value"])
+    df["timestamp_parsed"] = pd.to_datetime(df["timestamp_parsed"])
+    df["unit"] = None
+    return df
+
+
+def test_priority_tolerance_and_aliases():
+    df = _vitals([
+        (MANUAL, "Herzfrequenz (bpm)", "2025-09-14 08:03", 90.0),  # alias, within 5 min of online 08:00
+        (ONLINE, "HF", "2025-09-14 08:00", 88.0),
+        (ONLINE, "HF", "2025-09-14 08:15", 87.0),
+        (MANUAL, "Herzfrequenz (bpm)", "2025-09-14 08:40", 91.0),  # no online value within tolerance
+        (MANUAL, "ARTm", "2025-09-14 08:00", 70.0),  # other parameter: not a duplicate
+        (ONLINE, "HF", "2025-09-14 08:15", 87.0),  # exact duplicate within the same source
+        (MANUAL, "HF", None, 80.0),  # no timestamp: kept
+    ])
+    assert mark_duplicates(df, RULE).tolist() == [True, False, False, False, False, True, False]
+
+    merged = merge_sources(df, RULE)
+    assert len(merged) == 5
+    report = merge_report(merged[merged["parameter"] == "HF"])
+    assert report.values.tolist() == [[MANUAL, "Herzfrequenz (bpm)", 2, 1], [ONLINE, "HF", 3, 1]]
+    assert merge_report(df).empty
+    # priority is configurable: manual first keeps the 08:03 entry and drops the online 08:00 value
+    manual_first = MergeRule(priority=(MANUAL, ONLINE), tolerance=RULE.tolerance, aliases=RULE.aliases)
+    assert mark_duplicates(df, manual_first).tolist()[:3] == [False, True, False]
+    # without tolerance only identical timestamps collide
+    exact = MergeRule(priority=(ONLINE, MANUAL), tolerance=pd.Timedelta(0), aliases=RULE.aliases)
+    assert mark_duplicates(df, exact).sum() == 1
+
+
+def test_implausible_values_lose_against_lower_priority_sources():
+    df = flag_values(_vitals([
+        (ONLINE, "ARTm", "2025-09-14 08:00", 700.0),
+        (MANUAL, "ARTm", "2025-09-14 08:00", 72.0),
+    ]))
+    assert mark_duplicates(df, RULE).tolist() == [True, False]
+
+
+def test_large_frame_is_merged_in_bulk():
+    n = 200_000
+    t = pd.Timestamp("2025-09-14") + pd.to_timedelta(np.arange(n) * 15, unit="min")
+    online = pd.DataFrame({"panel": ONLINE, "parameter": "HF", "timestamp_parsed": t, "value": 80.0})
+    manual = pd.DataFrame({"panel": MANUAL, "parameter": "Herzfrequenz (bpm)", "timestamp_parsed": t[::4] + pd.Timedelta(minutes=2), "value": 81.0})
+    merged = merge_sources(pd.concat([online, manual], ignore_index=True), RULE)
+    assert len(merged) == n and (merged["panel"] == ONLINE).all()
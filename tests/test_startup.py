@@ -0,0 +1,18 @@
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_upload_prompt_imports_stay_light():
+    # pandas, parsers and views are imported lazily / by app_core.start_preload()
+    code = (
+        "import sys, app\n"
+        "heavy = [m for m in ('pandas', 'services.datasets', 'views', 'ui.sidebar') if m in sys.modules]\n"
+        "assert not heavy, heavy\n"
+        "import app_core\n"
+        "app_core.start_preload().join()\n"
+        "assert all(m in sys.modules for m in app_core.PRELOAD_MODULES)\n"
+    )
+    subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True, capture_output=True)
@@ -0,0 +1,59 @@
+import re
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.units import UnitRule, converted_rows, mixed_units, normalize_units, unit_key
+from views.numeric_view import daily_means
+
+
+def _lab(rows):
+    df = pd.DataFrame(rows, columns=["panel", "parameter", "unit", "timestamp", "value_raw", "value"])
+    df["timestamp_parsed"] = pd.to_datetime(df["timestamp"], format="%d.%m.%y %H:%M")
+    return df
+
+
+def test_normalize_converts_whole_groups_and_keeps_text_values():
+    df = _lab([
+        ("Labor: Retention", "KREATININ", "mg/dl", "14.09.25 08:00", "1,2", 1.2),
+        ("Labor: Retention", "KREATININ", "µmol/l", "14.09.25 12:00", "176,8", 176.8),
+        ("Labor: Retention", "KREATININ", "umol/L", "15.09.25 08:00", "<20", "<20"),
+        ("Labor: Blutgase arteriell", "PO2", "kPa", "14.09.25 08:00", "10", 10.0),
+        ("Labor: Blutzucker", "GLUCOSE(BG)", "mmol/l", "14.09.25 08:00", "5,5", 5.5),
+        ("Labor: Blutbild", "HB (HGB)", "g/dL", "14.09.25 08:00", "10", 10.0),
+        ("Labor: Gerinnung", "INR", None, "14.09.25 08:00", "1,1", 1.1),
+        ("Labor: Enzyme", "CK", "U/l", "14.09.25 08:00", "100", 100.0),
+    ])
+    out = normalize_units(df)
+
+    assert out["value"].tolist()[:2] == pytest.approx([1.2, 2.0])
+    assert out["value"].iloc[3] == pytest.approx(75.0062)
+    assert out["value"].iloc[4] == pytest.approx(99.088)
+    # text values keep their unit, spelling variants are unified without conversion
+    assert out["value"].iloc[2] == "<20" and out["unit"].iloc[2] == "umol/L"
+    assert out["unit"].tolist()[:2] + out["unit"].tolist()[3:6] == ["mg/dl", "mg/dl", "mmHg", "mg/dl", "g/dl"]
+    assert out["unit_raw"].tolist() == df["unit"].tolist()
+    assert pd.isna(out["unit"].iloc[6]) and out["unit"].iloc[7] == "U/l"
+    assert converted_rows(out).tolist() == [False, True, False, True, True, True, False, False]
+    assert mixed_units(out) == {"KREATININ": ["mg/dl", "umol/L"]}
+
+
+def test_daily_means_aggregate_in_one_unit():
+    df = _lab([
+        ("Labor: Retention", "KREATININ", "mg/dl", "14.09.25 08:00", "1,0", 1.0),
+        ("Labor: Retention", "KREATININ", "µmol/l", "14.09.25 12:00", "265,2", 265.2),
+    ])
+    daily = daily_means(df)
+    assert daily[["parameter", "unit", "count_numeric"]].values.tolist() == [["KREATININ", "mg/dl", 2]]
+    assert daily["value_mean"].iloc[0] == pytest.approx(2.0)
+    assert len(daily_means(df, normalize=False)) == 2
+
+
+def test_custom_rules_and_unit_keys():
+    rule = UnitRule("Test", re.compile(r"^X$"), "a", {"b": 2.0})
+    df = _lab([("p", "X", "B", "14.09.25 08:00", "3", 3.0), ("p", "KREATININ", "µmol/l", "14.09.25 08:00", "88,4", 88.4)])
+    out = normalize_units(df, rules=[rule])
+    assert out["value"].tolist() == [6.0, 88.4] and out["unit"].tolist() == ["a", "µmol/l"]
+    assert unit_key(" µmol/L ") == unit_key("umol/l") == "umol/l"
+    assert unit_key(np.nan) is None
@@ -0,0 +1,111 @@
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List
+
+# ensure project root is on sys.path
+project_root = Path(__file__).resolve().parents[1]
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+import pandas as pd
+
+from services.clean_csv import cleanCSV
+from services.parseMedications import parseMedications
+from services.parse_from_all_patient_data import parse_from_all_patient_data
+from services.parse_numerics import parseNumerics
+from services.split_blocks import splitBlocks
+from tools.synthetic_export import scaled_export
+from views.numeric_view import daily_means
+from views.therapy import daily_means_by_device
+
+# Stufen-Benchmark der Parsing-Pipeline auf synthetischen Exporten in 1x, 10x, 50x Größe.
+# Pro Stufe werden Laufzeit (bestes von `repeat` Läufen) und tracemalloc-Spitze gemessen.
+#
+#   python tools/bench_pipeline.py --scales 1 10 50
+
+DELIMITER = ";"
+
+
+def _rows(result) -> int:
+    if isinstance(result, pd.DataFrame):
+        return len(result)
+    if isinstance(result, dict):
+        return sum(len(v) for v in result.values())
+    if isinstance(result, str):
+        return result.count("\n") + 1
+    return 0
+
+
+def measure(fn: Callable, *args, repeat: int = 1) -> Dict:
+    """Laufzeit (min über `repeat`) und Speicherspitze (separater Lauf mit tracemalloc)."""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - t0)
+    tracemalloc.start()
+    try:
+        fn(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"seconds": best, "peak_mb": peak / 1e6, "rows": _rows(result), "result": result}
+
+
+def run_benchmark(scale: int, repeat: int = 1) -> List[Dict]:
+    text = scaled_export(scale)
+    out: List[Dict] = []
+
+    def stage(name, fn, *args):
+        m = measure(fn, *args, repeat=repeat)
+        out.append({"stage": name, "scale": scale, "input_mb": len(text) / 1e6, **{k: v for k, v in m.items() if k != "result"}})
+        return m["result"]
+
+    clean = stage("cleanCSV", cleanCSV, text)
+    blocks = stage("splitBlocks", splitBlocks, clean, DELIMITER)
+    vitals = stage("parseNumerics[Vitaldaten]", parseNumerics, blocks["Vitaldaten"], DELIMITER)
+    stage("parseNumerics[Respiratordaten]", parseNumerics, blocks["Respiratordaten"], DELIMITER)
+    stage("parseNumerics[Labor]", parseNumerics, blocks["Labor"], DELIMITER)
+    ecmo = stage("parse_from_all_patient_data[ecmo]", parse_from_all_patient_data, blocks["ALLE Patientendaten"], "ecmo", DELIMITER)
+    stage("parse_from_all_patient_data[hämofilter]", parse_from_all_patient_data, blocks["ALLE Patientendaten"], "hämofilter", DELIMITER)
+    stage("parseMedications", parseMedications, blocks["Medikamentengaben"], DELIMITER)
+    stage("view: daily_means[Vitaldaten]", daily_means, vitals)
+    stage("view: daily_means_by_device[ECMO]", daily_means_by_device, ecmo)
+    return out
+
+
+def scaling_report(results: List[Dict]) -> pd.DataFrame:
+    """Zeit/Speicher je Stufe und Skalierung plus Verhältnis zur kleinsten Skalierung.
+
+    `time_ratio / scale_ratio` nahe 1 bedeutet lineares Verhalten; deutlich > 1
+    deutet auf superlineare (z.B. quadratische) Kosten hin.
+    """
+    df = pd.DataFrame(results)
+    base = df.loc[df.groupby("stage")["scale"].idxmin(), ["stage", "scale", "seconds", "peak_mb"]]
+    base = base.rename(columns={"scale": "base_scale", "seconds": "base_seconds", "peak_mb": "base_peak_mb"})
+    df = df.merge(base, on="stage")
+    df["scale_ratio"] = df["scale"] / df["base_scale"]
+    df["time_ratio"] = df["seconds"] / df["base_seconds"]
+    df["mem_ratio"] = df["peak_mb"] / df["base_peak_mb"]
+    df["time_per_scale"] = df["time_ratio"] / df["scale_ratio"]
+    return df[["stage", "scale", "input_mb", "rows", "seconds", "peak_mb", "time_ratio", "mem_ratio", "time_per_scale"]]
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Stufen-Benchmark der mlife-Parsing-Pipeline")
+    ap.add_argument("--scales", type=int, nargs="+", default=[1, 10, 50])
+    ap.add_argument("--repeat", type=int, default=1)
+    args = ap.parse_args(argv)
+    results = []
+    for scale in args.scales:
+        results += run_benchmark(scale, repeat=args.repeat)
+    with pd.option_context("display.width", 200, "display.max_columns", 20, "display.float_format", "{:.3f}".format):
+        print(scaling_report(results).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
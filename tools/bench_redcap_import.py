@@ -0,0 +1,52 @@
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# ensure project root is on sys.path
+project_root = Path(__file__).resolve().parents[1]
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from services.redcap_client import RedcapImportClient, payload_to_records
+from tools.redcap_stub_server import RedcapStubServer
+
+# Durchsatz-Benchmark: Übersicht-Payloads für viele Patienten gegen den lokalen
+# Stub (mit künstlicher Latenz) importieren, sequentiell vs. nebenläufig.
+PATIENTS = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+DAYS = 14
+PARAMS = 40
+LATENCY = 0.02
+
+
+def _payload(i: int) -> dict:
+    return {
+        "patient_key": f"P{i:05d}",
+        "parameters": [
+            {"view": "df3_lab", "parameter": f"Parameter {p}", "date": f"2025-09-{d + 1:02d}", "value": f"{p * 1.5 + d:.1f}"}
+            for d in range(DAYS)
+            for p in range(PARAMS)
+        ],
+    }
+
+
+async def _run(concurrency: int, max_batch_bytes: int):
+    records = [r for i in range(PATIENTS) for r in payload_to_records(_payload(i), daily_instrument="tagesdaten")]
+    async with RedcapStubServer(latency=LATENCY) as server:
+        async with RedcapImportClient(server.url, server.token, concurrency=concurrency, max_batch_bytes=max_batch_bytes) as client:
+            t0 = time.perf_counter()
+            result = await client.import_records(records)
+            elapsed = time.perf_counter() - t0
+            opened = client._pool.opened
+        assert result.ok and len(server.records) == len(records), result.errors
+    print(
+        f"concurrency={concurrency:2d} batch<= {max_batch_bytes // 1000:4d} kB: "
+        f"{result.records} records / {result.batches} batches in {elapsed:.2f}s "
+        f"-> {result.records / elapsed:,.0f} records/s, {result.bytes_sent / elapsed / 1e6:.1f} MB/s, "
+        f"{opened} connections"
+    )
+
+
+if __name__ == "__main__":
+    for concurrency, batch_bytes in [(1, 100_000), (4, 100_000), (8, 100_000), (8, 500_000)]:
+        asyncio.run(_run(concurrency, batch_bytes))
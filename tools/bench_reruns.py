@@ -0,0 +1,73 @@
+import argparse
+import os
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, List
+
+# ensure project root is on sys.path
+project_root = Path(__file__).resolve().parents[1]
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+import pandas as pd
+
+from tools.synthetic_export import scaled_export
+
+# Rerun-Latenz eines Parameter-Toggles auf einem großen synthetischen Export.
+#
+# Die App läuft über streamlit.testing.AppTest; jeder Toggle einer Parameter-
+# Checkbox wird `toggles`-mal ausgeführt. AppTest führt immer das ganze Skript
+# aus, deshalb werden beide Zeiten aus app_core._record_rerun gelesen:
+#   App      = vollständiger Lauf von run_app (Kosten eines Toggles ohne Fragment)
+#   Ansicht  = nur das Fragment der Ansicht (Kosten eines Toggles im Browser)
+#
+#   python tools/bench_reruns.py --scale 20 --views Labor Vitals
+
+APP = str(project_root / "app.py")
+
+
+def bench_view(view: str, toggles: int = 5) -> List[Dict]:
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(APP, default_timeout=600)
+    at.session_state["view_choice"] = view
+    at.run()
+    boxes = [c for c in at.checkbox if c.key and "_params__chk__" in c.key]
+    if not boxes:
+        return []
+    seen = len(at.session_state["rerun_timings"])
+    for i in range(toggles):
+        box = boxes[i % len(boxes)]
+        (box.uncheck() if box.value else box.check()).run()
+    rows = at.session_state["rerun_timings"][seen:]
+    return [{"view": view, "scope": r["scope"].split(":")[0], "ms": r["seconds"] * 1000} for r in rows]
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Rerun-Latenz: vollständiger Lauf vs. Ansicht-Fragment")
+    ap.add_argument("--scale", type=int, default=20)
+    ap.add_argument("--views", nargs="+", default=["Labor", "Vitals", "Respirator"])
+    ap.add_argument("--toggles", type=int, default=5)
+    args = ap.parse_args(argv)
+
+    text = scaled_export(args.scale)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "export.csv"
+        path.write_text(text, encoding="utf-8")
+        os.environ["SMOKE_TEST"] = "1"
+        os.environ["SMOKE_TEST_FILE"] = str(path)
+        rows = []
+        for view in args.views:
+            rows += bench_view(view, args.toggles)
+
+    df = pd.DataFrame(rows)
+    report = df.groupby(["view", "scope"])["ms"].median().unstack("scope")
+    report["Anteil Ansicht"] = report["Ansicht"] / report["App"]
+    print(f"Export: {len(text) / 1e6:.1f} MB, Median über {args.toggles} Toggles")
+    with pd.option_context("display.float_format", "{:.1f}".format):
+        print(report.to_string())
+
+
+if __name__ == "__main__":
+    main()
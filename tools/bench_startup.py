@@ -0,0 +1,146 @@
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# ensure project root is on sys.path
+project_root = Path(__file__).resolve().parents[1]
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+# Kaltstart der App: was vor der Upload-Maske importiert wird und wie lange es dauert.
+#
+#   importtime  `python -X importtime -c "import app_core"` in frischen Prozessen;
+#               kumulative Zeit von app_core und seine größten direkten Importe.
+#               Mit --preload zusätzlich app_core.PRELOAD_MODULES (der Anteil,
+#               der jetzt im Hintergrund-Thread geladen wird).
+#   prompt      frischer Prozess: import app_core + erster AppTest-Lauf ohne
+#               Upload, bis die Upload-Maske ("Bitte lade ...") gerendert ist.
+#   launcher    startet app_launcher.py (oder mit --exe das PyInstaller-EXE) und
+#               misst die Zeit bis /_stcore/health antwortet und bis der Log-Eintrag
+#               "Preloaded ... modules" erscheint.
+#
+#   python tools/bench_startup.py --repeat 5
+#   python tools/bench_startup.py --mode launcher --exe dist/clean_mlife_app/clean_mlife_app.exe
+#   python tools/bench_startup.py --root /tmp/baseline   # Vergleich mit einem anderen Checkout
+
+
+def _importtime(root: Path, code: str) -> List[Dict]:
+    """Einträge aus `-X importtime` (stderr) als Dicts mit depth/self_us/cumulative_us."""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=root, capture_output=True, text=True, check=True)
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append({"name": name.strip(), "depth": depth, "self_us": int(self_us), "cumulative_us": int(cumulative_us)})
+    return rows
+
+
+def bench_importtime(root: Path, repeat: int, preload: bool) -> None:
+    code = "import app_core"
+    if preload:
+        code += "; import importlib; [importlib.import_module(m) for m in app_core.PRELOAD_MODULES]"
+    totals, children = [], {}
+    for _ in range(repeat):
+        rows = _importtime(root, code)
+        top = [r for r in rows if r["depth"] == 0]
+        totals.append(sum(r["cumulative_us"] for r in top) / 1000)
+        for r in rows:
+            if r["depth"] == 1 or (r["depth"] == 0 and r["name"] != "app_core"):
+                children.setdefault(r["name"], []).append(r["cumulative_us"] / 1000)
+    print(f"importtime ({root.name}, {'app_core + PRELOAD_MODULES' if preload else 'app_core'}): median {statistics.median(totals):.0f} ms über {repeat} Prozesse")
+    ranked = sorted(((statistics.median(v), k) for k, v in children.items()), reverse=True)[:12]
+    for ms, name in ranked:
+        print(f"  {ms:8.1f} ms  {name}")
+
+
+def bench_prompt(root: Path, repeat: int) -> None:
+    code = (
+        "import time; t0 = time.perf_counter(); import app_core; t1 = time.perf_counter();"
+        "from streamlit.testing.v1 import AppTest; at = AppTest.from_file('app.py', default_timeout=120);"
+        "t2 = time.perf_counter(); at.run(); t3 = time.perf_counter();"
+        "assert any('Bitte lade' in i.value for i in at.info), 'Upload-Maske fehlt';"
+        "print(f'{(t1 - t0) * 1000:.1f} {(t3 - t2) * 1000:.1f}')"
+    )
+    env = {**os.environ, "SMOKE_TEST": "0", "LOG_LEVEL": "WARNING"}
+    imports, runs = [], []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True, check=True, env=env).stdout.split()
+        imports.append(float(out[-2]))
+        runs.append(float(out[-1]))
+    print(f"Upload-Maske ({root.name}): import app_core {statistics.median(imports):.0f} ms + erster Lauf {statistics.median(runs):.0f} ms (Median über {repeat})")
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def bench_launcher(root: Path, exe: Optional[str], timeout: float) -> None:
+    port = _free_port()
+    cmd = [exe] if exe else [sys.executable, str(root / "app_launcher.py")]
+    env = {**os.environ, "STREAMLIT_SERVER_PORT": str(port), "STREAMLIT_BROWSER_GATHER_USAGE_STATS": "false"}
+    preloaded = threading.Event()
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(cmd, cwd=root, env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    marks: Dict[str, float] = {}
+
+    def _read():
+        for line in proc.stdout:
+            if "Preloaded" in line and "modules" in line:
+                marks["preload"] = time.perf_counter() - t0
+                preloaded.set()
+
+    threading.Thread(target=_read, daemon=True).start()
+    try:
+        while time.perf_counter() - t0 < timeout and proc.poll() is None:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1) as resp:
+                    if resp.status == 200:
+                        marks["health"] = time.perf_counter() - t0
+                        break
+            except OSError:
+                time.sleep(0.05)
+        preloaded.wait(max(timeout - (time.perf_counter() - t0), 0))
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+    label = exe or "app_launcher.py"
+    health = f"{marks['health']:.2f} s" if "health" in marks else "—"
+    preload = f"{marks['preload']:.2f} s" if "preload" in marks else "—"
+    print(f"{label}: Server bereit nach {health}, Vorladen fertig nach {preload}")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Kaltstart der App messen")
+    ap.add_argument("--mode", nargs="+", default=["importtime", "prompt"], choices=["importtime", "prompt", "launcher"])
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--preload", action="store_true", help="importtime inkl. PRELOAD_MODULES")
+    ap.add_argument("--root", type=Path, default=project_root, help="Checkout, der gemessen wird")
+    ap.add_argument("--exe", help="PyInstaller-EXE statt app_launcher.py (Modus launcher)")
+    ap.add_argument("--timeout", type=float, default=120.0)
+    args = ap.parse_args(argv)
+    root = args.root.resolve()
+    if "importtime" in args.mode:
+        bench_importtime(root, args.repeat, args.preload)
+    if "prompt" in args.mode:
+        bench_prompt(root, args.repeat)
+    if "launcher" in args.mode:
+        bench_launcher(root, args.exe, args.timeout)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+# ensure project root is on sys.path
+project_root = Path(__file__).resolve().parents[1]
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from services.redcap_import_file import DataDictionary, compile_import_file, entries_from_payloads
+
+# Kompiliert gespeicherte Übersicht-Payloads (JSON-Dateien, ein Patient pro Datei)
+# offline zu einer REDCap-Importdatei.
+#
+#   python tools/compile_redcap_import.py --dictionary dd.csv --repeating tagesdaten \
+#       --out import.csv --errors fehler.csv payloads/*.json
+
+
+def _iter_payloads(paths):
+    for p in paths:
+        with open(p, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        # eine Datei darf einen Payload oder eine Liste von Payloads enthalten
+        if isinstance(data, list):
+            yield from data
+        else:
+            yield data
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Übersicht-Payloads offline zu einer REDCap-Importdatei kompilieren")
+    ap.add_argument("--dictionary", required=True, help="REDCap Data Dictionary (CSV)")
+    ap.add_argument("--repeating", action="append", default=[], help="Name eines wiederholenden Instruments (mehrfach möglich)")
+    ap.add_argument("--out", required=True, help="Zieldatei (.csv oder .json)")
+    ap.add_argument("--errors", help="optionale CSV mit ungültigen/nicht zugeordneten Einträgen")
+    ap.add_argument("--chunk", type=int, default=500, help="Patienten pro Verarbeitungsschritt")
+    ap.add_argument("payloads", nargs="+")
+    args = ap.parse_args(argv)
+
+    dd = DataDictionary.from_csv(args.dictionary, repeating_forms=args.repeating)
+    fmt = "json" if args.out.lower().endswith(".json") else "csv"
+    t0 = time.perf_counter()
+    with open(args.out, "w", encoding="utf-8", newline="") as out:
+        err = open(args.errors, "w", encoding="utf-8", newline="") if args.errors else None
+        try:
+            result = compile_import_file(entries_from_payloads(_iter_payloads(args.payloads), args.chunk), dd, out, fmt=fmt, errors_out=err)
+        finally:
+            if err is not None:
+                err.close()
+    print(
+        f"{result.patients} Patienten, {result.entries} Einträge -> {result.records} Records "
+        f"({result.invalid} ungültig, {result.unmapped} nicht zugeordnet) in {time.perf_counter() - t0:.2f}s",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
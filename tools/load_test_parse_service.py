@@ -0,0 +1,120 @@
+import argparse
+import http.client
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List
+
+# ensure project root is on sys.path
+project_root = Path(__file__).resolve().parents[1]
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+import pandas as pd
+
+from services.parse_service import ParseService, make_server
+from tools.synthetic_export import scaled_export
+
+# Lasttest des lokalen Parse-Dienstes (services/parse_service.py).
+#
+# Startet den Dienst im Prozess, erzeugt `distinct` verschiedene synthetische
+# Exporte und schickt `requests` Uploads mit `concurrency` parallelen Clients.
+# Jeder Export wird mehrfach hochgeladen, so dass Cache-Treffer und geteilte
+# Jobs mitgemessen werden. Ausgabe: Durchsatz, Latenz-Perzentile und die
+# Server-Timing-Anteile je Cache-Status.
+#
+#   python tools/load_test_parse_service.py --workers 1 2 4 --concurrency 8
+
+def _server_timing(header: str) -> Dict[str, float]:
+    out = {}
+    for part in (header or "").split(","):
+        name, _, dur = part.strip().partition(";dur=")
+        if dur:
+            out[name] = float(dur)
+    return out
+
+
+def _upload(port: int, body: bytes, datasets: str, fmt: str) -> Dict:
+    t0 = time.perf_counter()
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=600)
+    try:
+        conn.request("POST", f"/parse?datasets={datasets}&format={fmt}", body=body, headers={"Content-Type": "text/csv"})
+        resp = conn.getresponse()
+        payload = resp.read()
+        return {
+            "status": resp.status,
+            "cache": resp.getheader("X-Cache", ""),
+            "latency_ms": (time.perf_counter() - t0) * 1000,
+            "bytes_out": len(payload),
+            **{f"{k}_ms": v for k, v in _server_timing(resp.getheader("Server-Timing")).items()},
+        }
+    finally:
+        conn.close()
+
+
+def run_load(workers: int, exports: List[bytes], requests: int, concurrency: int, datasets: str, fmt: str, max_queue: int) -> pd.DataFrame:
+    service = ParseService(workers=workers, max_queue=max_queue)
+    service.warmup()
+    server = make_server(service)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    port = server.server_address[1]
+    try:
+        t0 = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            rows = list(pool.map(lambda i: _upload(port, exports[i % len(exports)], datasets, fmt), range(requests)))
+        wall = time.perf_counter() - t0
+    finally:
+        server.shutdown()
+        server.server_close()
+        service.shutdown()
+    df = pd.DataFrame(rows)
+    df["workers"] = workers
+    df.attrs["wall_s"] = wall
+    return df
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Lasttest des lokalen Parse-Dienstes")
+    ap.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    ap.add_argument("--concurrency", type=int, default=8)
+    ap.add_argument("--requests", type=int, default=32)
+    ap.add_argument("--distinct", type=int, default=8, help="Anzahl verschiedener Exporte")
+    ap.add_argument("--scale", type=int, default=2)
+    ap.add_argument("--max-queue", type=int, default=64)
+    ap.add_argument("--datasets", default="vitals,respirator,lab,ecmo,impella,rrt")
+    ap.add_argument("--format", default="json", choices=["json", "arrow"])
+    args = ap.parse_args(argv)
+    if args.format == "arrow":
+        args.datasets = args.datasets.split(",")[0]
+
+    exports = [scaled_export(args.scale, seed=seed).encode("utf-8") for seed in range(args.distinct)]
+    mb_in = sum(len(e) for e in exports) / len(exports) / 1e6
+    print(f"{args.distinct} Exporte à {mb_in:.2f} MB, {args.requests} Uploads, {args.concurrency} Clients")
+    summary = []
+    for workers in args.workers:
+        df = run_load(workers, exports, args.requests, args.concurrency, args.datasets, args.format, args.max_queue)
+        ok = df[df["status"] == 200]
+        summary.append({
+            "workers": workers,
+            "ok": len(ok),
+            "rejected": int((df["status"] == 503).sum()),
+            "req_s": len(ok) / df.attrs["wall_s"],
+            "mb_in_s": len(ok) * mb_in / df.attrs["wall_s"],
+            "p50_ms": statistics.median(ok["latency_ms"]),
+            "p95_ms": ok["latency_ms"].quantile(0.95),
+            "miss": int((ok["cache"] == "miss").sum()),
+            "shared": int((ok["cache"] == "shared").sum()),
+            "hit": int((ok["cache"] == "hit").sum()),
+            "queue_ms": ok.get("queue_ms", pd.Series(dtype=float)).mean(),
+            "parse_ms": ok.get("parse_ms", pd.Series(dtype=float)).mean(),
+        })
+    with pd.option_context("display.width", 200, "display.float_format", "{:.1f}".format):
+        print(pd.DataFrame(summary).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
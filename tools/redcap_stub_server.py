@@ -0,0 +1,108 @@
+import asyncio
+import json
+import sys
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs
+
+# Lokaler Stub der REDCap-API (nur Record-Import) für Tests und Benchmarks.
+# Spricht HTTP/1.1 mit Keep-Alive, prüft den Token und speichert importierte
+# Records im Speicher. Fehler und Latenz lassen sich gezielt injizieren.
+
+
+class RedcapStubServer:
+    def __init__(self, token: str = "STUBTOKEN", latency: float = 0.0, fail_first: int = 0, fail_status: int = 503):
+        self.token = token
+        self.latency = latency
+        self.fail_first = fail_first
+        self.fail_status = fail_status
+        self.records: List[Dict[str, str]] = []
+        self.requests = 0
+        self.connections = 0
+        self.max_inflight = 0
+        self._inflight = 0
+        self._server: Optional[asyncio.base_events.Server] = None
+        self.port: Optional[int] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}/api/"
+
+    async def start(self, port: int = 0) -> "RedcapStubServer":
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def __aenter__(self) -> "RedcapStubServer":
+        return await self.start()
+
+    async def __aexit__(self, *exc) -> None:
+        await self.stop()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", "0")))
+                status, payload = await self._respond(body)
+                data = json.dumps(payload).encode("utf-8")
+                writer.write(
+                    f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\n"
+                    "Content-Type: application/json\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    "Connection: keep-alive\r\n\r\n".encode("ascii") + data
+                )
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, body: bytes):
+        self.requests += 1
+        self._inflight += 1
+        self.max_inflight = max(self.max_inflight, self._inflight)
+        try:
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            if self.fail_first > 0:
+                self.fail_first -= 1
+                return self.fail_status, {"error": "stub: injected failure"}
+            form = {k: v[0] for k, v in parse_qs(body.decode("utf-8"), keep_blank_values=True).items()}
+            if form.get("token") != self.token:
+                return 403, {"error": "You do not have permissions to use the API"}
+            if form.get("content") != "record" or form.get("format") != "json":
+                return 400, {"error": "stub: only content=record&format=json is supported"}
+            try:
+                records = json.loads(form.get("data", "[]"))
+            except ValueError:
+                return 400, {"error": "stub: data is not valid JSON"}
+            self.records.extend(records)
+            return 200, {"count": len({r.get("record_id") for r in records})}
+        finally:
+            self._inflight -= 1
+
+
+async def _serve_forever(port: int) -> None:
+    server = await RedcapStubServer().start(port)
+    print(f"REDCap stub listening on {server.url} (token {server.token})", file=sys.stderr)
+    await asyncio.Event().wait()
+
+
+if __name__ == "__main__":
+    asyncio.run(_serve_forever(int(sys.argv[1]) if len(sys.argv) > 1 else 8765))
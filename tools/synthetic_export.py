@@ -0,0 +1,325 @@
+import argparse
+import random
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Iterator, List, Sequence, Tuple
+
+# Deterministischer Generator für synthetische mlife-Exporte ("Ausdruck: Gesamte Akte").
+#
+# Das Layout folgt dem, was die Parser in services/ erwarten: Block-Überschriften
+# als erstes Feld einer Zeile (services/headers.py), breite Zahlenblöcke mit
+# "dd.mm.yy HH:MM"-Kopfzeilen, der Block "ALLE Patientendaten" mit ";;Header"-Zeilen,
+# Zeitstempelzeilen und ";;;Parameter;Wert;Benutzer"-Datenzeilen, sowie die
+# Medikamententabelle mit mehrzeiligen, gequoteten Zellen. Seitenumbrüche erzeugen
+# wiederholte Seitenköpfe/-füße, die cleanCSV wieder entfernen muss.
+
+# (Name [Einheit], Mittelwert, Streuung, Nachkommastellen)
+ONLINE_VITALS = [
+    ("HF [bpm]", 88, 12, 0),
+    ("ARTs [mmHg]", 115, 15, 0),
+    ("ARTd [mmHg]", 58, 8, 0),
+    ("ARTm [mmHg]", 74, 9, 0),
+    ("SpO2 [%]", 96, 2, 0),
+    ("AF [/min]", 18, 4, 0),
+    ("ZVDm [mmHg]", 10, 3, 0),
+    ("Temp [°C]", 37.1, 0.6, 1),
+]
+MANUAL_VITALS = [
+    ("Herzfrequenz (bpm)", 88, 12, 0),
+    ("NIBP syst. (mmHg)", 118, 15, 0),
+    ("NIBP dia. (mmHg)", 60, 8, 0),
+    ("Temperatur in C", 37.0, 0.6, 1),
+]
+ONLINE_RESP = [
+    ("FiO2 [%]", 45, 10, 0),
+    ("PEEP [mbar]", 8, 2, 0),
+    ("Ppeak [mbar]", 24, 4, 0),
+    ("Atemfrequenz gesamt /Min.", 18, 4, 0),
+    ("exsp. Tidalvolumen [ml]", 450, 60, 0),
+]
+MANUAL_RESP = [
+    ("FiO2 [%]", 45, 10, 0),
+    ("PEEP [mbar]", 8, 2, 0),
+]
+LAB_PANELS = [
+    ("Labor: Blutgase arteriell", [("PO2 [mmHg]", 85, 20, 0), ("PCO2 [mmHg]", 42, 6, 0), ("PH", 7.38, 0.05, 2),
+                                   ("LACTAT(BG) [mmol/l]", 1.8, 0.9, 1), ("GLUCOSE(BG) [mg/dl]", 140, 30, 0),
+                                   ("KALIUM(BG) [mmol/l]", 4.2, 0.4, 1), ("HB(BG) [g/dl]", 9.5, 1.2, 1)]),
+    ("Labor: Blutbild", [("WBC [/nl]", 11, 4, 1), ("HB (HGB) [g/dl]", 9.4, 1.2, 1), ("PLT [/nl]", 160, 60, 0), ("HCT [%]", 29, 3, 0)]),
+    ("Labor: Retention", [("KREATININ [mg/dl]", 1.4, 0.6, 2), ("HARNSTOFF [mg/dl]", 60, 20, 0)]),
+    ("Labor: Enzyme", [("GOT [U/l]", 60, 30, 0), ("GPT [U/l]", 50, 25, 0), ("LDH [U/l]", 400, 150, 0), ("CK [U/l]", 300, 200, 0)]),
+    ("Labor: Klinische Chemie", [("BILI (TOT.) [mg/dl]", 1.3, 0.8, 1), ("CRP [mg/l]", 80, 50, 0), ("PROCALCITONIN [ng/ml]", 1.2, 1.0, 2)]),
+    ("Labor: Gerinnung", [("INR", 1.2, 0.2, 2), ("PTT [s]", 45, 10, 0), ("ATIII [%]", 75, 15, 0)]),
+    ("Labor: Elektrolyte", [("NATRIUM [mmol/l]", 140, 4, 0), ("KALIUM [mmol/l]", 4.2, 0.4, 1), ("MAGNESIUM [mmol/l]", 0.9, 0.15, 2)]),
+    ("Labor: Blutgase venös", [("PO2 [mmHg]", 40, 6, 0), ("PCO2 [mmHg]", 48, 6, 0), ("PH", 7.35, 0.05, 2)]),
+    ("Labor: Proteine", [("ALBUMIN [g/dl]", 3.0, 0.4, 1)]),
+    ("Labor: Blutzucker", [("GLUCOSE(POCT) [mg/dl]", 140, 30, 0)]),
+]
+ECMO_PARAMS = [("Blutfluss arteriell l/min", 3.8, 0.5, 1), ("Drehzahl (rpm)", 3200, 250, 0), ("Gasfluss l/min", 3.5, 1.0, 1),
+               ("FiO2 in %", 70, 15, 0), ("pVen (Sog) mmHg", -40, 10, 0), ("DeltaP", 25, 6, 0)]
+IMPELLA_PARAMS = [("HZV (l/min)", 3.1, 0.5, 1), ("Purgedruck in mmHg", 450, 60, 0), ("Purgefluß in ml/h", 9.5, 1.5, 1),
+                  ("Flußregelung", None, None, None)]
+RRT_PARAMS = [("Blut (ml/min)", 120, 10, 0), ("Dialysat (ml/h)", 2000, 200, 0), ("Substituat (ml/h)", 1000, 150, 0),
+              ("Patientenentzug (ml/h)", 100, 60, 0), ("Citratdosis mmol/l Blut", 4.0, 0.3, 1)]
+MEDICATIONS = [
+    ("Noradrenalin Perfusor 5mg/50ml", "5 mg 50 mL 1 Perfusorspritze", "Perfusor", 8.0),
+    ("Propofol-Lipuro 20mg/ml 50ml", "1000 mg 50 mL 1 Glasflasche", "Perfusor", 8.0),
+    ("Sufentanil Perfusor 0,5mg/50ml", "0,5 mg 50 mL 1 Perfusorspritze", "Perfusor", 4.0),
+    ("Vasopressin Perfusor 40 IE / 40 ml\nEmpressin 40 I.E./2ml\nIsotonische Kochsalzlösung 0,9% 50ml",
+     "40 I.E. 2 mL 1 Amp.\n5,852 mmol 38 mL 0,76 Glasflasche", "Perfusor", 1.5),
+    ("Heparin-Natrium 25.000 I.E./50ml", "25000 I.E. 50 mL 1 Perfusorspritze", "Perfusor", 2.0),
+    ("Pantoprazol 40mg", "40 mg 1 Amp.", "i.v.", None),
+    ("ASS STADA 100mg", "100 mg 1 Tabl.", "p.o.", None),
+]
+BILANZ_ITEMS = [("Infusionen [ml]", 120), ("Perfusoren [ml]", 25), ("Enteral [ml]", 40), ("Urin [ml]", -90),
+                ("Drainagen [ml]", -15), ("Magensonde [ml]", -10)]
+DEVICES = {
+    "Katheter": [("ZVK 4-lumig", "V. jugularis interna rechts"), ("Arterie", "A. radialis links"),
+                 ("Shaldon-Katheter", "V. femoralis rechts"), ("Blasenkatheter", "transurethral")],
+    "Drainagen": [("Thoraxdrainage", "Pleura links"), ("Mediastinaldrainage", "retrosternal")],
+    "Wunden": [("Kanüleneintrittsstelle ECMO", "Leiste rechts"), ("Dekubitus Grad 1", "Sakral")],
+}
+NOTE_SNIPPETS = [
+    "Patient hämodynamisch stabil, Katecholamine reduziert.",
+    "Kanülenwechsel durchgeführt, keine Komplikationen.",
+    "Blutung an der Einstichstelle, Kompression angelegt.",
+    "Sedierung pausiert, Patient erweckbar.",
+    "Verbandswechsel ZVK, Einstichstelle reizlos.",
+    "Lagerungswechsel, Haut intakt.",
+    "Rücksprache mit Kardiotechnik bzgl. Oxygenatorwechsel.",
+]
+
+
+def _fmt(value: float, decimals: int) -> str:
+    return f"{value:.{decimals}f}".replace(".", ",")
+
+
+class _Writer:
+    """Sammelt logische Zeilen und fügt Seitenumbrüche (Fuß + Kopf) zwischen ihnen ein."""
+
+    def __init__(self, page_lines: int, patient: str):
+        self.page_lines = page_lines
+        self.patient = patient
+        self.lines: List[str] = []
+        self.page = 1
+        self._on_page = 0
+        self._page_header()
+
+    def _page_header(self) -> None:
+        self.lines += [
+            f"Ausdruck: Gesamte Akte;;;;{self.patient}",
+            ";;Name: Mustermann, Max;;geb. 01.01.1960",
+            ";;Fallnummer: 12345678;;Station: ITS 1",
+            ";;Aufnahme: 14.09.2025;;",
+            ";;;;",
+            ";;Erstellt durch: SYSTEM;;",
+            ";;;;",
+            ";;;;",
+        ]
+
+    def add(self, record: str) -> None:
+        if self._on_page >= self.page_lines:
+            self.lines.append(f"Seite {self.page};;;;")
+            self.page += 1
+            self._page_header()
+            self._on_page = 0
+        self.lines.append(record)
+        self._on_page += 1 + record.count("\n")
+
+    def text(self) -> str:
+        return "\n".join(self.lines + [f"Seite {self.page};;;;Ende des Ausdrucks"]) + "\n"
+
+
+def _series(rng: random.Random, mean: float, sd: float, decimals: int, n: int) -> List[str]:
+    # Random Walk um den Mittelwert, damit Verläufe plausibel aussehen
+    out, x = [], mean
+    for _ in range(n):
+        x += rng.gauss(0, sd * 0.3) + (mean - x) * 0.1
+        out.append(_fmt(x, decimals))
+    return out
+
+
+def _wide_block(w: _Writer, rng: random.Random, name: str, params: Sequence[Tuple], times: Sequence[datetime],
+                missing: float = 0.0, page_cols: int = 12) -> None:
+    w.add(f"{name};;;;")
+    w.add("Intervall: 15 min.,;;;")
+    w.add(";;;;")
+    w.add("Datum/Uhrzeit bezieht sich jeweils auf den Intervallstart.;;;")
+    values = {p[0]: _series(rng, p[1], p[2], p[3], len(times)) for p in params}
+    for start in range(0, len(times), page_cols):
+        chunk = times[start:start + page_cols]
+        w.add(";;" + ";".join(t.strftime("%d.%m.%y %H:%M") for t in chunk))
+        for p in params:
+            vals = values[p[0]][start:start + page_cols]
+            vals = ["" if missing and rng.random() < missing else v for v in vals]
+            w.add(f";{p[0]};" + ";".join(vals))
+
+
+def _grid(start: datetime, days: float, step_min: int) -> List[datetime]:
+    n = int(days * 24 * 60 // step_min)
+    return [start + timedelta(minutes=step_min * i) for i in range(n)]
+
+
+def _therapy_sections(rng: random.Random, start: datetime, days: int, ecmo: bool, impella: bool, haemofilter: bool) -> Iterator[str]:
+    yield ";;Bei aktuell laufenden Statusmodulen wird der letzte Wert angezeigt.;;"
+    sections = []
+    if ecmo:
+        sections.append(("ECMO", "Cardiohelp HLS 7.0", ECMO_PARAMS, 0, max(1, int(days * 0.6))))
+    if impella:
+        sections.append(("Impella", "Impella CP", IMPELLA_PARAMS, min(1, days - 1), max(2, int(days * 0.8))))
+    if haemofilter:
+        sections.append(("Hämofilter", "multiFiltrate Ci-Ca", RRT_PARAMS, min(2, days - 1), days))
+    sections.append(("Lagerung", "", [("Position", None, None, None)], 0, days))
+    for day in range(days):
+        day_start = start + timedelta(days=day)
+        for header, device, params, first, last in sections:
+            if not (first <= day < last):
+                continue
+            yield f";;{header};{device};"
+            for hour in range(0, 24, 2):
+                t = day_start + timedelta(hours=hour)
+                yield f"{t.strftime('%d.%m.%Y %H:%M')};;;;"
+                for name, mean, sd, decimals in params:
+                    if mean is None:
+                        value = rng.choice(["Auto", "P6", "Rückenlage", "30° Oberkörper"])
+                    else:
+                        value = _fmt(rng.gauss(mean, sd), decimals)
+                    yield f";;;{name};{value};PFL{rng.randint(1, 20):02d}"
+
+
+def _medication_rows(rng: random.Random, start: datetime, days: int, rows: int) -> Iterator[str]:
+    yield ";;Medikamente;;;;Konzentration;;;;App.- form;;;;;;Start/Änderung;;;;;Stopp;;;Rate(mL/h);"
+    fmt = "%d.%m.%Y %H:%M"
+    for i in range(rows):
+        med, conc, app, base_rate = MEDICATIONS[i % len(MEDICATIONS)]
+        day = (i // len(MEDICATIONS)) % max(days, 1)
+        t = start + timedelta(days=day, minutes=rng.randint(0, 120))
+        cells = [""] * 26
+        cells[2] = f'"{med}"' if "\n" in med else med
+        cells[6] = f'"{conc}"' if "\n" in conc else conc
+        cells[10] = app
+        if base_rate is None:
+            cells[16] = t.strftime(fmt)
+        else:
+            starts, stops, rates = [], [], []
+            for _ in range(rng.randint(3, 8)):
+                dur = timedelta(minutes=rng.randint(30, 240))
+                starts.append(t.strftime(fmt))
+                stops.append((t + dur).strftime(fmt))
+                rates.append(f"{max(0.0, rng.gauss(base_rate, base_rate * 0.3)):.1f}")
+                t += dur
+            cells[16] = '"' + "\n".join(starts) + '"'
+            cells[21] = '"' + "\n".join(stops) + '"'
+            cells[24] = '"' + "\n".join(rates) + '"'
+        yield ";".join(cells)
+
+
+def _device_rows(rng: random.Random, start: datetime, days: int, devices: Sequence[Tuple[str, str]]) -> Iterator[str]:
+    yield ";Bezeichnung;;Lokalisation;;Anlage;;Entfernung;"
+    fmt = "%d.%m.%Y %H:%M"
+    for i, (name, site) in enumerate(devices):
+        t0 = start + timedelta(hours=rng.randint(0, 12) + 24 * (i % 2))
+        removed = t0 + timedelta(days=rng.randint(2, max(3, days)))
+        end = start + timedelta(days=days)
+        yield f";{name};;{site};;{t0.strftime(fmt)};;{removed.strftime(fmt) if removed < end else ''};"
+
+
+def _note_rows(rng: random.Random, start: datetime, days: int, authors: Sequence[str], per_day: int) -> Iterator[str]:
+    yield ";Datum/Zeit;;Verfasser;;Notiz"
+    for day in range(days):
+        for k in range(per_day):
+            t = start + timedelta(days=day, hours=k * 24 // max(per_day, 1), minutes=rng.randint(0, 59))
+            text = "\n".join(rng.sample(NOTE_SNIPPETS, 2))
+            yield f';{t.strftime("%d.%m.%Y %H:%M")};;{rng.choice(authors)};;"{text}"'
+
+
+def generate_export(
+    stay_days: int = 7,
+    interval_min: int = 15,
+    lab_panels: int = 8,
+    ecmo: bool = True,
+    impella: bool = True,
+    haemofilter: bool = True,
+    medication_rows: int = 20,
+    seed: int = 42,
+    page_lines: int = 80,
+    start: datetime = datetime(2025, 9, 14, 0, 0),
+) -> str:
+    """Erzeuge einen synthetischen "Gesamte Akte"-Export als String (deterministisch über `seed`)."""
+    rng = random.Random(seed)
+    w = _Writer(page_lines, patient=f"SYNTH-{seed}")
+
+    online = _grid(start, stay_days, interval_min)
+    hourly = _grid(start, stay_days, 60)
+    _wide_block(w, rng, "Online erfasste Vitaldaten", ONLINE_VITALS, online)
+    _wide_block(w, rng, "Manuell erfasste Vitaldaten", MANUAL_VITALS, hourly, missing=0.3)
+    _wide_block(w, rng, "Online erfasste Respiratorwerte", ONLINE_RESP, online)
+    _wide_block(w, rng, "Manuell erfasste Respiratorwerte", MANUAL_RESP, _grid(start, stay_days, 240), missing=0.2)
+
+    lab_times = _grid(start + timedelta(hours=5), stay_days, 360)
+    for name, params in LAB_PANELS[:lab_panels]:
+        _wide_block(w, rng, name, [(p, m, s / 2, d) for p, m, s, d in params], lab_times, missing=0.25)
+
+    w.add("Bilanz;;;;")
+    for start_col in range(0, len(hourly), 12):
+        chunk = hourly[start_col:start_col + 12]
+        w.add(";;" + ";".join(t.strftime("%d.%m.%y %H:%M") for t in chunk))
+        for name, mean in BILANZ_ITEMS:
+            vals = [str(max(0, round(rng.gauss(abs(mean), abs(mean) * 0.4)))) if rng.random() > 0.2 else "" for _ in chunk]
+            w.add(f";{name};" + ";".join(vals))
+
+    for block, devices in DEVICES.items():
+        w.add(f"{block};;;;")
+        for row in _device_rows(rng, start, stay_days, devices):
+            w.add(row)
+
+    w.add("Arztnotizen;;;;")
+    for row in _note_rows(rng, start, stay_days, ["Dr. Weber", "Dr. Schulz"], per_day=2):
+        w.add(row)
+    w.add("Pflegenotizen;;;;")
+    for row in _note_rows(rng, start, stay_days, ["PFL03", "PFL11", "PFL17"], per_day=3):
+        w.add(row)
+
+    w.add("Medikamentengaben;;;;")
+    for row in _medication_rows(rng, start, stay_days, medication_rows):
+        w.add(row)
+
+    w.add("ALLE Patientendaten;;;;")
+    for row in _therapy_sections(rng, start, stay_days, ecmo, impella, haemofilter):
+        w.add(row)
+
+    return w.text()
+
+
+def scaled_export(scale: int = 1, seed: int = 42, **kwargs) -> str:
+    """Export in `scale`-facher Größe: Liegedauer und Medikationszeilen wachsen linear."""
+    base_days = kwargs.pop("stay_days", 7)
+    base_meds = kwargs.pop("medication_rows", 20)
+    return generate_export(stay_days=base_days * scale, medication_rows=base_meds * scale, seed=seed, **kwargs)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Synthetischen mlife-Export (Gesamte Akte) erzeugen")
+    ap.add_argument("out", help="Zieldatei, z.B. data/gesamte_akte.csv")
+    ap.add_argument("--days", type=int, default=7)
+    ap.add_argument("--interval", type=int, default=15, help="Abtastintervall Online-Daten in Minuten")
+    ap.add_argument("--lab-panels", type=int, default=8)
+    ap.add_argument("--medication-rows", type=int, default=20)
+    ap.add_argument("--no-ecmo", action="store_true")
+    ap.add_argument("--no-impella", action="store_true")
+    ap.add_argument("--no-haemofilter", action="store_true")
+    ap.add_argument("--seed", type=int, default=42)
+    args = ap.parse_args(argv)
+    text = generate_export(
+        stay_days=args.days, interval_min=args.interval, lab_panels=args.lab_panels,
+        ecmo=not args.no_ecmo, impella=not args.no_impella, haemofilter=not args.no_haemofilter,
+        medication_rows=args.medication_rows, seed=args.seed,
+    )
+    Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+    Path(args.out).write_text(text, encoding="utf-8")
+    print(f"{args.out}: {len(text) / 1e6:.1f} MB", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
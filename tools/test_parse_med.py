@@ -9,7 +9,7 @@ if str(project_root) not in sys.path:
 from services.parseMedications import parseMedications
 
 s = open('med_examp.txt','r',encoding='utf-8').read()
-split_blocks = {'Medikamentengaben': {'Medikamentengaben': s}}
+split_blocks = {'Medikamentengaben': s}
 
 df = parseMedications(split_blocks)
 print('ROWS', len(df))
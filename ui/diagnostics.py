@@ -0,0 +1,48 @@
+import pandas as pd
+import streamlit as st
+from typing import List, Optional
+
+from services.instrumentation import PipelineRun
+from services.result_cache import get_result_cache
+
+
+def render_diagnostics(run: Optional[PipelineRun], rerun_timings: Optional[List[dict]] = None) -> None:
+    """Render the stage breakdown of the last parse run in a sidebar expander.
+
+    Shows wall time, share of the total, input/output sizes, row counts and the
+    tracemalloc peak per stage, sorted by time so the slowest stage is on top.
+    Nested stages name their parent; the total only counts top-level stages.
+    `rerun_timings` (app_core._record_rerun) compares full script runs with
+    view-fragment reruns.
+    """
+    if rerun_timings:
+        _render_rerun_timings(rerun_timings)
+    with st.sidebar.expander("Diagnose — Parsing-Stufen", expanded=False):
+        if run is None or not run.stages:
+            st.info("Noch kein Parse-Durchlauf aufgezeichnet.")
+            return
+        df = run.to_frame().sort_values("seconds", ascending=False)
+        df["input_kb"] = (df["input_bytes"] / 1024).round(1)
+        df["output_kb"] = (df["output_bytes"] / 1024).round(1)
+        df["share"] = (df["share"] * 100).round(1)
+        st.caption(f"{run.label}: {run.total_seconds:.2f}s gesamt über {len(df)} Stufen (Stufen mit parent sind in deren Zeit enthalten)")
+        st.dataframe(
+            df[["stage", "parent", "seconds", "share", "rows", "input_kb", "output_kb", "peak_mb"]],
+            hide_index=True,
+            column_config={
+                "seconds": st.column_config.NumberColumn("s", format="%.3f"),
+                "share": st.column_config.NumberColumn("%", format="%.1f"),
+                "peak_mb": st.column_config.NumberColumn("Peak MB", format="%.1f"),
+            },
+        )
+
+
+def _render_rerun_timings(rerun_timings: List[dict]) -> None:
+    with st.sidebar.expander("Diagnose — Rerun-Latenz", expanded=False):
+        df = pd.DataFrame(rerun_timings)
+        df["ms"] = (df["seconds"] * 1000).round(1)
+        summary = df.groupby("scope")["ms"].agg(["count", "median", "max"]).reset_index()
+        st.dataframe(summary, hide_index=True)
+        st.caption("App = vollständiger Lauf von run_app, Ansicht = nur das Fragment der gewählten Ansicht.")
+        cache = get_result_cache()
+        st.caption(f"Ergebnis-Cache der Ansichten: {len(cache)} Einträge, {cache.nbytes / 1e6:.1f} von {cache.max_bytes / 1e6:.0f} MB, {cache.hits} Treffer / {cache.misses} berechnet")
@@ -0,0 +1,44 @@
+import tempfile
+from typing import Optional
+
+import pandas as pd
+import streamlit as st
+
+from services.export import EXPORT_FORMATS, available_formats
+
+
+def render_download(df: Optional[pd.DataFrame], key_prefix: str, file_stem: str) -> None:
+    """Offer the given (filtered/aggregated) table as CSV, XLSX or Parquet download.
+
+    The file is only written when "Export erzeugen" is clicked, chunk by chunk
+    into a temporary file (services/export.py), so large results are never
+    converted to one big string. Formats whose optional dependency is missing
+    (openpyxl, pyarrow) are not offered.
+    """
+    if df is None or df.empty:
+        return
+    file_stem = "".join(c if c.isalnum() or c in "-_" else "_" for c in file_stem).strip("_") or "export"
+    formats = available_formats()
+    cols = st.columns([2, 2, 3])
+    fmt_name = cols[0].selectbox("Exportformat", formats, key=f"{key_prefix}_export_format", label_visibility="collapsed")
+    if not cols[1].button(f"Export erzeugen ({len(df)} Zeilen)", key=f"{key_prefix}_export_build"):
+        return
+    fmt = EXPORT_FORMATS[fmt_name]
+    with tempfile.TemporaryFile() as fh:
+        try:
+            with st.spinner(f"{fmt.label}-Export wird geschrieben …"):
+                size = fmt.writer(df, fh)
+        except ValueError as e:
+            st.error(str(e))
+            return
+        # Streamlit keeps the file contents in its media store; only the encoded file is held
+        fh.seek(0)
+        data = fh.read()
+    cols[2].download_button(
+        f"{file_stem}.{fmt.extension} herunterladen ({size / 1e6:.1f} MB)",
+        data=data,
+        file_name=f"{file_stem}.{fmt.extension}",
+        mime=fmt.mime,
+        key=f"{key_prefix}_export_download",
+        on_click="ignore",
+    )
@@ -0,0 +1,42 @@
+import streamlit as st
+import pandas as pd
+
+from services.datasets import ParseProgress, PatientDatasets
+
+# How often the progress bar is refreshed while waiting for the background worker
+POLL_SECONDS = 0.2
+
+
+def _progress_text(progress: ParseProgress, what: str) -> str:
+    return (
+        f"{what} — {progress.done_bytes / 1e6:.1f} / {progress.total_bytes / 1e6:.1f} MB verarbeitet"
+        + (f" (aktuell: {progress.current})" if progress.current else "")
+    )
+
+
+def wait_for_blocks(datasets: PatientDatasets) -> None:
+    """Show a progress bar until cleanCSV/splitBlocks of the upload are done."""
+    if datasets.blocks_ready():
+        return
+    placeholder = st.empty()
+    while not datasets.wait_blocks(POLL_SECONDS):
+        progress = datasets.progress()
+        placeholder.progress(progress.fraction, text=_progress_text(progress, "Export wird aufgeteilt"))
+    placeholder.empty()
+
+
+def wait_for_dataset(datasets: PatientDatasets, name: str, label: str = "") -> pd.DataFrame:
+    """Return dataset `name`, showing byte progress while the background worker parses it.
+
+    The dataset is moved to the front of the worker queue, so only the view the
+    user is looking at is waited for. If no worker will deliver it, it is parsed
+    on the script thread.
+    """
+    handle = datasets.handle(name)
+    if not handle.is_loaded and datasets.prioritize(name):
+        placeholder = st.empty()
+        while not handle.wait(POLL_SECONDS):
+            progress = datasets.progress()
+            placeholder.progress(progress.fraction, text=_progress_text(progress, f"{label or name} wird geladen"))
+        placeholder.empty()
+    return datasets.get(name)
@@ -3,13 +3,19 @@ import pandas as pd
 from typing import Optional, Tuple
 
 
-def render_sidebar_navigation(dfs: list) -> Tuple[Optional[pd.Timestamp], Optional[pd.Timestamp], str]:
+def render_sidebar_navigation(dfs: Optional[list] = None, time_bounds: Optional[Tuple] = None) -> Tuple[Optional[pd.Timestamp], Optional[pd.Timestamp], str]:
     """Render a compact sidebar containing only the global date range picker and a view selector.
 
+    The date range comes either from the parsed `dfs` or from precomputed
+    `time_bounds` (min, max), e.g. `PatientDatasets.time_bounds()`, which avoids
+    parsing datasets the current view does not need.
+
     Returns (start_dt, end_dt, view_choice)
     """
     all_ts = []
-    for df in dfs:
+    if time_bounds is not None:
+        all_ts = [t for t in time_bounds if t is not None and not pd.isna(t)]
+    for df in dfs or []:
         if df is not None and 'timestamp_parsed' in df.columns and df['timestamp_parsed'].notna().any():
             all_ts.append(df['timestamp_parsed'].min())
             all_ts.append(df['timestamp_parsed'].max())
@@ -38,7 +44,7 @@ def render_sidebar_navigation(dfs: list) -> Tuple[Optional[pd.Timestamp], Option
 
     # View navigation: render as vertical buttons (persist selection in session_state)
     st.sidebar.markdown("### Ansicht")
-    options = ["Vitals", "Respirator", "Labor", "MCS - ECMO", "MCS - Impella", "RRT", "Übersicht"]
+    options = ["Vitals", "Respirator", "Labor", "Abgeleitet", "Scores", "MCS - ECMO", "MCS - Impella", "RRT", "Bilanz", "Notizen", "Katheter/Drainagen", "Übersicht"]
 
     # initialize session_state value if not present
     if "view_choice" not in st.session_state:
@@ -3,6 +3,10 @@ from .respirator import render_respirator
 from .lab import render_lab
 from .mcs import render_mcs, render_mcs_ecmo, render_mcs_impella
 from .rrt import render_rrt
+from .balance import render_balance
+from .notes import render_notes
+from .devices import render_devices
+from .scores import render_scores
 
 __all__ = [
     "render_vitals",
@@ -12,4 +16,8 @@ __all__ = [
     "render_mcs_ecmo",
     "render_mcs_impella",
     "render_rrt",
+    "render_balance",
+    "render_notes",
+    "render_devices",
+    "render_scores",
 ]
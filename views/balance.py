@@ -0,0 +1,64 @@
+from typing import Optional
+
+import pandas as pd
+import streamlit as st
+
+from services.fluid_balance import INTAKE, OUTPUT, balance_table, daily_balance_long
+
+try:
+    from ui.selection_panel import _render_checkbox_grid
+except Exception:
+    def _render_checkbox_grid(container, options, list_key: str, ncols: int = 2, format_func=None):
+        val = container.multiselect("Parameter", options=options, key=list_key)
+        st.session_state[list_key] = val
+        return val
+
+RESOLUTIONS = {"Tag": "D", "Stunde": "h", "Intervall": None}
+
+
+def render_balance(entries: Optional[pd.DataFrame], key_prefix: str = "fluid_balance", start_dt=None, end_dt=None):
+    """Fluid balance view: intake/output per interval, hour or day with running cumulative balance.
+
+    Cumulative balances are computed over the whole stay and only then limited
+    to the global date range, so the running total stays correct. The daily
+    parameters selected here are picked up by the Übersicht page.
+    """
+    st.header("Bilanz")
+
+    if entries is None or entries.empty:
+        st.info("Keine Bilanzdaten vorhanden")
+        return None
+
+    cols = st.columns([2, 2])
+    with cols[0]:
+        resolution = st.radio("Auflösung", list(RESOLUTIONS), horizontal=True, key=f"{key_prefix}_resolution")
+    with cols[1]:
+        has_rrt = bool((entries["source"] == "Hämofilter").any())
+        include_rrt = st.checkbox("Hämofilter-Entzug einrechnen", value=True, key=f"{key_prefix}_rrt", disabled=not has_rrt)
+    if not include_rrt:
+        entries = entries[entries["source"] != "Hämofilter"]
+
+    table = balance_table(entries, freq=RESOLUTIONS[resolution])
+    if start_dt is not None and end_dt is not None:
+        table = table[(table["period"] >= start_dt) & (table["period"] <= end_dt)]
+    if table.empty:
+        st.info("Keine Bilanzdaten im gewählten Zeitraum")
+        return table
+
+    last = table.iloc[-1]
+    m1, m2, m3 = st.columns(3)
+    m1.metric(f"{INTAKE} (Zeitraum)", f"{table[INTAKE].sum():,.0f} ml")
+    m2.metric(f"{OUTPUT} (Zeitraum)", f"{table[OUTPUT].sum():,.0f} ml")
+    m3.metric("Bilanz kumulativ", f"{last['Bilanz kumulativ']:,.0f} ml")
+
+    st.line_chart(table.set_index("period")[["Bilanz kumulativ"]])
+    display_df = table.rename(columns={"period": "Zeit"})
+    if resolution == "Tag":
+        display_df["Zeit"] = display_df["Zeit"].dt.date
+    st.dataframe(display_df.round(1), hide_index=True, width="stretch")
+
+    # daily parameters for the REDCap overview (same selection keys as the numeric views)
+    daily = daily_balance_long(entries)
+    with st.expander("Parameter für die Übersicht", expanded=False):
+        _render_checkbox_grid(st, sorted(daily["parameter"].unique().tolist()), f"{key_prefix}_params", ncols=3)
+    return table
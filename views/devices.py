@@ -0,0 +1,100 @@
+import datetime
+from typing import Callable, Optional
+
+import pandas as pd
+import streamlit as st
+
+from services.device_intervals import DeviceIntervalIndex, interval_label
+
+try:
+    from ui.selection_panel import _render_checkbox_grid
+except Exception:
+    def _render_checkbox_grid(container, options, list_key: str, ncols: int = 2, format_func=None):
+        val = container.multiselect("Parameter", options=options, key=list_key)
+        st.session_state[list_key] = val
+        return val
+
+QUERY_MODES = ["Zeitraum", "Zeitpunkt", "Therapie-Lauf"]
+
+
+def _display(intervals: pd.DataFrame, now=None) -> pd.DataFrame:
+    end = intervals["removal_time"].fillna(pd.Timestamp(now) if now is not None else intervals["insert_time"].max())
+    days = ((end - intervals["insert_time"]).dt.total_seconds() / 86400).clip(lower=0)
+    return pd.DataFrame({
+        "Art": intervals["kind"],
+        "Bezeichnung": intervals["device"],
+        "Lokalisation": intervals["site"],
+        "Anlage": intervals["insert_time"],
+        "Entfernung": intervals["removal_time"],
+        "Liegedauer (d)": days.round(1),
+    })
+
+
+def render_devices(
+    index: Optional[DeviceIntervalIndex],
+    key_prefix: str = "devices",
+    start_dt=None,
+    end_dt=None,
+    runs_loader: Optional[Callable[[], pd.DataFrame]] = None,
+):
+    """Catheters, drains and wounds as dwell intervals backed by the interval index.
+
+    Queries: everything in place during the global date range, at a single
+    point in time, or during a therapy run (e.g. an ECMO run). Therapy runs are
+    only loaded when that query is selected. Daily presence can be selected
+    for the Übersicht page.
+    """
+    st.header("Katheter/Drainagen")
+
+    if index is None or len(index) == 0:
+        st.info("Keine Katheter, Drainagen oder Wunden vorhanden")
+        return None
+
+    intervals = index.intervals
+    kinds = intervals["kind"].dropna().unique().tolist()
+    selected_kinds = st.multiselect("Art", options=kinds, default=kinds, key=f"{key_prefix}_kinds")
+    mode = st.radio("Abfrage", QUERY_MODES, horizontal=True, key=f"{key_prefix}_mode")
+
+    caption = ""
+    if mode == "Zeitpunkt":
+        default = pd.Timestamp(end_dt) if end_dt is not None else intervals["insert_time"].max()
+        c1, c2 = st.columns(2)
+        day = c1.date_input("Datum", value=default.date(), key=f"{key_prefix}_at_date")
+        clock = c2.time_input("Uhrzeit", value=datetime.time(8, 0), key=f"{key_prefix}_at_time")
+        t = pd.Timestamp.combine(day, clock)
+        result = index.at(t)
+        caption = f"Am {t:%d.%m.%Y %H:%M} liegend"
+    elif mode == "Therapie-Lauf":
+        runs = runs_loader() if runs_loader is not None else pd.DataFrame()
+        if runs is None or runs.empty:
+            st.info("Keine Therapie-Läufe (ECMO/Impella/RRT) vorhanden")
+            return None
+        labels = [f"{r.therapy}: {r.device} ({r.start:%d.%m. %H:%M} – {r.end:%d.%m. %H:%M})" for r in runs.itertuples()]
+        choice = st.selectbox("Lauf", options=range(len(runs)), format_func=lambda i: labels[i], key=f"{key_prefix}_run")
+        run = runs.iloc[choice]
+        # end is inclusive: a run ends with its last measurement
+        result = index.overlapping(run["start"], run["end"] + pd.Timedelta(microseconds=1))
+        caption = f"Während {labels[choice]} liegend"
+    elif start_dt is not None and end_dt is not None:
+        result = index.overlapping(start_dt, pd.Timestamp(end_dt) + pd.Timedelta(microseconds=1))
+        caption = "Im gewählten Zeitraum liegend"
+    else:
+        result = intervals
+        caption = "Alle"
+
+    result = result[result["kind"].isin(selected_kinds)]
+    st.caption(f"{caption}: {len(result)} von {len(intervals)}")
+    st.dataframe(_display(result, now=end_dt), hide_index=True, width="stretch")
+
+    # number of devices in place per hour (vectorized via the interval index)
+    if start_dt is not None and end_dt is not None and start_dt < end_dt:
+        grid = pd.date_range(pd.Timestamp(start_dt).floor("h"), pd.Timestamp(end_dt), freq="h")
+        counts = index.counts_by(grid, column="kind")[selected_kinds]
+        if len(grid) and selected_kinds:
+            st.line_chart(counts)
+
+    # daily presence for the REDCap overview (same selection keys as the numeric views)
+    with st.expander("Parameter für die Übersicht", expanded=False):
+        options = sorted(interval_label(intervals).unique().tolist())
+        _render_checkbox_grid(st, options, f"{key_prefix}_params", ncols=2)
+    return result
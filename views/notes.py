@@ -0,0 +1,40 @@
+from typing import Optional
+
+import streamlit as st
+
+from services.note_index import NoteIndex
+
+
+def render_notes(index: Optional[NoteIndex], key_prefix: str = "notes", start_dt=None, end_dt=None):
+    """Search view over Arzt-/Pflegenotizen backed by the inverted note index.
+
+    Words, "quoted phrases" and `*` wildcards can be combined; all parts must
+    match. An empty query lists all notes in the global date range.
+    """
+    st.header("Notizen")
+
+    if index is None or len(index) == 0:
+        st.info("Keine Notizen (Arzt-/Pflegenotizen) vorhanden")
+        return None
+
+    query = st.text_input(
+        "Suche in Notizen",
+        key=f"{key_prefix}_query",
+        placeholder='z.B. Blutung, "Kompression angelegt", kanül*',
+        help='Alle Begriffe müssen vorkommen. "…" sucht eine Phrase, * ist ein Platzhalter (auch für Wortteile wie *wechsel).',
+    )
+    types = sorted(index.notes["type"].dropna().unique().tolist())
+    selected_types = st.multiselect("Art", options=types, default=types, key=f"{key_prefix}_types")
+
+    result = index.search(query, start_dt=start_dt, end_dt=end_dt)
+    if selected_types != types:
+        result = result[result["type"].isin(selected_types)]
+    st.caption(f"{len(result)} von {len(index)} Notizen — Suche in {result.attrs.get('elapsed_ms', 0):.1f} ms")
+
+    display_df = result[["timestamp_parsed", "type", "author", "text"]].rename(
+        columns={"timestamp_parsed": "Zeit", "type": "Art", "author": "Verfasser", "text": "Notiz"}
+    )
+    if query and "hits" in result.columns:
+        display_df.insert(1, "Treffer", result["hits"].to_numpy())
+    st.dataframe(display_df, hide_index=True, width="stretch")
+    return result
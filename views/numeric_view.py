@@ -1,6 +1,12 @@
 import pandas as pd
 import streamlit as st
 from typing import Optional
+from services.plausibility import flag_values, implausible_rows
+from services.datasets import read_only_view
+from services.result_cache import DatasetKey, cached_result
+from services.source_merge import merge_report
+from services.units import converted_rows, mixed_units, normalize_units
+from ui.export import render_download
 # Try to import the checkbox grid helper from the ui module; if not available,
 # provide a small local fallback to avoid circular import issues during runtime.
 try:
@@ -32,7 +38,92 @@ except Exception:
         return selected
 
 
-def render_numeric_view(df: Optional[pd.DataFrame], label: str, key_prefix: str, start_dt=None, end_dt=None):
+def daily_means(filtered: pd.DataFrame, normalize: bool = True, exclude_implausible: bool = True) -> pd.DataFrame:
+    """Daily mean per (date, parameter, unit) of a numerics long-format frame.
+
+    Expects 'timestamp_parsed' and 'parameter'; the value column is the first of
+    'value', 'Wert', 'value_numeric' that exists. With `normalize` (default),
+    frames that were not converted at parse time yet (no 'unit_raw') go through
+    services.units.normalize_units first, so one analyte reported in mg/dl and
+    µmol/l ends up in a single daily mean instead of two unit groups.
+
+    Values flagged 'implausible' (services.plausibility.flag_values, applied at
+    parse time or here if the frame has no 'flag' column) are left out of the
+    mean with `exclude_implausible`; 'count_implausible' reports them either way.
+    """
+    if normalize and 'unit_raw' not in filtered.columns:
+        filtered = normalize_units(filtered)
+    if 'flag' not in filtered.columns:
+        filtered = flag_values(filtered)
+    agg = filtered.copy()
+    agg['date'] = agg['timestamp_parsed'].dt.date
+    # select first available numeric-like column safely
+    candidate_cols = ['value', 'Wert', 'value_numeric']
+    col_to_use = None
+    for c in candidate_cols:
+        if c in agg.columns:
+            col_to_use = c
+            break
+    if col_to_use is not None:
+        val_series = pd.to_numeric(agg[col_to_use], errors='coerce')
+    else:
+        # fallback: empty numeric series with same index
+        val_series = pd.Series([pd.NA] * len(agg), index=agg.index, dtype='float')
+    agg['implausible'] = implausible_rows(agg)
+    if exclude_implausible:
+        # keep the rows (count_total) but drop their values from mean/count_numeric
+        val_series = val_series.mask(agg['implausible'])
+    agg['value_numeric'] = val_series
+    if 'unit' not in agg.columns:
+        agg['unit'] = None
+    grouped = (
+        agg.groupby(['date', 'parameter', 'unit'], dropna=False)
+        .agg(
+        value_mean=('value_numeric', 'mean'),
+        count_numeric=('value_numeric', 'count'),
+        count_total=('value_numeric', 'size'),
+        count_implausible=('implausible', 'sum'),
+        )
+        .reset_index()
+    )
+    # Sort columns: value_mean first, then unit
+    cols = ['date', 'parameter', 'value_mean', 'unit', 'count_numeric', 'count_total', 'count_implausible']
+    return grouped[cols]
+
+
+def filter_numeric(df: pd.DataFrame, params_selected, start_dt=None, end_dt=None) -> pd.DataFrame:
+    """Rows of the selected parameters (all if none selected) inside [start_dt, end_dt]."""
+    filtered = df
+    if params_selected:
+        filtered = filtered[filtered['parameter'].isin(params_selected)]
+    if start_dt is not None and end_dt is not None and 'timestamp_parsed' in filtered.columns:
+        filtered = filtered[(filtered['timestamp_parsed'] >= start_dt) & (filtered['timestamp_parsed'] <= end_dt)]
+    # nothing filtered: a shallow copy shares the (read-only) dataset arrays
+    return read_only_view(df) if filtered is df else filtered
+
+
+def numeric_results(df: pd.DataFrame, params_selected, start_dt=None, end_dt=None, avg_daily: bool = False,
+                    exclude_implausible: bool = True, dataset_key: Optional[DatasetKey] = None) -> pd.DataFrame:
+    """Filtered rows, or their daily means with `avg_daily`, as the numeric views show them.
+
+    With `dataset_key` both steps go through services.result_cache, so a view
+    state seen before (and the same state in the overview) is not recomputed.
+    """
+    state = dict(params=params_selected, start_dt=start_dt, end_dt=end_dt)
+    if params_selected or (start_dt is not None and end_dt is not None):
+        filtered = cached_result(dataset_key, "numeric", lambda: filter_numeric(df, params_selected, start_dt, end_dt), **state)
+    else:
+        filtered = filter_numeric(df, params_selected)
+    if not avg_daily or 'timestamp_parsed' not in filtered.columns:
+        return filtered
+    return cached_result(
+        dataset_key, "numeric", lambda: daily_means(filtered, exclude_implausible=exclude_implausible),
+        mode="daily", exclude_implausible=bool(exclude_implausible), **state,
+    )
+
+
+def render_numeric_view(df: Optional[pd.DataFrame], label: str, key_prefix: str, start_dt=None, end_dt=None, matrix_loader=None,
+                        dataset_key: Optional[DatasetKey] = None):
     """
     Generic renderer for numeric/parameter time-series views (Vitals, Respirator, Labor).
 
@@ -45,6 +136,13 @@ def render_numeric_view(df: Optional[pd.DataFrame], label: str, key_prefix: str,
     This function intentionally mirrors the behaviour of the previous
     specialized views (filter multiselect persisted in session_state, optional
     daily averaging) so migration is non-breaking.
+
+    `matrix_loader` returns the cached parameter × time matrix of the dataset
+    (services/param_matrix.py); it is only called when the trend chart of the
+    selected parameters is switched on.
+
+    `dataset_key` (content hash, dataset name) enables the shared result cache
+    (services/result_cache.py) for the filtered and aggregated frames.
     """
     st.header(f"{label}")
     filter_expander = st.expander(f"Filter — {label}", expanded=False)
@@ -53,6 +151,12 @@ def render_numeric_view(df: Optional[pd.DataFrame], label: str, key_prefix: str,
         st.info(f"Keine Daten für {label} vorhanden")
         return None
 
+    merged = merge_report(df)
+    if not merged.empty:
+        # services.source_merge dropped values already covered by a higher-priority source
+        by_panel = merged.groupby('panel', sort=False)['removed'].sum()
+        st.caption("Doppelte Werte entfernt: " + ", ".join(f"{int(n)} aus {panel}" for panel, n in by_panel.items()))
+
     def _safe_write(df_to_show: pd.DataFrame):
         d = df_to_show.copy()
         for c in ('value', 'Wert'):
@@ -78,52 +182,42 @@ def render_numeric_view(df: Optional[pd.DataFrame], label: str, key_prefix: str,
         st.session_state.setdefault(params_key, [])
         params_selected = _render_checkbox_grid(st, params, params_key, ncols=3)
 
-    filtered = df.copy()
-    if params_selected:
-        filtered = filtered[filtered['parameter'].isin(params_selected)]
-    else:
-        st.sidebar.warning("Keine Parameter ausgewählt — Anzeige leer", icon="⚠️")
+    if not params_selected:
+        # views render inside a fragment (app_core._render_view), which cannot write to the sidebar
+        st.warning("Keine Parameter ausgewählt — Anzeige leer", icon="⚠️")
+    filtered = numeric_results(df, params_selected, start_dt, end_dt, dataset_key=dataset_key)
 
-    if start_dt is not None and end_dt is not None and 'timestamp_parsed' in filtered.columns:
-        filtered = filtered[(filtered['timestamp_parsed'] >= start_dt) & (filtered['timestamp_parsed'] <= end_dt)]
+    if matrix_loader is not None and params_selected:
+        if st.checkbox("Verlauf der ausgewählten Parameter anzeigen", key=f"{key_prefix}_chart"):
+            matrix = matrix_loader()
+            wide = matrix.to_frame(params_selected, start_dt, end_dt)
+            st.line_chart(wide)
+            st.caption(f"Matrix {matrix.shape[0]}×{matrix.shape[1]} ({matrix.kind}, Füllgrad {matrix.density:.0%}, {matrix.nbytes / 1024:.0f} KiB)")
 
     avg_key = f"{key_prefix}_avg"
     # with filter_expander:
     avg_daily = st.checkbox("Tägliche Mittelwerte pro Parameter berechnen", value=st.session_state.get(avg_key, False), key=avg_key)
+    implausible = implausible_rows(filtered)
+    exclude_key = f"{key_prefix}_exclude_implausible"
+    exclude_implausible = st.session_state.get(exclude_key, True)
+    if implausible.any():
+        exclude_implausible = st.checkbox(
+            f"Unplausible Werte aus Tagesmitteln ausschließen ({int(implausible.sum())} markiert)",
+            value=st.session_state.get(exclude_key, True), key=exclude_key,
+        )
 
     if avg_daily:
         if 'timestamp_parsed' not in filtered.columns:
             st.warning("Keine Zeitstempel zum Aggregieren vorhanden")
             st.write(filtered)
             return filtered
-        agg = filtered.copy()
-        agg['date'] = agg['timestamp_parsed'].dt.date
-        # select first available numeric-like column safely
-        candidate_cols = ['value', 'Wert', 'value_numeric']
-        col_to_use = None
-        for c in candidate_cols:
-            if c in agg.columns:
-                col_to_use = c
-                break
-        if col_to_use is not None:
-            val_series = pd.to_numeric(agg[col_to_use], errors='coerce')
-        else:
-            # fallback: empty numeric series with same index
-            val_series = pd.Series([pd.NA] * len(agg), index=agg.index, dtype='float')
-        agg['value_numeric'] = val_series
-        grouped = (
-            agg.groupby(['date', 'parameter', 'unit'], dropna=False)
-            .agg(
-            value_mean=('value_numeric', 'mean'),
-            count_numeric=('value_numeric', lambda x: int(x.notna().sum())),
-            count_total=('value_numeric', 'size'),
-            )
-            .reset_index()
-        )
-        # Sort columns: value_mean first, then unit
-        cols = ['date', 'parameter', 'value_mean', 'unit', 'count_numeric', 'count_total']
-        grouped = grouped[cols]
+        grouped = numeric_results(df, params_selected, start_dt, end_dt, avg_daily=True,
+                                  exclude_implausible=exclude_implausible, dataset_key=dataset_key)
+        mixed = mixed_units(grouped)
+        if mixed:
+            st.warning("Ohne bekannte Umrechnung, Tagesmittel je Einheit getrennt: " + "; ".join(f"{p} ({', '.join(u)})" for p, u in mixed.items()))
         _safe_write(grouped)
+        render_download(grouped, key_prefix, f"{label}_Tagesmittel")
         return grouped
 
     # default table output
@@ -132,10 +226,20 @@ def render_numeric_view(df: Optional[pd.DataFrame], label: str, key_prefix: str,
     for c in ['timestamp', 'parameter', 'value', 'Wert', 'unit']:
         if c in filtered.columns:
             display_cols.append(c)
+    if 'flag' in filtered.columns and filtered['flag'].notna().any():
+        # implausible / low / high from services.plausibility
+        display_cols.append('flag')
+    converted = converted_rows(filtered)
+    if converted.any():
+        # show the export's original unit next to the converted value
+        display_cols.append('unit_raw')
+        st.caption(f"{int(converted.sum())} Werte in Standard-Einheiten umgerechnet (Spalte unit_raw: Original-Einheit)")
     if display_cols:
         display_df = filtered[display_cols].copy()
         _safe_write(display_df)
     else:
         display_df = filtered.copy()
         _safe_write(display_df)
+    # export the typed values, not the string copy used for display
+    render_download(display_df, key_prefix, label)
     return filtered
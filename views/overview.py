@@ -1,6 +1,12 @@
+import os
 import streamlit as st
 import pandas as pd
 from typing import List, Optional
+from services.redcap_client import import_records, payload_to_records, redcap_config_from_env
+from services.redcap_import_file import DataDictionary, compile_payload_to_string
+from ui.export import render_download
+from views.numeric_view import numeric_results
+from views.therapy import therapy_results
 try:
     from ui.selection_panel import _render_checkbox_grid
 except Exception:
@@ -12,7 +18,8 @@ except Exception:
         return val
 
 
-def render_overview(dfs: Optional[dict] = None, key_prefixes: Optional[List[str]] = None, start_dt=None, end_dt=None) -> None:
+def render_overview(dfs: Optional[dict] = None, key_prefixes: Optional[List[str]] = None, start_dt=None, end_dt=None,
+                    dataset_keys: Optional[dict] = None) -> None:
     """
     Zeige ein Formular, in dem der Nutzer einen Patienten-Key eingibt und
     alle in den einzelnen Views ausgewählten Parameter als editierbare
@@ -25,12 +32,17 @@ def render_overview(dfs: Optional[dict] = None, key_prefixes: Optional[List[str]
       pro Parameter zur Eingabe des Mittelwerts).
     - Nutzt ein Streamlit-Formular, validiert den Patienten-Key und sammelt
       die eingegebenen Werte in `st.session_state['overview_payload']` als
-      Demo-Payload (keine echte API-Aufruf-Implementierung).
+      Payload. Sind REDCAP_API_URL und REDCAP_API_TOKEN gesetzt, wird
+      der Payload über `services.redcap_client` an REDCap importiert.
+    - Filtern und Tagesmittel laufen über `numeric_results`/`therapy_results`
+      der Views; mit `dataset_keys` (prefix -> (Inhalts-Hash, Datensatz))
+      kommen bereits in den Ansichten berechnete Zustände aus dem Ergebnis-Cache.
     """
     st.header("Übersicht — editierbare Kopien der Ansichten")
 
     # Erwarte ein dict von DataFrames (prefix -> DataFrame)
     dfs = dfs or {}
+    dataset_keys = dataset_keys or {}
     if not key_prefixes:
         key_prefixes = sorted(dfs.keys())
     if not key_prefixes:
@@ -52,6 +64,8 @@ def render_overview(dfs: Optional[dict] = None, key_prefixes: Optional[List[str]
     # gefilterten/aggregierten Tabelle, wie sie die jeweiligen Views anzeigen.
     data_editor = getattr(st, 'data_editor', None) or getattr(st, 'experimental_data_editor', None)
     any_shown = False
+    # bearbeitete Tabellen aller Views für den gemeinsamen Export
+    exported = []
     # friendly names for known prefixes (fallback to prefix itself)
     view_names = {
         'df1_vitals': 'Vitals',
@@ -60,6 +74,11 @@ def render_overview(dfs: Optional[dict] = None, key_prefixes: Optional[List[str]
         'mcs_ecmo': 'MCS - ECMO',
         'mcs_impella': 'MCS - Impella',
         'rrt': 'RRT',
+        'fluid_balance': 'Bilanz',
+        'devices': 'Katheter/Drainagen',
+        'medications': 'Medikamente',
+        'derived': 'Abgeleitete Werte',
+        'scores': 'Scores',
     }
     for prefix in key_prefixes:
         df = dfs.get(prefix)
@@ -85,61 +104,21 @@ def render_overview(dfs: Optional[dict] = None, key_prefixes: Optional[List[str]
 
         # Entscheide ob therapy-like (hat 'Sub-Kategorie') oder numeric
         df_show = pd.DataFrame()
+        # same (cached) results as the views: services.result_cache, keyed by dataset and view state
+        dataset_key = dataset_keys.get(prefix)
+        avg = st.session_state.get(f"{prefix}_avg", False)
         if 'Sub-Kategorie' in df.columns:
             # therapy: filter by selected devices and shared params
             selected_devices = st.session_state.get(f"{prefix}_devices", [])
             if not selected_devices:
                 st.info(f"Keine Geräte für {view_title} ausgewählt.")
                 continue
-            combined = df[df['Sub-Kategorie'].isin(selected_devices)].copy()
             shared_params = st.session_state.get(f"{prefix}_params", [])
-            if shared_params:
-                combined = combined[combined['Parameter'].isin(shared_params)]
-            # normalize timestamp
-            if 'timestamp_parsed' not in combined.columns and 'Zeit' in combined.columns:
-                try:
-                    combined['timestamp_parsed'] = pd.to_datetime(combined['Zeit'], errors='coerce')
-                except Exception:
-                    combined['timestamp_parsed'] = pd.to_datetime(combined['Zeit'], errors='coerce')
-            if start_dt is not None and end_dt is not None and 'timestamp_parsed' in combined.columns:
-                combined = combined[(combined['timestamp_parsed'] >= start_dt) & (combined['timestamp_parsed'] <= end_dt)]
-            # if avg requested, aggregate per date/Parameter/Sub-Kategorie
-            if st.session_state.get(f"{prefix}_avg", False):
-                # similar aggregation as in views/therapy.py
-                agg = combined.copy()
-                if 'timestamp_parsed' in agg.columns:
-                    agg['date'] = agg['timestamp_parsed'].dt.date
-                candidate_cols = ['Wert', 'value', 'Value', 'value_numeric']
-                col_to_use = None
-                for c in candidate_cols:
-                    if c in agg.columns:
-                        col_to_use = c
-                        break
-                if col_to_use is not None:
-                    agg['value_numeric'] = pd.to_numeric(agg[col_to_use], errors='coerce')
-                else:
-                    agg['value_numeric'] = pd.Series([pd.NA] * len(agg), index=agg.index, dtype='float')
-                groups = agg.groupby(['date', 'Parameter', 'Sub-Kategorie'], dropna=False)
-                rows = []
-                for (date, param, dev), g in groups:
-                    cnt_total = len(g)
-                    if col_to_use is not None and col_to_use in g.columns:
-                        num = pd.to_numeric(g[col_to_use], errors='coerce')
-                    else:
-                        num = pd.Series([pd.NA] * len(g), index=g.index)
-                    cnt_numeric = int(num.notna().sum())
-                    if cnt_numeric > 0:
-                        value_mean = float(num.mean())
-                    else:
-                        vals = g[col_to_use].dropna().astype(str).tolist() if (col_to_use in g.columns) else []
-                        if not vals:
-                            value_mean = pd.NA
-                        else:
-                            vals_sorted = sorted(vals)
-                            mid = len(vals_sorted) // 2
-                            value_mean = vals_sorted[mid]
-                    rows.append({'date': date, 'device': dev, 'parameter': param, 'value': value_mean})
-                df_show = pd.DataFrame(rows)
+            combined = therapy_results(df, selected_devices, shared_params, start_dt, end_dt, dataset_key=dataset_key)
+            if avg and 'timestamp_parsed' in combined.columns:
+                # daily means per date/Parameter/Gerät as in views/therapy.py
+                grouped = therapy_results(df, selected_devices, shared_params, start_dt, end_dt, avg_daily=True, dataset_key=dataset_key)
+                df_show = grouped.rename(columns={'Datum': 'date', 'Gerät': 'device', 'Parameter': 'parameter', 'Wert': 'value'})
             else:
                 # build standardized table columns
                 display_cols = []
@@ -157,12 +136,9 @@ def render_overview(dfs: Optional[dict] = None, key_prefixes: Optional[List[str]
                         except Exception:
                             display_df['Wert'] = display_df['Wert'].apply(lambda x: "" if pd.isna(x) else str(x))
                     # standardize columns to 'date' if timestamp present
-                    if 'Zeit' in display_df.columns:
-                        try:
-                            display_df['timestamp_parsed'] = pd.to_datetime(display_df['Zeit'], errors='coerce')
-                            display_df['date'] = display_df['timestamp_parsed'].dt.date
-                        except Exception:
-                            pass
+                    if 'timestamp_parsed' in combined.columns:
+                        display_df['timestamp_parsed'] = combined['timestamp_parsed']
+                        display_df['date'] = display_df['timestamp_parsed'].dt.date
                     # choose a value column
                     if 'Wert' in display_df.columns:
                         display_df['value'] = display_df['Wert']
@@ -172,58 +148,33 @@ def render_overview(dfs: Optional[dict] = None, key_prefixes: Optional[List[str]
                     df_show = pd.DataFrame()
         else:
             # numeric-like view
-            d = df.copy()
+            d = df
             # normalize parameter column name
             if 'parameter' not in d.columns and 'Parameter' in d.columns:
                 d = d.rename(columns={'Parameter': 'parameter'})
             params_selected = st.session_state.get(f"{prefix}_params", [])
-            if params_selected:
-                d = d[d['parameter'].isin(params_selected)]
-            if start_dt is not None and end_dt is not None and 'timestamp_parsed' in d.columns:
-                d = d[(d['timestamp_parsed'] >= start_dt) & (d['timestamp_parsed'] <= end_dt)]
-            if st.session_state.get(f"{prefix}_avg", False):
-                if 'timestamp_parsed' not in d.columns:
+            filtered = numeric_results(d, params_selected, start_dt, end_dt, dataset_key=dataset_key)
+            if avg:
+                if 'timestamp_parsed' not in filtered.columns:
                     st.warning(f"{view_title}: Keine Zeitstempel zum Aggregieren vorhanden")
-                    df_show = d
+                    df_show = filtered
                 else:
-                    agg = d.copy()
-                    agg['date'] = agg['timestamp_parsed'].dt.date
-                    candidate_cols = ['value', 'Wert', 'value_numeric']
-                    col_to_use = None
-                    for c in candidate_cols:
-                        if c in agg.columns:
-                            col_to_use = c
-                            break
-                    if col_to_use is not None:
-                        val_series = pd.to_numeric(agg[col_to_use], errors='coerce')
-                    else:
-                        val_series = pd.Series([pd.NA] * len(agg), index=agg.index, dtype='float')
-                    agg['value_numeric'] = val_series
-                    grouped = (
-                        agg.groupby(['date', 'parameter', 'unit'], dropna=False)
-                        .agg(
-                            value_mean=('value_numeric', 'mean'),
-                            count_numeric=('value_numeric', lambda x: int(x.notna().sum())),
-                            count_total=('value_numeric', 'size'),
-                        )
-                        .reset_index()
+                    # same default as the view: flagged mis-entries stay out of the daily mean
+                    grouped = numeric_results(
+                        d, params_selected, start_dt, end_dt, avg_daily=True,
+                        exclude_implausible=st.session_state.get(f"{prefix}_exclude_implausible", True), dataset_key=dataset_key,
                     )
-                    cols = ['date', 'parameter', 'value_mean', 'unit', 'count_numeric', 'count_total']
-                    grouped = grouped[[c for c in cols if c in grouped.columns]]
                     # normalize to 'value'
-                    if 'value_mean' in grouped.columns:
-                        grouped = grouped.rename(columns={'value_mean': 'value'})
-                    df_show = grouped
+                    df_show = grouped.rename(columns={'value_mean': 'value'})
             else:
                 display_cols = []
                 for c in ['timestamp', 'parameter', 'value', 'Wert', 'unit']:
-                    if c in d.columns:
+                    if c in filtered.columns:
                         display_cols.append(c)
                 if display_cols:
-                    display_df = d[display_cols].copy()
-                    df_show = display_df.rename(columns={'Parameter': 'parameter'})
+                    df_show = filtered[display_cols].copy()
                 else:
-                    df_show = d.copy()
+                    df_show = filtered.copy()
 
         # Build a uniform table for editing: columns -> date, device, parameter, value
         rows = []
@@ -284,9 +235,14 @@ def render_overview(dfs: Optional[dict] = None, key_prefixes: Optional[List[str]
         ss_edits = st.session_state.setdefault('overview_edits', {})
         ss_edits[prefix] = edits_for_prefix
         st.session_state['overview_edits'] = ss_edits
+        exported.append(edited.assign(view=view_title))
 
     if not any_shown:
         st.info("Keine der angegebenen Views konnte dargestellt werden.")
+    elif exported:
+        st.subheader("Export")
+        combined_export = pd.concat(exported, ignore_index=True)[['view', 'date', 'parameter', 'value']]
+        render_download(combined_export, "overview", f"uebersicht_{patient_key or 'patient'}")
 
     # Submit-Button unabhängig vom Modus
     if st.button("Validieren & (Demo-)Senden"):
@@ -316,5 +272,34 @@ def render_overview(dfs: Optional[dict] = None, key_prefixes: Optional[List[str]
             st.session_state['overview_payload'] = payload
             st.success("Payload validiert und (Demo) vorbereitet.")
             st.json(payload)
-            st.info("Hinweis: Tatsächlicher API-Call ist noch nicht implementiert.")
+            dd_path = os.environ.get("REDCAP_DATA_DICTIONARY", "").strip()
+            if dd_path:
+                try:
+                    dd = DataDictionary.from_csv(dd_path, repeating_forms=[f for f in os.environ.get("REDCAP_REPEATING_FORMS", "").split(",") if f])
+                    content, compiled = compile_payload_to_string(payload, dd)
+                    st.download_button("REDCap-Importdatei (CSV) herunterladen", data=content, file_name=f"redcap_import_{patient_key}.csv", mime="text/csv")
+                    if compiled.invalid or compiled.unmapped:
+                        st.warning(f"{compiled.invalid} ungültige und {compiled.unmapped} nicht zugeordnete Werte wurden nicht exportiert.")
+                        st.dataframe(pd.DataFrame(compiled.errors_sample))
+                except (OSError, ValueError) as e:
+                    st.error(f"Data Dictionary konnte nicht geladen werden: {e}")
+            config = redcap_config_from_env()
+            if config is None:
+                st.info("Hinweis: REDCAP_API_URL / REDCAP_API_TOKEN nicht gesetzt — kein API-Call (Demo).")
+            else:
+                url, token = config
+                try:
+                    records = payload_to_records(payload, daily_instrument=os.environ.get("REDCAP_DAILY_INSTRUMENT") or None)
+                except ValueError as e:
+                    # several days per field but no repeating instrument: nothing is sent
+                    st.error(f"REDCap-Import abgebrochen: {e}")
+                    records = None
+                if records is not None:
+                    with st.spinner(f"Sende {len(records)} Records an REDCap …"):
+                        result = import_records(url, token, records)
+                    if result.ok:
+                        st.success(f"REDCap: {result.imported} Record(s) importiert ({result.batches} Batch(es), {result.elapsed_s:.1f}s).")
+                    else:
+                        for err in result.errors:
+                            st.error(err)
 
@@ -0,0 +1,55 @@
+from typing import Optional
+
+import pandas as pd
+import streamlit as st
+
+from services.scores import SCORE_DEFINITIONS, score_table, scores_long
+
+try:
+    from ui.selection_panel import _render_checkbox_grid
+except Exception:
+    def _render_checkbox_grid(container, options, list_key: str, ncols: int = 2, format_func=None):
+        val = container.multiselect("Parameter", options=options, key=list_key)
+        st.session_state[list_key] = val
+        return val
+
+
+def render_scores(detail: Optional[pd.DataFrame], key_prefix: str = "scores", start_dt=None, end_dt=None):
+    """Daily clinical scores (e.g. SOFA) from the declarative definitions in services/scores.py.
+
+    Shows points per component and the total per day; the criteria table lists
+    the worst value that produced each component score. Component and total
+    points can be selected for the Übersicht page.
+    """
+    st.header("Scores")
+
+    if detail is None or detail.empty:
+        st.info("Keine Daten für die Score-Berechnung vorhanden")
+        return None
+
+    if start_dt is not None and end_dt is not None:
+        detail = detail[(detail["period"] >= pd.Timestamp(start_dt).floor("D")) & (detail["period"] <= end_dt)]
+    table = score_table(detail)
+    if table.empty:
+        st.info("Keine Score-Daten im gewählten Zeitraum")
+        return table
+
+    for score, rows in table.groupby("score", sort=False):
+        st.subheader(score)
+        definition = SCORE_DEFINITIONS.get(score)
+        components = [c.name for c in definition.components] if definition else []
+        cols = ["period"] + [c for c in components if c in rows.columns] + ["Gesamt", "Komponenten"]
+        display_df = rows[cols].rename(columns={"period": "Datum"})
+        display_df["Datum"] = display_df["Datum"].dt.date
+        st.dataframe(display_df, hide_index=True, width="stretch")
+        st.line_chart(rows.set_index("period")[["Gesamt"]])
+
+    with st.expander("Kriterien (schlechtester Wert je Tag)", expanded=False):
+        crit = detail.rename(columns={"period": "Datum", "score": "Score", "component": "Komponente", "criterion": "Kriterium", "worst_value": "Wert", "points": "Punkte"})
+        crit["Datum"] = crit["Datum"].dt.date
+        st.dataframe(crit.round({"Wert": 2}), hide_index=True, width="stretch")
+
+    # daily points for the REDCap overview (same selection keys as the numeric views)
+    with st.expander("Parameter für die Übersicht", expanded=False):
+        _render_checkbox_grid(st, sorted(scores_long(detail)["parameter"].unique().tolist()), f"{key_prefix}_params", ncols=3)
+    return table
@@ -1,6 +1,8 @@
 import pandas as pd
 import streamlit as st
 from typing import Optional
+from services.result_cache import DatasetKey, cached_result
+from ui.export import render_download
 
 # reuse checkbox-grid helper if available, otherwise define a small fallback
 try:
@@ -36,7 +38,79 @@ except Exception:
         return None
 
 
-def render_therapy_view(df: Optional[pd.DataFrame], therapy_label: str, key_prefix: str, start_dt=None, end_dt=None):
+def daily_means_by_device(combined: pd.DataFrame) -> pd.DataFrame:
+    """Aggregate a therapy long-format frame per (date, Parameter, Sub-Kategorie).
+
+    Numeric values (`value_numeric` from the parser, otherwise the value column
+    converted) are averaged; groups without any numeric value fall back to the
+    median string. Columns: Datum, Gerät, Parameter, Wert, Count.
+    """
+    keys = ['date', 'Parameter', 'Sub-Kategorie']
+    agg = combined.assign(date=combined['timestamp_parsed'].dt.date)
+    col_to_use = next((c for c in ['Wert', 'value', 'Value', 'value_numeric'] if c in agg.columns), None)
+    if 'value_numeric' in agg.columns:
+        agg['_num'] = pd.to_numeric(agg['value_numeric'], errors='coerce')
+    elif col_to_use is not None:
+        agg['_num'] = pd.to_numeric(agg[col_to_use], errors='coerce')
+    else:
+        agg['_num'] = pd.Series(float('nan'), index=agg.index, dtype='float')
+
+    grouped = (
+        agg.groupby(keys, dropna=False, sort=True)['_num']
+        .agg(value_mean='mean', count_numeric='count', count_total='size')
+        .reset_index()
+    )
+    grouped['Wert'] = grouped['value_mean'].round(3).astype(object)
+
+    # groups without any number: median (middle of the sorted) string value
+    no_numeric = grouped['count_numeric'] == 0
+    if no_numeric.any() and col_to_use is not None:
+        strs = agg.loc[agg[col_to_use].notna(), keys + [col_to_use]]
+        strs = strs.assign(_s=strs[col_to_use].astype(str)).sort_values(keys + ['_s'])
+        pos = strs.groupby(keys, dropna=False, sort=False).cumcount()
+        size = strs.groupby(keys, dropna=False, sort=False)['_s'].transform('size')
+        medians = strs.loc[pos == size // 2, keys + ['_s']]
+        grouped = grouped.merge(medians, on=keys, how='left')
+        grouped.loc[no_numeric, 'Wert'] = grouped.loc[no_numeric, '_s']
+    grouped['Wert'] = grouped['Wert'].where(grouped['Wert'].notna(), pd.NA)
+
+    # rename and reorder columns for readability: Datum - Gerät - Parameter - Wert - Count
+    grouped = grouped.rename(columns={'Sub-Kategorie': 'Gerät', 'count_total': 'Count', 'date': 'Datum'})
+    return grouped[['Datum', 'Gerät', 'Parameter', 'Wert', 'Count']].copy()
+
+
+def filter_therapy(df: pd.DataFrame, devices, params_selected, start_dt=None, end_dt=None) -> pd.DataFrame:
+    """Rows of the selected devices and parameters (all if none selected) inside [start_dt, end_dt]."""
+    combined = df[df['Sub-Kategorie'].isin(devices)].copy()
+
+    # filter by shared parameters if provided
+    if params_selected:
+        combined = combined[combined['Parameter'].isin(params_selected)]
+
+    # the parser already delivers timestamp_parsed; only older frames need parsing here
+    if 'timestamp_parsed' not in combined.columns and 'Zeit' in combined.columns:
+        combined['timestamp_parsed'] = pd.to_datetime(combined['Zeit'], format='%d.%m.%Y %H:%M', errors='coerce')
+
+    if start_dt is not None and end_dt is not None and 'timestamp_parsed' in combined.columns:
+        combined = combined[(combined['timestamp_parsed'] >= start_dt) & (combined['timestamp_parsed'] <= end_dt)]
+    return combined
+
+
+def therapy_results(df: pd.DataFrame, devices, params_selected, start_dt=None, end_dt=None, avg_daily: bool = False,
+                    dataset_key: Optional[DatasetKey] = None) -> pd.DataFrame:
+    """Filtered rows, or their daily means per device with `avg_daily`, as the therapy views show them.
+
+    With `dataset_key` both steps go through services.result_cache (shared with the overview).
+    """
+    state = dict(params=params_selected, devices=devices, start_dt=start_dt, end_dt=end_dt)
+    combined = cached_result(dataset_key, "therapy", lambda: filter_therapy(df, devices, params_selected, start_dt, end_dt), **state)
+    if not avg_daily or 'timestamp_parsed' not in combined.columns:
+        return combined
+    return cached_result(dataset_key, "therapy", lambda: daily_means_by_device(combined), mode="daily", **state)
+
+
+def render_therapy_view(df: Optional[pd.DataFrame], therapy_label: str, key_prefix: str, start_dt=None, end_dt=None,
+                        dataset_key: Optional[DatasetKey] = None):
     """
     Generic renderer for therapy-style views where multiple devices (Sub-Kategorie)
     exist and parameters apply per device (MCS, RRT).
@@ -44,6 +118,7 @@ def render_therapy_view(df: Optional[pd.DataFrame], therapy_label: str, key_pref
     Shared selection model: one multiselect for parameters (applies to all devices)
     and one avg checkbox (applies to all devices). Devices are selected via
     a multiselect; for each selected device a filtered table/aggregation is shown.
+    `dataset_key` (content hash, dataset name) enables the shared result cache.
     """
     st.header(f"{therapy_label}")
 
@@ -98,21 +173,7 @@ def render_therapy_view(df: Optional[pd.DataFrame], therapy_label: str, key_pref
         st.info("Keine Geräte ausgewählt — bitte wähle mindestens ein Gerät aus.")
         return None
 
-    combined = df[df['Sub-Kategorie'].isin(selected_devices)].copy()
-
-    # filter by shared parameters if provided
-    if shared_params_selected:
-        combined = combined[combined['Parameter'].isin(shared_params_selected)]
-
-    # normalize timestamp column
-    if 'timestamp_parsed' not in combined.columns and 'Zeit' in combined.columns:
-        try:
-            combined['timestamp_parsed'] = pd.to_datetime(combined['Zeit'], errors='coerce')
-        except Exception:
-            combined['timestamp_parsed'] = pd.to_datetime(combined['Zeit'], errors='coerce')
-
-    if start_dt is not None and end_dt is not None and 'timestamp_parsed' in combined.columns:
-        combined = combined[(combined['timestamp_parsed'] >= start_dt) & (combined['timestamp_parsed'] <= end_dt)]
+    combined = therapy_results(df, selected_devices, shared_params_selected, start_dt, end_dt, dataset_key=dataset_key)
 
     # if avg is requested, aggregate per date, parameter and device
     if st.session_state.get(shared_avg_key, False):
@@ -120,69 +181,9 @@ def render_therapy_view(df: Optional[pd.DataFrame], therapy_label: str, key_pref
             st.warning("Keine Zeitstempel zum Aggregieren vorhanden")
             st.write(combined)
             return combined
-        agg = combined.copy()
-        agg['date'] = agg['timestamp_parsed'].dt.date
-        candidate_cols = ['Wert', 'value', 'Value', 'value_numeric']
-        col_to_use = None
-        for c in candidate_cols:
-            if c in agg.columns:
-                col_to_use = c
-                break
-        if col_to_use is not None:
-            agg['value_numeric'] = pd.to_numeric(agg[col_to_use], errors='coerce')
-        else:
-            agg['value_numeric'] = pd.Series([pd.NA] * len(agg), index=agg.index, dtype='float')
-        # perform grouped aggregation: numeric mean when numbers available,
-        # otherwise pick a median string (or the single string if only one present)
-        groups = agg.groupby(['date', 'Parameter', 'Sub-Kategorie'], dropna=False)
-        rows = []
-        for (date, param, dev), g in groups:
-            cnt_total = len(g)
-            # attempt numeric conversion on the chosen source column
-            if col_to_use is not None and col_to_use in g.columns:
-                num = pd.to_numeric(g[col_to_use], errors='coerce')
-            else:
-                num = pd.Series([pd.NA] * len(g), index=g.index)
-            cnt_numeric = int(num.notna().sum())
-            if cnt_numeric > 0:
-                value_mean = float(num.mean())
-            else:
-                # fallback: pick median string from non-null original values
-                if col_to_use is not None and col_to_use in g.columns:
-                    vals = g[col_to_use].dropna().astype(str).tolist()
-                else:
-                    vals = []
-                if not vals:
-                    value_mean = pd.NA
-                else:
-                    vals_sorted = sorted(vals)
-                    mid = len(vals_sorted) // 2
-                    value_mean = vals_sorted[mid]
-            rows.append({
-                'date': date,
-                'Parameter': param,
-                'Sub-Kategorie': dev,
-                'value_mean': value_mean,
-                'count_numeric': cnt_numeric,
-                'count_total': cnt_total,
-            })
-
-        grouped = pd.DataFrame(rows)
-        # rename and reorder columns for readability: Datum - Gerät - Parameter - Wert - Count
-        grouped = grouped.rename(columns={'Sub-Kategorie': 'Gerät', 'value_mean': 'Wert', 'count_total': 'Count'})
-        cols_wanted = [c for c in ['date', 'Gerät', 'Parameter', 'Wert', 'Count'] if c in grouped.columns]
-        grouped = grouped[cols_wanted].copy()
-        # format/round numeric Wert entries where possible
-        if 'Wert' in grouped.columns:
-            try:
-                # only round numeric entries, leave strings untouched
-                grouped['Wert'] = grouped['Wert'].apply(lambda v: round(v, 3) if isinstance(v, (int, float)) and not pd.isna(v) else v)
-            except Exception:
-                pass
-        if 'date' in grouped.columns:
-            grouped = grouped.rename(columns={'date': 'Datum'})
-
+        grouped = therapy_results(df, selected_devices, shared_params_selected, start_dt, end_dt, avg_daily=True, dataset_key=dataset_key)
         st.write(grouped)
+        render_download(grouped, key_prefix, f"{therapy_label}_Tagesmittel")
         return grouped
 
     # otherwise show combined table with a device column
@@ -195,6 +196,8 @@ def render_therapy_view(df: Optional[pd.DataFrame], therapy_label: str, key_pref
         display_df = combined[display_cols].copy()
         if 'Sub-Kategorie' in display_df.columns:
             display_df = display_df.rename(columns={'Sub-Kategorie': 'Gerät'})
+        # export before the display-only string conversion of 'Wert'
+        render_download(display_df, key_prefix, therapy_label)
         if 'Wert' in display_df.columns:
             try:
                 display_df['Wert'] = display_df['Wert'].astype(str).fillna("")